@@ -0,0 +1,109 @@
+"""Local stand-in for the Ollama API with configurable latency and token rate.
+
+Run standalone with ``python -m benchmarks.fake_ollama --port 11434`` or mount
+in-process through ``httpx.ASGITransport`` (see ``benchmarks.load_test``).
+"""
+import argparse
+import asyncio
+import json
+import time
+from typing import Any, Dict
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+
+class FakeOllamaStats:
+    """Server-side counters used for the LLM share of the time breakdown."""
+
+    def __init__(self):
+        self.calls = 0
+        self.streamed_calls = 0
+        self.tokens = 0
+        self.total_ms = 0.0
+
+    def record(self, started: float, tokens: int, streamed: bool):
+        self.calls += 1
+        self.streamed_calls += int(streamed)
+        self.tokens += tokens
+        self.total_ms += (time.perf_counter() - started) * 1000
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "streamed_calls": self.streamed_calls,
+            "tokens": self.tokens,
+            "total_ms": round(self.total_ms, 3)
+        }
+
+
+def create_fake_ollama(latency_ms: float = 200, tokens_per_sec: float = 50,
+                       response_tokens: int = 40) -> FastAPI:
+    """Build an app serving /api/generate and /api/tags like Ollama does.
+
+    ``latency_ms`` is the time to first token; tokens then arrive at
+    ``tokens_per_sec`` (0 means all at once).
+    """
+    app = FastAPI(title="Fake Ollama")
+    app.state.stats = FakeOllamaStats()
+    token_delay = 1 / tokens_per_sec if tokens_per_sec > 0 else 0.0
+
+    @app.get("/api/tags")
+    async def tags():
+        return {"models": [{"name": "phi:latest"}]}
+
+    @app.post("/api/generate")
+    async def generate(request: Request):
+        body = await request.json()
+        started = time.perf_counter()
+        tokens = [f"token{i} " for i in range(response_tokens)]
+        prompt_tokens = len(body.get("prompt", "").split())
+
+        # Ollama streams unless told otherwise
+        if not body.get("stream", True):
+            await asyncio.sleep(latency_ms / 1000 + token_delay * len(tokens))
+            app.state.stats.record(started, len(tokens), streamed=False)
+            return {
+                "model": body.get("model"),
+                "response": "".join(tokens),
+                "done": True,
+                "prompt_eval_count": prompt_tokens,
+                "eval_count": len(tokens)
+            }
+
+        async def stream():
+            await asyncio.sleep(latency_ms / 1000)
+            for token in tokens:
+                if token_delay:
+                    await asyncio.sleep(token_delay)
+                yield json.dumps({"model": body.get("model"), "response": token, "done": False}) + "\n"
+            app.state.stats.record(started, len(tokens), streamed=True)
+            yield json.dumps({
+                "model": body.get("model"),
+                "response": "",
+                "done": True,
+                "prompt_eval_count": prompt_tokens,
+                "eval_count": len(tokens)
+            }) + "\n"
+
+        return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+    return app
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Fake Ollama server for benchmarks")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument("--latency-ms", type=float, default=200)
+    parser.add_argument("--tokens-per-sec", type=float, default=50)
+    parser.add_argument("--response-tokens", type=int, default=40)
+    args = parser.parse_args()
+
+    uvicorn.run(
+        create_fake_ollama(args.latency_ms, args.tokens_per_sec, args.response_tokens),
+        host=args.host,
+        port=args.port,
+        log_level="warning"
+    )
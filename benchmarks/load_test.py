@@ -0,0 +1,188 @@
+"""End-to-end load test for the task API against a fake Ollama.
+
+Fires N concurrent ``POST /tasks/execute`` requests at the FastAPI app
+in-process (no network), then reports latency percentiles, throughput and
+how much time went to the database and to the model. Results are written
+as JSON so runs can be compared::
+
+    python -m benchmarks.load_test --requests 100 --concurrency 20 --output results.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of samples."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, int(round(pct / 100 * len(ordered))))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+class DBTimer:
+    """Accumulates time spent executing SQL statements on every engine."""
+
+    def __init__(self):
+        self.statements = 0
+        self.total_ms = 0.0
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("_bench_start", []).append(time.perf_counter())
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["_bench_start"].pop()
+        self.statements += 1
+        self.total_ms += (time.perf_counter() - started) * 1000
+
+    def install(self):
+        from sqlalchemy import event
+        from sqlalchemy.engine import Engine
+        event.listen(Engine, "before_cursor_execute", self._before)
+        event.listen(Engine, "after_cursor_execute", self._after)
+
+    def remove(self):
+        from sqlalchemy import event
+        from sqlalchemy.engine import Engine
+        event.remove(Engine, "before_cursor_execute", self._before)
+        event.remove(Engine, "after_cursor_execute", self._after)
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except Exception:
+        return None
+
+
+async def run_benchmark(requests: int = 50, concurrency: int = 10, task_type: str = "full_analysis",
+                        latency_ms: float = 200, tokens_per_sec: float = 50, response_tokens: int = 40,
+                        use_cache: bool = False, unique_topics: bool = True) -> Dict[str, Any]:
+    """Run one load test and return the report as a dict."""
+    import httpx
+    from benchmarks.fake_ollama import create_fake_ollama
+    from src.api.main import app, startup_event, shutdown_event
+    from src.core import ollama_client
+
+    fake_ollama = create_fake_ollama(latency_ms, tokens_per_sec, response_tokens)
+    ollama_client.set_http_transport(httpx.ASGITransport(app=fake_ollama))
+    db_timer = DBTimer()
+    db_timer.install()
+
+    # ASGITransport does not run lifespan events
+    await startup_event()
+    latencies: List[float] = []
+    errors = 0
+    try:
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://benchmark", timeout=None
+        ) as client:
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def one(index: int):
+                nonlocal errors
+                payload = {
+                    "task_type": task_type,
+                    "topic": f"Benchmark topic {index}" if unique_topics else "Benchmark topic",
+                    "questions": ["What changed recently?"],
+                    "use_cache": use_cache
+                }
+                async with semaphore:
+                    started = time.perf_counter()
+                    response = await client.post("/tasks/execute", json=payload)
+                    latencies.append((time.perf_counter() - started) * 1000)
+                if response.status_code != 200 or response.json().get("status") != "success":
+                    errors += 1
+
+            wall_start = time.perf_counter()
+            await asyncio.gather(*(one(i) for i in range(requests)))
+            wall_s = time.perf_counter() - wall_start
+    finally:
+        await shutdown_event()
+        db_timer.remove()
+        ollama_client.set_http_transport(None)
+
+    llm = fake_ollama.state.stats.as_dict()
+    return {
+        "timestamp": datetime.utcnow().isoformat(),
+        "commit": _git_commit(),
+        "config": {
+            "requests": requests,
+            "concurrency": concurrency,
+            "task_type": task_type,
+            "latency_ms": latency_ms,
+            "tokens_per_sec": tokens_per_sec,
+            "response_tokens": response_tokens,
+            "use_cache": use_cache,
+            "unique_topics": unique_topics
+        },
+        "results": {
+            "duration_s": round(wall_s, 3),
+            "tasks_per_sec": round(requests / wall_s, 3) if wall_s else 0.0,
+            "errors": errors,
+            "latency_ms": {
+                "mean": round(sum(latencies) / len(latencies), 3) if latencies else 0.0,
+                "p50": round(percentile(latencies, 50), 3),
+                "p95": round(percentile(latencies, 95), 3),
+                "p99": round(percentile(latencies, 99), 3),
+                "max": round(max(latencies), 3) if latencies else 0.0
+            },
+            "breakdown": {
+                "llm": {**llm, "per_task_ms": round(llm["total_ms"] / requests, 3)},
+                "db": {
+                    "statements": db_timer.statements,
+                    "total_ms": round(db_timer.total_ms, 3),
+                    "per_task_ms": round(db_timer.total_ms / requests, 3)
+                }
+            }
+        }
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the task API against a fake Ollama")
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--task-type", default="full_analysis")
+    parser.add_argument("--latency-ms", type=float, default=200, help="fake model time to first token")
+    parser.add_argument("--tokens-per-sec", type=float, default=50)
+    parser.add_argument("--response-tokens", type=int, default=40)
+    parser.add_argument("--use-cache", action="store_true", help="allow LLM cache hits")
+    parser.add_argument("--same-topic", action="store_true", help="send identical payloads")
+    parser.add_argument("--output", help="write the JSON report to this path")
+    args = parser.parse_args()
+
+    # Keep benchmark rows out of the real database
+    os.environ.setdefault(
+        "DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='bench-'), 'bench.db')}"
+    )
+
+    report = asyncio.run(run_benchmark(
+        requests=args.requests,
+        concurrency=args.concurrency,
+        task_type=args.task_type,
+        latency_ms=args.latency_ms,
+        tokens_per_sec=args.tokens_per_sec,
+        response_tokens=args.response_tokens,
+        use_cache=args.use_cache,
+        unique_topics=not args.same_topic
+    ))
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
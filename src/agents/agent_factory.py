@@ -1,10 +1,91 @@
-from typing import Dict, Any, Optional
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Dict, Any, Optional, Callable, Deque, AsyncIterator
 from src.agents.base_agent import BaseAgent
+from src.core.config import settings
+
+
+class AgentPool:
+    """Bounded pool of reusable agent instances of one type.
+
+    Agents keep no per-task state (that lives in ``AgentContext``), so an
+    idle instance can be handed to any task. At most ``max_size`` instances
+    are ever created; callers beyond that wait for a release.
+    """
+
+    def __init__(self, factory: Callable[[], BaseAgent], max_size: int = 8):
+        self.factory = factory
+        self.max_size = max(1, max_size)
+        self._idle: Deque[BaseAgent] = deque()
+        self._waiters: Deque[asyncio.Future] = deque()
+        self.created = 0
+        self.in_use = 0
+        self.acquired = 0
+        self.waits = 0
+
+    async def acquire(self) -> BaseAgent:
+        """Take an idle instance, creating one if the pool has room."""
+        self.acquired += 1
+        if self._idle:
+            agent = self._idle.pop()
+        elif self.created < self.max_size:
+            agent = self.factory()
+            self.created += 1
+        else:
+            self.waits += 1
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                agent = await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    # Released to us just as we were cancelled; pass it on
+                    self._hand_off(waiter.result())
+                raise
+        self.in_use += 1
+        return agent
+
+    def release(self, agent: BaseAgent):
+        """Return an instance to the pool, waking the oldest waiter."""
+        self.in_use -= 1
+        self._hand_off(agent)
+
+    def _hand_off(self, agent: BaseAgent):
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(agent)
+                return
+        self._idle.append(agent)
+
+    @asynccontextmanager
+    async def lease(self) -> AsyncIterator[BaseAgent]:
+        """Borrow an instance for the duration of a ``with`` block."""
+        agent = await self.acquire()
+        try:
+            yield agent
+        finally:
+            self.release(agent)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_size": self.max_size,
+            "created": self.created,
+            "idle": len(self._idle),
+            "in_use": self.in_use,
+            "waiting": sum(1 for waiter in self._waiters if not waiter.done()),
+            "acquired": self.acquired,
+            "waits": self.waits
+        }
+
 
 class AgentFactory:
     """Factory class for creating and managing agents."""
     
     _agents = {}
+    _pools: Dict[str, AgentPool] = {}
+    _metadata: Dict[str, Dict[str, Any]] = {}
     
     @classmethod
     def _load_agents(cls):
@@ -35,18 +116,20 @@ class AgentFactory:
             return agent_class()
         return None
     
+    @classmethod
+    def get_agent_metadata(cls) -> Dict[str, Dict[str, Any]]:
+        """Get class-level metadata for every agent type without instantiating any."""
+        if not cls._metadata:
+            cls._load_agents()
+            cls._metadata = {
+                name: agent_class.metadata() for name, agent_class in cls._agents.items()
+            }
+        return cls._metadata
+    
     @classmethod
     def get_available_agents(cls) -> Dict[str, str]:
         """Get list of available agents and their descriptions."""
-        cls._load_agents()
-        agents_info = {}
-        for name, agent_class in cls._agents.items():
-            try:
-                agent = agent_class()
-                agents_info[name] = agent.description
-            except Exception as e:
-                agents_info[name] = f"Error loading: {str(e)}"
-        return agents_info
+        return {name: meta["description"] for name, meta in cls.get_agent_metadata().items()}
     
     @classmethod
     def create_coordinator(cls) -> 'TaskCoordinator':
@@ -54,3 +137,27 @@ class AgentFactory:
         cls._load_agents()
         from src.agents.task_coordinator import TaskCoordinator
         return TaskCoordinator()
+    
+    @classmethod
+    def get_pool(cls, agent_type: str) -> AgentPool:
+        """Get the instance pool for an agent type, creating it on first use."""
+        agent_type = agent_type.lower()
+        pool = cls._pools.get(agent_type)
+        if pool is None:
+            cls._load_agents()
+            agent_class = cls._agents.get(agent_type)
+            if agent_class is None:
+                raise ValueError(f"Unknown agent type: {agent_type}")
+            pool = AgentPool(agent_class, max_size=settings.agent_pool_size)
+            cls._pools[agent_type] = pool
+        return pool
+    
+    @classmethod
+    def lease(cls, agent_type: str):
+        """Borrow a pooled agent: ``async with AgentFactory.lease("coordinator") as agent``."""
+        return cls.get_pool(agent_type).lease()
+    
+    @classmethod
+    def pool_stats(cls) -> Dict[str, Dict[str, Any]]:
+        """Metrics for every pool created so far."""
+        return {agent_type: pool.stats() for agent_type, pool in cls._pools.items()}
@@ -1,38 +1,57 @@
-from src.agents.base_agent import BaseAgent
-from typing import Dict, Any, List
+from src.agents.base_agent import BaseAgent, AgentContext
+from typing import Dict, Any, List, Optional
 from src.core.config import settings
 from src.core.logger import logger
+from src.core.token_budget import PromptBuilder
 import json
 
 class AnalysisAgent(BaseAgent):
     """Agent responsible for analyzing data and providing insights."""
     
+    agent_name = "AnalysisAgent"
+    description = "Specializes in analyzing information and extracting actionable insights."
+    capabilities = ["analysis", "insights", "recommendations"]
+    input_schema = {
+        "type": "object",
+        "properties": {
+            "research_findings": {"type": "object"},
+            "analysis_type": {"type": "string", "default": "comprehensive"},
+            "use_cache": {"type": "boolean", "default": True}
+        },
+        "required": ["research_findings"]
+    }
+    prompt_budgets = {"phi:latest": 1536}
+    
     def __init__(self):
         super().__init__(
-            name="AnalysisAgent",
-            description="Specializes in analyzing information and extracting actionable insights.",
+            name=self.agent_name,
+            description=self.description,
             llm_model="gpt-3.5-turbo"
         )
         # REMOVE this line - openai is not defined here
         # openai.api_key = settings.openai_api_key
         
-    async def execute(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
+    async def execute(self, input_data: Dict[str, Any],
+                      context: Optional[AgentContext] = None) -> Dict[str, Any]:
         """Analyze research findings and extract insights."""
+        context = context or AgentContext()
         research_data = input_data.get("research_findings", {})
         analysis_type = input_data.get("analysis_type", "comprehensive")
+        use_cache = input_data.get("use_cache", True)
         
         self.log_action(
             action="Starting analysis",
             reasoning=f"Analyzing data with {analysis_type} approach",
-            metadata={"data_size": len(str(research_data))}
+            metadata={"data_size": len(str(research_data))},
+            context=context
         )
         
         try:
             # Prepare analysis prompt
-            prompt = self._create_analysis_prompt(research_data, analysis_type)
+            prompt = self._create_analysis_prompt(research_data, analysis_type, context)
             
             # Call OpenAI API
-            response = await self._call_llm(prompt)
+            response = await self._call_llm(prompt, context, use_cache=use_cache)
             
             # Parse analysis results
             analysis_results = self._parse_analysis_results(response)
@@ -44,14 +63,15 @@ class AnalysisAgent(BaseAgent):
             self.log_action(
                 action="Analysis completed",
                 reasoning=f"Generated {len(insights)} key insights",
-                metadata={"insights_count": len(insights)}
+                metadata={"insights_count": len(insights)},
+                context=context
             )
             
             # Add to memory
             self.add_to_memory({
                 "analysis_type": analysis_type,
                 "insights": insights
-            })
+            }, context)
             
             return {
                 "status": "success",
@@ -69,38 +89,37 @@ class AnalysisAgent(BaseAgent):
                 "agent": self.name
             }
     
-    def _create_analysis_prompt(self, data: Dict[str, Any], analysis_type: str) -> str:
-        """Create analysis prompt based on data and type."""
-        prompt = f"""You are an expert data analyst. Analyze the following information:
-
-Data: {json.dumps(data, indent=2)}
-
-Analysis Type: {analysis_type}
+    def _create_analysis_prompt(self, data: Dict[str, Any], analysis_type: str,
+                                context: AgentContext) -> str:
+        """Create analysis prompt based on data and type, fitted to the token budget."""
+        prompt = PromptBuilder(self.prompt_budget())
+        prompt.add("You are an expert data analyst. Analyze the following information:", priority=0)
+        # The data gets whatever the instructions leave over; it is only serialised that far
+        prompt.add(data, priority=2, label="Data:")
+        prompt.add(f"""Analysis Type: {analysis_type}
 
 Please provide:
 1. Key patterns and trends
 2. Critical insights
 3. Potential opportunities
 4. Risk factors or concerns
-5. Data quality assessment
-
-Context from previous analyses: {self.get_context()}
-
-Provide a structured analysis with clear, actionable insights."""
-        
-        return prompt
+5. Data quality assessment""", priority=0)
+        prompt.add(self.get_context(context), priority=3, label="Context from previous analyses:")
+        prompt.add("Provide a structured analysis with clear, actionable insights.", priority=0)
+        return prompt.build()
     
-    async def _call_llm(self, prompt: str) -> str:
+    async def _call_llm(self, prompt: str, context: AgentContext, use_cache: bool = True) -> str:
         """Call Ollama LLM."""
         try:
             from src.core.ollama_client import OllamaClient
             logger.info(f"Using Ollama for {self.name}")
             
-            # Simplify prompt for phi
-            simple_prompt = "Analyze this data and provide 3 insights:\n" + prompt[:300]
+            simple_prompt = "Analyze this data and provide 3 insights:\n" + prompt
             
-            client = OllamaClient(model="phi:latest")
-            response = client.chat(simple_prompt)
+            client = OllamaClient(model=self.ollama_model)
+            response = await client.achat(
+                simple_prompt, timeout=self.llm_timeout(context), use_cache=use_cache
+            )
             
             # Return structured analysis
             return json.dumps({
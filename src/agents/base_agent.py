@@ -1,67 +1,163 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List, Optional
-from datetime import datetime
+from typing import Dict, Any, List, Optional, AsyncIterator, Set
+from src.agents.memory import AgentMemory
+from src.core.config import settings
 from src.core.logger import logger
-from src.core.database import AgentLog, get_db
-from sqlalchemy.orm import Session
-import json
-import uuid
+from src.core.log_sink import log_sink
+from src.core.token_budget import PromptBuilder, context_budget
+import asyncio
+import time
+
+class AgentContext:
+    """Per-task state threaded through agent execution.
+    
+    Agents themselves hold no task state, so one instance can serve many
+    tasks concurrently; anything tied to a single task lives here.
+    """
+    
+    def __init__(self, task_id: Optional[str] = None, deadline: Optional[float] = None):
+        self.task_id = task_id
+        # Absolute time.monotonic() by which the task must finish
+        self.deadline = deadline
+        self.memory: Dict[str, AgentMemory] = {}
+        # The asyncio task running this task's workflow, for cancellation
+        self.task: Optional[asyncio.Task] = None
+        # Side work started for this task (e.g. memory summaries), stopped with it
+        self.background: Set[asyncio.Task] = set()
+    
+    def cancel(self) -> bool:
+        """Cancel the running workflow; False if it is not running."""
+        self.close()
+        if self.task is None or self.task.done():
+            return False
+        self.task.cancel()
+        return True
+    
+    def track(self, task: asyncio.Task):
+        """Tie background work to this task, so :meth:`close` can stop it."""
+        self.background.add(task)
+        task.add_done_callback(self.background.discard)
+    
+    def close(self):
+        """Cancel background work once the task has finished or been abandoned."""
+        for task in list(self.background):
+            task.cancel()
+    
+    def remaining(self) -> Optional[float]:
+        """Seconds left before the deadline, or None when there is no deadline."""
+        if self.deadline is None:
+            return None
+        return self.deadline - time.monotonic()
+    
+    def memory_for(self, agent_name: str) -> AgentMemory:
+        """Working memory of one agent within this task."""
+        memory = self.memory.get(agent_name)
+        if memory is None:
+            memory = self.memory[agent_name] = AgentMemory(
+                capacity=settings.agent_memory_entries,
+                max_bytes=settings.agent_memory_max_bytes,
+                summarize=settings.agent_memory_summary
+            )
+        return memory
+
 
 class BaseAgent(ABC):
     """Base class for all AI agents in the system."""
     
+    # Static metadata, readable without instantiating the agent
+    agent_name: str = ""
+    description: str = ""
+    capabilities: List[str] = []
+    input_schema: Dict[str, Any] = {}
+    # Ollama model the agent calls, and prompt token budgets per model
+    # (models not listed get their context window minus room for the reply)
+    ollama_model: str = "phi:latest"
+    prompt_budgets: Dict[str, int] = {}
+    
     def __init__(self, name: str, description: str, llm_model: str = "gpt-3.5-turbo"):
         self.name = name
         self.description = description
         self.llm_model = llm_model
-        self.memory: List[Dict[str, Any]] = []
-        self.task_id: Optional[str] = None
         
-    def set_task_id(self, task_id: str):
-        """Set the current task ID for logging purposes."""
-        self.task_id = task_id
-        
-    def log_action(self, action: str, reasoning: str, metadata: Dict[str, Any] = None):
-        """Log agent actions to database."""
+    def log_action(self, action: str, reasoning: str, metadata: Dict[str, Any] = None,
+                   context: Optional[AgentContext] = None):
+        """Queue an agent action for the batched database log."""
         try:
-            db = next(get_db())
-            log_entry = AgentLog(
-                task_id=self.task_id,
-                agent_name=self.name,
-                action=action,
-                reasoning=reasoning,
-                meta_data=metadata or {}
-
-            )
-            db.add(log_entry)
-            db.commit()
+            log_sink.submit({
+                "task_id": context.task_id if context else None,
+                "agent_name": self.name,
+                "action": action,
+                "reasoning": reasoning,
+                "meta_data": metadata or {}
+            })
             logger.info(f"[{self.name}] Action: {action} | Reasoning: {reasoning}")
         except Exception as e:
             logger.error(f"Failed to log agent action: {e}")
-        finally:
-            db.close()
-    
-    def add_to_memory(self, content: Dict[str, Any]):
-        """Add information to agent's memory."""
-        self.memory.append({
-            "timestamp": datetime.utcnow().isoformat(),
-            "content": content
-        })
-        # Keep only last 10 memories to avoid token limits
-        if len(self.memory) > 10:
-            self.memory = self.memory[-10:]
+    
+    def add_to_memory(self, content: Dict[str, Any], context: AgentContext):
+        """Add information to the agent's memory for the current task."""
+        memory = context.memory_for(self.name)
+        memory.append(content)
+        if memory.summarize:
+            summary_task = memory.schedule_summary(
+                lambda summary, evicted: self._summarize_memory(summary, evicted, context)
+            )
+            if summary_task is not None:
+                context.track(summary_task)
+    
+    async def _summarize_memory(self, summary: str, evicted: List[str], context: AgentContext) -> str:
+        """Digest memories leaving the buffer, together with the previous digest."""
+        from src.core.ollama_client import OllamaClient
+        prompt = PromptBuilder(self.prompt_budget()).add(
+            "Merge these notes into one short digest (max 5 sentences), keeping facts and decisions:",
+            priority=0
+        ).add(summary, priority=1, label="Earlier digest:")
+        for i, rendered in enumerate(evicted, 2):
+            prompt.add(rendered, priority=i)
+        client = OllamaClient(model=self.ollama_model)
+        return await client.achat(prompt.build(separator="\n"), timeout=self.llm_timeout(context))
+    
+    def llm_timeout(self, context: Optional[AgentContext]) -> Optional[float]:
+        """Timeout for the next LLM call: whatever is left of the task deadline."""
+        remaining = context.remaining() if context else None
+        if remaining is None:
+            return None
+        if remaining <= 0:
+            raise TimeoutError("Task deadline exceeded")
+        return remaining
+    
+    def prompt_budget(self, model: Optional[str] = None) -> int:
+        """Prompt tokens this agent may spend on ``model`` (its own model by default)."""
+        model = model or self.ollama_model
+        return self.prompt_budgets.get(model) or context_budget(model)
+    
+    @classmethod
+    def metadata(cls) -> Dict[str, Any]:
+        """Class-level description of the agent for discovery endpoints."""
+        return {
+            "name": cls.agent_name or cls.__name__,
+            "description": cls.description,
+            "capabilities": list(cls.capabilities),
+            "input_schema": cls.input_schema
+        }
     
     @abstractmethod
-    async def execute(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
+    async def execute(self, input_data: Dict[str, Any],
+                      context: Optional[AgentContext] = None) -> Dict[str, Any]:
         """Execute the agent's main task."""
         pass
     
-    def get_context(self) -> str:
-        """Get agent's current context from memory."""
-        if not self.memory:
-            return "No previous context."
+    async def execute_stream(self, input_data: Dict[str, Any],
+                             context: Optional[AgentContext] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Execute the agent's task, yielding progress events as they happen.
         
-        context = "Previous context:\n"
-        for mem in self.memory[-3:]:  # Last 3 memories
-            context += f"- {json.dumps(mem['content'], indent=2)}\n"
-        return context
+        Agents that can stream partial output override this; the default
+        reports start and completion around a regular execute call.
+        """
+        yield {"event": "agent_started", "agent": self.name}
+        result = await self.execute(input_data, context)
+        yield {"event": "agent_completed", "agent": self.name, "data": result}
+    
+    def get_context(self, context: AgentContext) -> str:
+        """Get agent's current context from its task memory (cached between writes)."""
+        return context.memory_for(self.name).context()
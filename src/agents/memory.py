@@ -0,0 +1,130 @@
+import asyncio
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional
+from src.core.logger import logger
+from src.core.token_budget import estimate_tokens, render_json, truncate_to_tokens
+
+# Turns (previous summary, rendered records being evicted) into a new digest
+Summarizer = Callable[[str, List[str]], Awaitable[str]]
+
+
+class MemoryRecord:
+    """One remembered item, rendered once when it is written."""
+
+    __slots__ = ("timestamp", "content", "rendered", "size")
+
+    def __init__(self, content: Dict[str, Any], max_tokens: int):
+        self.timestamp = datetime.utcnow().isoformat()
+        self.content = content
+        self.rendered = render_json(content, max_tokens)
+        self.size = len(self.rendered.encode("utf-8"))
+
+
+class AgentMemory:
+    """Fixed-capacity ring buffer of an agent's memories within one task.
+
+    Each record is serialised once on write, and the context string handed
+    to prompts is cached until the next write, so building a prompt does
+    not re-render anything. Size is capped both in entries and in rendered
+    bytes. With ``summarize`` on, entries pushed out of the buffer are
+    folded into a rolling digest instead of being forgotten.
+    """
+
+    def __init__(self, capacity: int = 10, max_bytes: int = 64 * 1024, context_entries: int = 3,
+                 record_tokens: int = 256, summarize: bool = False, summary_tokens: int = 256):
+        self.capacity = capacity
+        self.max_bytes = max_bytes
+        self.context_entries = context_entries
+        self.record_tokens = record_tokens
+        self.summarize = summarize
+        self.summary_tokens = summary_tokens
+        self._slots: List[Optional[MemoryRecord]] = [None] * capacity
+        self._head = 0  # index of the oldest record
+        self._count = 0
+        self._bytes = 0
+        self._context: Optional[str] = None
+        self.summary = ""
+        self._evicted: List[str] = []
+        self._summary_task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[MemoryRecord]:
+        """Records from oldest to newest."""
+        for i in range(self._count):
+            yield self._slots[(self._head + i) % self.capacity]
+
+    @property
+    def bytes(self) -> int:
+        return self._bytes
+
+    def append(self, content: Dict[str, Any]):
+        record = MemoryRecord(content, self.record_tokens)
+        if self._count == self.capacity:
+            self._pop_oldest()
+        self._slots[(self._head + self._count) % self.capacity] = record
+        self._count += 1
+        self._bytes += record.size
+        while self._bytes > self.max_bytes and self._count > 1:
+            self._pop_oldest()
+        self._context = None
+
+    def context(self) -> str:
+        """Rendered context for prompts, rebuilt only after a write."""
+        if self._context is None:
+            self._context = self._render()
+        return self._context
+
+    def schedule_summary(self, summarizer: Summarizer) -> Optional[asyncio.Task]:
+        """Fold evicted records into the digest in the background, one run at a time.
+        
+        Returns the task it started, if any, so the caller can tie it to the
+        lifetime of the task the memory belongs to.
+        """
+        if not self._evicted or (self._summary_task and not self._summary_task.done()):
+            return None
+        try:
+            self._summary_task = asyncio.get_running_loop().create_task(self.fold(summarizer))
+        except RuntimeError:
+            return None  # no loop: evicted records wait for the next write inside one
+        return self._summary_task
+
+    async def fold(self, summarizer: Summarizer):
+        """Replace the evicted records with a new digest of them and the old summary."""
+        evicted, self._evicted = self._evicted, []
+        try:
+            digest = await summarizer(self.summary, evicted)
+        except Exception as e:
+            logger.warning(f"Memory summary failed, keeping a truncated digest: {e}")
+            digest = "\n".join([self.summary] + evicted)
+        self.summary = truncate_to_tokens(digest.strip(), self.summary_tokens)
+        self._context = None
+
+    def _pop_oldest(self):
+        record = self._slots[self._head]
+        self._slots[self._head] = None
+        self._head = (self._head + 1) % self.capacity
+        self._count -= 1
+        self._bytes -= record.size
+        if self.summarize:
+            self._evicted.append(record.rendered)
+
+    def _render(self) -> str:
+        if not self._count and not self.summary:
+            return "No previous context."
+        rendered = "Previous context:\n"
+        if self.summary:
+            rendered += f"Summary of earlier work: {self.summary}\n"
+        recent = list(self)[-self.context_entries:]
+        for record in reversed(recent):  # newest first
+            rendered += f"- {record.rendered}\n"
+        return rendered
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": self._count,
+            "bytes": self._bytes,
+            "summary_tokens": estimate_tokens(self.summary),
+            "pending_summary": len(self._evicted)
+        }
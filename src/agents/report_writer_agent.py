@@ -1,101 +1,162 @@
-from src.agents.base_agent import BaseAgent
-from typing import Dict, Any, List
-from src.core.config import settings
+from src.agents.base_agent import BaseAgent, AgentContext
+from typing import Dict, Any, List, AsyncIterator, Optional
 from src.core.logger import logger
+from src.core.token_budget import PromptBuilder, truncate_to_tokens
 from datetime import datetime
-import json
 
 class ReportWriterAgent(BaseAgent):
     """Agent responsible for creating comprehensive reports."""
     
+    agent_name = "ReportWriterAgent"
+    description = "Specializes in creating well-structured, professional reports."
+    capabilities = ["report_writing", "executive_summary", "streaming"]
+    input_schema = {
+        "type": "object",
+        "properties": {
+            "research_findings": {"type": "object"},
+            "analysis_results": {"type": "object"},
+            "report_type": {"type": "string", "default": "executive_summary"},
+            "target_audience": {"type": "string", "default": "general"},
+            "use_cache": {"type": "boolean", "default": True}
+        }
+    }
+    prompt_budgets = {"phi:latest": 1536}
+    # Share of the budget the report body may use in the executive summary prompt
+    summary_report_tokens = 1024
+    
     def __init__(self):
         super().__init__(
-            name="ReportWriterAgent",
-            description="Specializes in creating well-structured, professional reports.",
+            name=self.agent_name,
+            description=self.description,
             llm_model="gpt-3.5-turbo"
         )
         
-    async def execute(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
+    async def execute(self, input_data: Dict[str, Any],
+                      context: Optional[AgentContext] = None) -> Dict[str, Any]:
         """Create a comprehensive report from research and analysis."""
+        context = context or AgentContext()
         research_data = input_data.get("research_findings", {})
         analysis_data = input_data.get("analysis_results", {})
         report_type = input_data.get("report_type", "executive_summary")
         target_audience = input_data.get("target_audience", "general")
+        use_cache = input_data.get("use_cache", True)
         
         self.log_action(
             action="Creating report",
             reasoning=f"Generating {report_type} for {target_audience} audience",
-            metadata={"report_type": report_type}
+            metadata={"report_type": report_type},
+            context=context
         )
         
         try:
             # Prepare report generation prompt
             prompt = self._create_report_prompt(
-                research_data, analysis_data, report_type, target_audience
+                research_data, analysis_data, report_type, target_audience, context
             )
             
             # Generate report
-            report_content = await self._call_llm(prompt)
-            
-            # Format report
-            formatted_report = self._format_report(
-                report_content, report_type, target_audience
-            )
-            
-            # Generate executive summary
-            executive_summary = await self._generate_executive_summary(formatted_report)
+            report_content = await self._call_llm(prompt, context, use_cache=use_cache)
             
-            # Log completion
-            self.log_action(
-                action="Report completed",
-                reasoning=f"Successfully generated {report_type} report",
-                metadata={"word_count": len(formatted_report.split())}
-            )
-            
-            # Add to memory
-            self.add_to_memory({
-                "report_type": report_type,
-                "summary": executive_summary
-            })
+            return await self._finalize_report(report_content, report_type, target_audience, context, use_cache)
             
+        except Exception as e:
+            logger.error(f"Report generation failed: {str(e)}")
             return {
-                "status": "success",
-                "report": formatted_report,
-                "executive_summary": executive_summary,
-                "metadata": {
-                    "created_at": datetime.utcnow().isoformat(),
-                    "report_type": report_type,
-                    "target_audience": target_audience,
-                    "word_count": len(formatted_report.split())
-                },
+                "status": "error",
+                "error": str(e),
                 "agent": self.name
             }
+    
+    async def execute_stream(self, input_data: Dict[str, Any],
+                             context: Optional[AgentContext] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Create a report, yielding report tokens as the model produces them."""
+        context = context or AgentContext()
+        research_data = input_data.get("research_findings", {})
+        analysis_data = input_data.get("analysis_results", {})
+        report_type = input_data.get("report_type", "executive_summary")
+        target_audience = input_data.get("target_audience", "general")
+        use_cache = input_data.get("use_cache", True)
+        
+        self.log_action(
+            action="Creating report",
+            reasoning=f"Generating {report_type} for {target_audience} audience (streaming)",
+            metadata={"report_type": report_type},
+            context=context
+        )
+        yield {"event": "agent_started", "agent": self.name}
+        
+        try:
+            prompt = self._create_report_prompt(
+                research_data, analysis_data, report_type, target_audience, context
+            )
+            
+            # Forward tokens while accumulating the full report
+            chunks = []
+            async for token in self._stream_llm(prompt, context, use_cache=use_cache):
+                chunks.append(token)
+                yield {"event": "token", "agent": self.name, "data": token}
+            
+            result = await self._finalize_report("".join(chunks), report_type, target_audience, context, use_cache)
             
         except Exception as e:
             logger.error(f"Report generation failed: {str(e)}")
-            return {
+            result = {
                 "status": "error",
                 "error": str(e),
                 "agent": self.name
             }
+        
+        yield {"event": "agent_completed", "agent": self.name, "data": result}
+    
+    async def _finalize_report(self, report_content: str, report_type: str, target_audience: str,
+                               context: AgentContext, use_cache: bool = True) -> Dict[str, Any]:
+        """Format the generated content and build the report result."""
+        formatted_report = self._format_report(
+            report_content, report_type, target_audience
+        )
+        
+        # Generate executive summary
+        executive_summary = await self._generate_executive_summary(formatted_report, context, use_cache)
+        
+        # Log completion
+        self.log_action(
+            action="Report completed",
+            reasoning=f"Successfully generated {report_type} report",
+            metadata={"word_count": len(formatted_report.split())},
+            context=context
+        )
+        
+        # Add to memory
+        self.add_to_memory({
+            "report_type": report_type,
+            "summary": executive_summary
+        }, context)
+        
+        return {
+            "status": "success",
+            "report": formatted_report,
+            "executive_summary": executive_summary,
+            "metadata": {
+                "created_at": datetime.utcnow().isoformat(),
+                "report_type": report_type,
+                "target_audience": target_audience,
+                "word_count": len(formatted_report.split())
+            },
+            "agent": self.name
+        }
     
     def _create_report_prompt(self, research: Dict, analysis: Dict, 
-                            report_type: str, audience: str) -> str:
-        """Create prompt for report generation."""
-        prompt = f"""You are a professional report writer. Create a {report_type} report.
-
-Research Findings:
-{json.dumps(research, indent=2)}
-
-Analysis Results:
-{json.dumps(analysis, indent=2)}
-
-Target Audience: {audience}
-Report Type: {report_type}
-
-Previous reports context: {self.get_context()}
-
-Please create a well-structured report that includes:
+                            report_type: str, audience: str, context: AgentContext) -> str:
+        """Create prompt for report generation, fitted to the token budget."""
+        budget = self.prompt_budget()
+        prompt = PromptBuilder(budget)
+        prompt.add(f"You are a professional report writer. Create a {report_type} report.", priority=0)
+        # Upstream results are only serialised as far as their share of the budget
+        prompt.add(research, priority=2, max_tokens=budget // 2, label="Research Findings:")
+        prompt.add(analysis, priority=2, max_tokens=budget // 3, label="Analysis Results:")
+        prompt.add(f"Target Audience: {audience}\nReport Type: {report_type}", priority=0)
+        prompt.add(self.get_context(context), priority=3, label="Previous reports context:")
+        prompt.add(f"""Please create a well-structured report that includes:
 1. Executive Summary
 2. Key Findings
 3. Detailed Analysis
@@ -107,42 +168,50 @@ The report should be:
 - Professional in tone
 - Appropriate for the {audience} audience
 - Well-organized with proper headings
-- Include data-driven insights"""
-        
-        return prompt
+- Include data-driven insights""", priority=1)
+        return prompt.build()
     
-    async def _call_llm(self, prompt: str) -> str:
+    async def _call_llm(self, prompt: str, context: AgentContext, use_cache: bool = True) -> str:
         """Call Ollama LLM."""
         try:
             from src.core.ollama_client import OllamaClient
             logger.info(f"Using Ollama for {self.name}")
             
-            # Simple prompt
-            simple_prompt = "Write a brief report:\n" + prompt[:300]
+            simple_prompt = "Write a brief report:\n" + prompt
             
-            client = OllamaClient(model="phi:latest")
-            response = client.chat(simple_prompt)
+            client = OllamaClient(model=self.ollama_model)
+            response = await client.achat(
+                simple_prompt, timeout=self.llm_timeout(context), use_cache=use_cache
+            )
             
             return response
             
         except Exception as e:
             logger.error(f"LLM failed: {e}")
             return "Report generation failed."
+    
+    async def _stream_llm(self, prompt: str, context: AgentContext,
+                          use_cache: bool = True) -> AsyncIterator[str]:
+        """Stream report tokens from Ollama LLM."""
+        from src.core.ollama_client import OllamaClient
+        logger.info(f"Streaming from Ollama for {self.name}")
         
+        simple_prompt = "Write a brief report:\n" + prompt
+        client = OllamaClient(model=self.ollama_model)
         
-    async def _generate_executive_summary(self, report: str) -> str:
-        """Generate executive summary."""
+        produced = False
         try:
-            from src.core.ollama_client import OllamaClient
-            client = OllamaClient(model="phi:latest")
-            
-            prompt = f"Summarize in 50 words: {report[:500]}"
-            return client.chat(prompt)
-            
+            async for token in client.astream(
+                simple_prompt, timeout=self.llm_timeout(context), use_cache=use_cache
+            ):
+                produced = True
+                yield token
         except Exception as e:
-            logger.error(f"Summary generation failed: {e}")
-            return "Executive summary: Report completed successfully."
-
+            logger.error(f"LLM stream failed: {e}")
+            # Mid-stream failures keep what was already sent
+            if not produced:
+                yield "Report generation failed."
+        
         
     def _format_report(self, content: str, report_type: str, audience: str) -> str:
         """Format the report with proper structure."""
@@ -161,28 +230,25 @@ The report should be:
 """
         return formatted
     
-    async def _generate_executive_summary(self, report: str) -> str:
+    async def _generate_executive_summary(self, report: str, context: AgentContext,
+                                          use_cache: bool = True) -> str:
         """Generate a concise executive summary."""
         prompt = f"""Create a concise executive summary (max 200 words) for this report:
 
-{report[:1500]}
+{truncate_to_tokens(report, self.summary_report_tokens)}
 
 Focus on the most critical findings and recommendations."""
         
         try:
-            from openai import OpenAI
-            client = OpenAI(api_key=settings.openai_api_key)
+            from src.core.ollama_client import OllamaClient
+            client = OllamaClient(model=self.ollama_model)
             
-            response = client.chat.completions.create(
-                model=self.llm_model,
-                messages=[
-                    {"role": "system", "content": "You are an expert at creating executive summaries."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-                max_tokens=300
+            return await client.achat(
+                prompt,
+                system_prompt="You are an expert at creating executive summaries.",
+                timeout=self.llm_timeout(context),
+                use_cache=use_cache
             )
-            return response.choices[0].message.content
         except Exception as e:
             logger.error(f"Executive summary generation failed: {e}")
             return "Executive summary generation failed."
@@ -1,55 +1,86 @@
-from src.agents.base_agent import BaseAgent
-from typing import Dict, Any, List
+from src.agents.base_agent import BaseAgent, AgentContext
+from typing import Dict, Any, List, Optional
 from src.core.config import settings
 from src.core.logger import logger
+from src.core.token_budget import PromptBuilder
 import json
 import asyncio
 
 class ResearchAgent(BaseAgent):
     """Agent responsible for researching topics and gathering information."""
     
+    agent_name = "ResearchAgent"
+    description = "Specializes in researching topics and gathering relevant information from various sources."
+    capabilities = ["research", "question_fan_out", "summarization"]
+    input_schema = {
+        "type": "object",
+        "properties": {
+            "topic": {"type": "string"},
+            "questions": {"type": "array", "items": {"type": "string"}},
+            "fan_out": {"type": "boolean", "default": True},
+            "summarize": {"type": "boolean", "default": False},
+            "use_cache": {"type": "boolean", "default": True}
+        },
+        "required": ["topic"]
+    }
+    # phi answers best with short, focused prompts
+    prompt_budgets = {"phi:latest": 1024}
+    
     def __init__(self):
         super().__init__(
-            name="ResearchAgent",
-            description="Specializes in researching topics and gathering relevant information from various sources.",
+            name=self.agent_name,
+            description=self.description,
             llm_model="gpt-3.5-turbo"
         )
         # REMOVE this line - openai is not defined here
         # openai.api_key = settings.openai_api_key
         
-    async def execute(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
+    async def execute(self, input_data: Dict[str, Any],
+                      context: Optional[AgentContext] = None) -> Dict[str, Any]:
         """Research a topic and return findings."""
+        context = context or AgentContext()
         topic = input_data.get("topic", "")
         specific_questions = input_data.get("questions", [])
+        use_cache = input_data.get("use_cache", True)
+        fan_out = input_data.get("fan_out", True) and bool(specific_questions)
         
         self.log_action(
             action="Starting research",
             reasoning=f"Researching topic: {topic}",
-            metadata={"topic": topic, "questions": specific_questions}
+            metadata={"topic": topic, "questions": specific_questions},
+            context=context
         )
         
         try:
-            # Prepare research prompt
-            prompt = self._create_research_prompt(topic, specific_questions)
-            
-            # Call OpenAI API
-            response = await self._call_llm(prompt)
-            
-            # Parse and structure the research findings
-            research_findings = self._parse_research_findings(response)
+            if fan_out:
+                # One concurrent call per question, merged afterwards
+                research_findings = await self._fan_out_research(
+                    topic, specific_questions, context, use_cache,
+                    summarize=input_data.get("summarize", False)
+                )
+            else:
+                # Prepare research prompt
+                prompt = self._create_research_prompt(topic, specific_questions, context)
+                
+                # Call OpenAI API
+                response = await self._call_llm(prompt, context, use_cache=use_cache)
+                
+                # Parse and structure the research findings
+                research_findings = self._parse_research_findings(response)
             
             # Log successful completion
             self.log_action(
                 action="Research completed",
                 reasoning=f"Successfully gathered information on {topic}",
-                metadata={"findings_count": len(research_findings.get("key_findings", []))}
+                metadata={"findings_count": len(research_findings.get("key_findings", []))},
+                context=context
             )
             
             # Add to memory
             self.add_to_memory({
                 "topic": topic,
                 "findings": research_findings
-            })
+            }, context)
             
             return {
                 "status": "success",
@@ -63,7 +94,8 @@ class ResearchAgent(BaseAgent):
             self.log_action(
                 action="Research failed",
                 reasoning=f"Error occurred: {str(e)}",
-                metadata={"error": str(e)}
+                metadata={"error": str(e)},
+                context=context
             )
             return {
                 "status": "error",
@@ -71,42 +103,42 @@ class ResearchAgent(BaseAgent):
                 "agent": self.name
             }
     
-    def _create_research_prompt(self, topic: str, questions: List[str]) -> str:
-        """Create a detailed research prompt."""
-        prompt = f"""You are an expert research assistant. Research the following topic thoroughly:
-
-Topic: {topic}
+    def _create_research_prompt(self, topic: str, questions: List[str], context: AgentContext) -> str:
+        """Create a detailed research prompt within the agent's token budget."""
+        prompt = PromptBuilder(self.prompt_budget())
+        prompt.add(f"""You are an expert research assistant. Research the following topic thoroughly:
 
-Context from previous research: {self.get_context()}
-
-Please provide:
+Topic: {topic}""", priority=0)
+        prompt.add(self.get_context(context), priority=3, label="Context from previous research:")
+        prompt.add("""Please provide:
 1. Overview of the topic
 2. Key findings and insights
 3. Important statistics or data points
 4. Current trends and developments
-5. Potential challenges or considerations
-"""
+5. Potential challenges or considerations""", priority=1)
         
         if questions:
-            prompt += "\n\nSpecific questions to address:\n"
-            for i, question in enumerate(questions, 1):
-                prompt += f"{i}. {question}\n"
-                
-        prompt += "\n\nProvide the response in a structured JSON format."
+            prompt.add(
+                "\n".join(f"{i}. {question}" for i, question in enumerate(questions, 1)),
+                priority=2, label="Specific questions to address:"
+            )
         
-        return prompt
+        prompt.add("Provide the response in a structured JSON format.", priority=0)
+        return prompt.build()
     
-    async def _call_llm(self, prompt: str) -> str:
+    async def _call_llm(self, prompt: str, context: AgentContext, use_cache: bool = True) -> str:
         """Call Ollama LLM."""
         try:
             from src.core.ollama_client import OllamaClient
             logger.info(f"Using Ollama for {self.name}")
             
-            # Simplify the prompt for phi model
-            simple_prompt = f"Research this topic: {prompt[:200]}\nProvide 3 key points."
+            # Prompt was already fitted to the model's budget
+            simple_prompt = f"Research this topic: {prompt}\nProvide 3 key points."
             
-            client = OllamaClient(model="phi:latest")
-            response = client.chat(simple_prompt)
+            client = OllamaClient(model=self.ollama_model)
+            response = await client.achat(
+                simple_prompt, timeout=self.llm_timeout(context), use_cache=use_cache
+            )
             
             # Create structured response
             return json.dumps({
@@ -125,6 +157,78 @@ Please provide:
             })
 
     
+    async def _fan_out_research(self, topic: str, questions: List[str], context: AgentContext,
+                                use_cache: bool = True, summarize: bool = False) -> Dict[str, Any]:
+        """Research the topic and each question concurrently, then merge the answers."""
+        semaphore = asyncio.Semaphore(settings.research_fanout_concurrency)
+        
+        async def bounded(coro):
+            async with semaphore:
+                return await coro
+        
+        unique_questions = list(dict.fromkeys(questions))
+        overview_response, *answers = await asyncio.gather(
+            bounded(self._call_llm(self._create_research_prompt(topic, [], context), context, use_cache=use_cache)),
+            *(bounded(self._answer_question(topic, q, context, use_cache)) for q in unique_questions)
+        )
+        
+        # Reduce: topic overview plus a structured per-question map
+        findings = self._parse_research_findings(overview_response)
+        findings["questions"] = dict(zip(unique_questions, answers))
+        findings["key_findings"] = list(findings.get("key_findings", [])) + [
+            answer["answer"] for answer in answers if answer["status"] == "completed"
+        ]
+        
+        if summarize:
+            findings["summary"] = await self._summarize_findings(topic, findings["questions"], context, use_cache)
+        
+        self.log_action(
+            action="Question fan-out completed",
+            reasoning=f"Answered {len(unique_questions)} questions concurrently",
+            metadata={"answered": sum(a["status"] == "completed" for a in answers)},
+            context=context
+        )
+        return findings
+    
+    async def _answer_question(self, topic: str, question: str, context: AgentContext,
+                               use_cache: bool = True) -> Dict[str, Any]:
+        """Answer a single research question."""
+        try:
+            from src.core.ollama_client import OllamaClient
+            client = OllamaClient(model=self.ollama_model)
+            
+            prompt = (PromptBuilder(self.prompt_budget())
+                      .add(topic, priority=1, label="Topic:")
+                      .add(f"Answer this question in 3 key points: {question}", priority=0)
+                      .build(separator="\n"))
+            answer = await client.achat(prompt, timeout=self.llm_timeout(context), use_cache=use_cache)
+            return {"answer": answer, "status": "completed"}
+            
+        except Exception as e:
+            logger.error(f"Question failed ({question}): {e}")
+            return {"answer": "", "status": "error", "error": str(e)}
+    
+    async def _summarize_findings(self, topic: str, answers: Dict[str, Dict[str, Any]],
+                                  context: AgentContext, use_cache: bool = True) -> str:
+        """Summarise the per-question answers into one digest."""
+        try:
+            from src.core.ollama_client import OllamaClient
+            client = OllamaClient(model=self.ollama_model)
+            
+            # Earlier questions keep their answers when the budget runs out
+            prompt = PromptBuilder(self.prompt_budget()).add(
+                f"Summarize these research findings about {topic} in 3 sentences:", priority=0
+            )
+            for i, (question, result) in enumerate(answers.items(), 1):
+                if result["status"] == "completed":
+                    prompt.add(f"Q: {question}\nA: {result['answer']}", priority=i)
+            prompt = prompt.build(separator="\n")
+            return await client.achat(prompt, timeout=self.llm_timeout(context), use_cache=use_cache)
+            
+        except Exception as e:
+            logger.error(f"Findings summary failed: {e}")
+            return ""
+    
     def _parse_research_findings(self, llm_response: str) -> Dict[str, Any]:
         """Parse the LLM response into structured findings."""
         try:
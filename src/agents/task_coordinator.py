@@ -1,21 +1,101 @@
-from src.agents.base_agent import BaseAgent
+from src.agents.base_agent import BaseAgent, AgentContext
 from src.agents.research_agent import ResearchAgent
 from src.agents.analysis_agent import AnalysisAgent
 from src.agents.report_writer_agent import ReportWriterAgent
-from typing import Dict, Any, List, Optional
+from src.agents.workflow import WorkflowExecutor, WorkflowGraph, WorkflowNode, build_workflow
+from typing import Dict, Any, List, Optional, AsyncIterator, Callable, Awaitable, Set
+from src.core.config import settings
 from src.core.logger import logger
-from src.core.database import TaskExecution, get_db
+from src.core.database import TaskExecution, WorkflowCheckpoint, AsyncSessionLocal
+from src.core.blob_store import offload_output
+from src.core.single_flight import SingleFlight
+from src.core.llm_scheduler import set_request_class, reset_request_class
+from src.core.tracing import tracer
+from sqlalchemy import delete, select, update
 from datetime import datetime
+import asyncio
+import hashlib
+import time
 import uuid
 import json
 
+# Async callback receiving workflow progress events
+EventCallback = Callable[[Dict[str, Any]], Awaitable[None]]
+
+# Identical task inputs running at the same time share one workflow run
+task_flight = SingleFlight("tasks")
+
+
+class _SharedRun:
+    """One workflow run serving every identical task waiting on it.
+    
+    The run has its own context rather than its first caller's: it lasts
+    until the latest deadline among its waiters (none if any has none),
+    and its step outputs are checkpointed for every waiter.
+    """
+    
+    def __init__(self, context: AgentContext):
+        self.context = AgentContext(context.task_id, deadline=context.deadline)
+        self.task_ids: List[str] = [context.task_id]
+        self.completed: Dict[str, Any] = {}
+        # Steps already checkpointed, per waiting task
+        self.saved: Dict[str, Set[str]] = {context.task_id: set()}
+    
+    def join(self, context: AgentContext):
+        self.task_ids.append(context.task_id)
+        self.saved[context.task_id] = set()
+        # The run lasts as long as its most patient waiter
+        if context.deadline is None or self.context.deadline is None:
+            self.context.deadline = None
+        else:
+            self.context.deadline = max(self.context.deadline, context.deadline)
+
+
+# Shared runs in flight, by task input key
+_shared_runs: Dict[str, _SharedRun] = {}
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, str):
+        return " ".join(value.split())
+    if isinstance(value, dict):
+        return {k: _normalize(v) for k, v in value.items() if v is not None}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    return value
+
+
+def task_input_key(input_data: Dict[str, Any]) -> str:
+    """Stable key for a task input, insensitive to key order and stray whitespace."""
+    # The deadline bounds how long a caller waits, not what the task produces
+    significant = {k: v for k, v in input_data.items() if k != "deadline_ms"}
+    canonical = json.dumps(_normalize(significant), sort_keys=True, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
 class TaskCoordinator(BaseAgent):
     """Orchestrates multiple agents to complete complex tasks."""
     
+    agent_name = "TaskCoordinator"
+    description = "Coordinates and manages task execution across multiple specialized agents."
+    capabilities = ["orchestration", "workflows", "streaming"]
+    input_schema = {
+        "type": "object",
+        "properties": {
+            "task_type": {
+                "type": "string",
+                "enum": ["full_analysis", "quick_research", "report_only", "custom"]
+            },
+            "topic": {"type": "string"},
+            "questions": {"type": "array", "items": {"type": "string"}},
+            "agents": {"type": "array", "items": {"type": "string"}}
+        },
+        "required": ["task_type", "topic"]
+    }
+    
     def __init__(self):
         super().__init__(
-            name="TaskCoordinator",
-            description="Coordinates and manages task execution across multiple specialized agents.",
+            name=self.agent_name,
+            description=self.description,
             llm_model="gpt-3.5-turbo"
         )
         
@@ -31,171 +111,314 @@ class TaskCoordinator(BaseAgent):
             "report": self.report_writer
         }
         
-    async def execute(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Execute a complete workflow with multiple agents."""
-        task_type = input_data.get("task_type", "full_analysis")
-        task_id = str(uuid.uuid4())
+        self.executor = WorkflowExecutor(max_concurrency=settings.workflow_max_concurrency)
+        
+    async def execute(self, input_data: Dict[str, Any], context: Optional[AgentContext] = None,
+                      task_id: Optional[str] = None, emit: Optional[EventCallback] = None,
+                      resume: bool = False, persist: bool = True) -> Dict[str, Any]:
+        """Execute a complete workflow with multiple agents.
         
-        # Set task ID for all agents
-        for agent in self.agents.values():
-            agent.set_task_id(task_id)
-        self.set_task_id(task_id)
+        When ``emit`` is given, agent-step events and streamed agent output
+        are passed to it as they are produced. With ``resume``, steps that
+        were checkpointed by an earlier attempt of the same task are skipped.
+        With ``persist=False`` the caller owns the ``TaskExecution`` row
+        (e.g. to write many of them in bulk).
+        """
+        task_type = input_data.get("task_type", "full_analysis")
+        task_id = task_id or (context.task_id if context else None) or str(uuid.uuid4())
         
-        # Log task start
-        self._create_task_record(task_id, task_type, input_data)
+        # Everything tied to this task travels in the context, so the
+        # coordinator and its agents can serve other tasks concurrently
+        if context is None or context.task_id != task_id:
+            context = AgentContext(task_id)
+        if context.deadline is None and input_data.get("deadline_ms"):
+            context.deadline = time.monotonic() + input_data["deadline_ms"] / 1000
+        context.task = asyncio.current_task()
         
-        self.log_action(
-            action="Starting task coordination",
-            reasoning=f"Executing {task_type} workflow",
-            metadata={"task_id": task_id, "input": input_data}
+        # LLM calls made for this task are scheduled under its priority and tenant
+        request_class = set_request_class(
+            input_data.get("priority", "interactive"), input_data.get("tenant", "default")
         )
         
-        try:
-            # Execute workflow based on task type
-            if task_type == "full_analysis":
-                result = await self._execute_full_analysis_workflow(input_data)
-            elif task_type == "quick_research":
-                result = await self._execute_quick_research_workflow(input_data)
-            elif task_type == "report_only":
-                result = await self._execute_report_only_workflow(input_data)
-            else:
-                result = await self._execute_custom_workflow(input_data)
+        with tracer.span("task", task_type, task_id=task_id) as span:
+            # Log task start
+            if persist:
+                await self._create_task_record(task_id, task_type, input_data, resume)
             
-            # Update task record
-            self._update_task_record(task_id, "completed", result)
+            async def record(status: str, output_data: Dict[str, Any]):
+                if persist:
+                    await self._update_task_record(task_id, status, output_data)
             
-            return {
-                "status": "success",
-                "task_id": task_id,
-                "task_type": task_type,
-                "results": result,
-                "execution_time": datetime.utcnow().isoformat()
-            }
+            self.log_action(
+                action="Starting task coordination",
+                reasoning=f"Executing {task_type} workflow",
+                metadata={"task_id": task_id, "input": input_data},
+                context=context
+            )
+            if emit:
+                await emit({"event": "task_started", "task_id": task_id, "task_type": task_type})
             
-        except Exception as e:
-            logger.error(f"Task coordination failed: {str(e)}")
-            self._update_task_record(task_id, "failed", {"error": str(e)})
-            return {
-                "status": "error",
-                "task_id": task_id,
-                "error": str(e)
-            }
-    
-    async def _execute_full_analysis_workflow(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Execute complete research -> analysis -> report workflow."""
-        workflow_results = {}
-        
-        # Step 1: Research
-        self.log_action(
-            action="Workflow step 1/3",
-            reasoning="Initiating research phase",
-            metadata={"step": "research"}
-        )
-        
-        research_input = {
-            "topic": input_data.get("topic"),
-            "questions": input_data.get("questions", [])
-        }
-        research_result = await self.research_agent.execute(research_input)
-        workflow_results["research"] = research_result
-        
-        if research_result["status"] != "success":
-            raise Exception("Research phase failed")
+            try:
+                # Whatever the agents are doing is abandoned once the deadline passes
+                result = await asyncio.wait_for(
+                    self._run_workflow(task_type, input_data, context, emit, resume),
+                    timeout=context.remaining()
+                )
+                
+                # Update task record; the checkpoints are no longer needed
+                await record("completed", result)
+                await self._clear_checkpoints(task_id)
+                
+                return {
+                    "status": "success",
+                    "task_id": task_id,
+                    "task_type": task_type,
+                    "results": result,
+                    "execution_time": datetime.utcnow().isoformat()
+                }
+                
+            except asyncio.TimeoutError:
+                error = f"Task deadline of {input_data.get('deadline_ms')}ms exceeded"
+                logger.warning(f"Task {task_id}: {error}")
+                span.fail(error)
+                await record("failed", {"error": error})
+                return {
+                    "status": "error",
+                    "task_id": task_id,
+                    "error": error
+                }
+            except asyncio.CancelledError:
+                logger.info(f"Task {task_id} cancelled")
+                await record("cancelled", {"error": "Task was cancelled"})
+                raise
+            except Exception as e:
+                logger.error(f"Task coordination failed: {str(e)}")
+                span.fail(e)
+                await record("failed", {"error": str(e)})
+                return {
+                    "status": "error",
+                    "task_id": task_id,
+                    "error": str(e)
+                }
+            finally:
+                # Summaries and other side work must not outlive the task
+                context.close()
+                reset_request_class(request_class)
+    
+    async def execute_stream(self, input_data: Dict[str, Any], context: Optional[AgentContext] = None,
+                             task_id: Optional[str] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Execute a workflow, yielding step events and report tokens as they arrive."""
+        queue: asyncio.Queue = asyncio.Queue()
+        done = object()
         
-        # Step 2: Analysis
-        self.log_action(
-            action="Workflow step 2/3",
-            reasoning="Initiating analysis phase",
-            metadata={"step": "analysis"}
-        )
+        runner = asyncio.ensure_future(self.execute(input_data, context, task_id=task_id, emit=queue.put))
+        runner.add_done_callback(lambda _: queue.put_nowait(done))
         
-        analysis_input = {
-            "research_findings": research_result.get("research_findings"),
-            "analysis_type": input_data.get("analysis_type", "comprehensive")
-        }
-        analysis_result = await self.analysis_agent.execute(analysis_input)
-        workflow_results["analysis"] = analysis_result
+        try:
+            while True:
+                event = await queue.get()
+                if event is done:
+                    break
+                yield event
+            
+            if runner.cancelled():
+                yield {"event": "task_cancelled", "task_id": task_id or (context.task_id if context else None)}
+                return
+            result = runner.result()
+            yield {"event": "task_completed", "task_id": result.get("task_id"), "data": result}
+        finally:
+            # Stop the workflow if the consumer goes away early
+            if not runner.done():
+                runner.cancel()
+    
+    async def _run_workflow(self, task_type: str, input_data: Dict[str, Any], context: AgentContext,
+                            emit: Optional[EventCallback] = None, resume: bool = False) -> Dict[str, Any]:
+        """Run the task's workflow, joining an identical run already in flight when possible."""
+        if emit is not None or resume or not settings.task_single_flight:
+            return await self._execute_workflow(task_type, input_data, context, emit, resume)
         
-        if analysis_result["status"] != "success":
-            raise Exception("Analysis phase failed")
+        key = task_input_key(input_data)
+        run = None
+        if task_flight.in_flight(key):
+            run = _shared_runs.get(key)
+            if run is not None:
+                run.join(context)
+        else:
+            run = _shared_runs[key] = _SharedRun(context)
         
-        # Step 3: Report Generation
-        self.log_action(
-            action="Workflow step 3/3",
-            reasoning="Initiating report generation",
-            metadata={"step": "report"}
+        result, shared = await task_flight.do(
+            key, lambda: self._execute_shared(key, run, task_type, input_data)
         )
+        if shared:
+            # The shared run's agent logs are filed under the task that started it
+            self.log_action(
+                action="Joined in-flight task",
+                reasoning="An identical task was already running; reusing its result",
+                metadata={"shared_with": run.context.task_id if run else None},
+                context=context
+            )
+        return result
+    
+    async def _execute_shared(self, key: str, run: _SharedRun, task_type: str,
+                              input_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Run a workflow on behalf of every task waiting on ``run``."""
+        async def checkpoint(node: WorkflowNode, result: Dict[str, Any]):
+            run.completed[node.name] = result
+            await self._save_shared_checkpoints(run)
         
-        report_input = {
-            "research_findings": research_result.get("research_findings"),
-            "analysis_results": analysis_result.get("analysis_results"),
-            "report_type": input_data.get("report_type", "comprehensive"),
-            "target_audience": input_data.get("target_audience", "executive")
-        }
-        report_result = await self.report_writer.execute(report_input)
-        workflow_results["report"] = report_result
-        
-        # Add workflow summary
-        workflow_results["summary"] = {
-            "total_agents_used": 3,
-            "workflow_complete": True,
-            "final_output": report_result.get("executive_summary", "")
-        }
-        
-        return workflow_results
+        try:
+            return await self._execute_workflow(task_type, input_data, run.context, on_step=checkpoint)
+        except BaseException:
+            # Tasks that joined after the last step still get resumable checkpoints
+            await asyncio.shield(self._save_shared_checkpoints(run))
+            raise
+        finally:
+            run.context.close()
+            if _shared_runs.get(key) is run:
+                del _shared_runs[key]
     
-    async def _execute_quick_research_workflow(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Execute research-only workflow."""
-        research_result = await self.research_agent.execute(input_data)
-        return {"research": research_result}
+    async def _save_shared_checkpoints(self, run: _SharedRun):
+        """Checkpoint every completed step for every waiter that lacks it."""
+        for task_id in list(run.task_ids):
+            for step, output in list(run.completed.items()):
+                if step not in run.saved[task_id]:
+                    run.saved[task_id].add(step)
+                    await self._save_checkpoint(task_id, step, output)
     
-    async def _execute_report_only_workflow(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Execute report generation from existing data."""
-        report_result = await self.report_writer.execute(input_data)
-        return {"report": report_result}
+    async def _run_agent(self, agent: BaseAgent, agent_input: Dict[str, Any], context: AgentContext,
+                         emit: Optional[EventCallback] = None) -> Dict[str, Any]:
+        """Run an agent, forwarding its streamed events when a listener is attached."""
+        with tracer.span("agent", agent.name, agent=agent.name) as span:
+            if emit is None:
+                result = await agent.execute(agent_input, context)
+            else:
+                result = {"status": "error", "error": "No result produced", "agent": agent.name}
+                async for event in agent.execute_stream(agent_input, context):
+                    await emit(event)
+                    if event.get("event") == "agent_completed":
+                        result = event["data"]
+            if result.get("status") == "error":
+                span.fail(result.get("error"))
+            return result
     
-    async def _execute_custom_workflow(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Execute custom workflow based on specified agents."""
-        workflow_results = {}
-        agents_to_use = input_data.get("agents", ["research"])
+    async def _run_node(self, graph: WorkflowGraph, node: WorkflowNode, node_input: Dict[str, Any],
+                        context: AgentContext, emit: Optional[EventCallback] = None) -> Dict[str, Any]:
+        """Run one workflow node on its agent, logging the step first."""
+        index = graph.order.index(node.name) + 1
+        self.log_action(
+            action=f"Workflow step {index}/{len(graph)}",
+            reasoning=f"Initiating {node.name} phase",
+            metadata={"step": node.name, "agent": node.agent},
+            context=context
+        )
+        if emit:
+            await emit({"event": "step", "step": node.name, "index": index, "total": len(graph)})
         
-        for agent_name in agents_to_use:
-            if agent_name in self.agents:
-                agent = self.agents[agent_name]
-                result = await agent.execute(input_data)
-                workflow_results[agent_name] = result
+        with tracer.span("step", node.name):
+            return await self._run_agent(self.agents[node.agent], node_input, context, emit)
+    
+    async def _execute_workflow(self, task_type: str, input_data: Dict[str, Any], context: AgentContext,
+                                emit: Optional[EventCallback] = None, resume: bool = False,
+                                on_step: Optional[Callable[[WorkflowNode, Dict[str, Any]], Awaitable[None]]] = None
+                                ) -> Dict[str, Any]:
+        """Run the workflow graph for a task type, parallelising independent steps.
         
-        return workflow_results
+        Every successful step is checkpointed as soon as it finishes, under
+        the context's task unless ``on_step`` handles it instead.
+        """
+        graph = build_workflow(task_type, input_data, available=list(self.agents))
+        completed = await self._load_checkpoints(context.task_id) if resume else {}
+        if completed:
+            self.log_action(
+                action="Resuming workflow",
+                reasoning=f"Skipping checkpointed steps: {', '.join(sorted(completed))}",
+                metadata={"steps": sorted(completed)},
+                context=context
+            )
+        
+        async def checkpoint(node: WorkflowNode, result: Dict[str, Any]):
+            await self._save_checkpoint(context.task_id, node.name, result)
+        
+        return await self.executor.run(
+            graph,
+            input_data,
+            lambda node, node_input: self._run_node(graph, node, node_input, context, emit),
+            completed=completed,
+            on_success=on_step or checkpoint
+        )
     
-    def _create_task_record(self, task_id: str, task_type: str, input_data: Dict[str, Any]):
-        """Create a new task execution record."""
+    async def _create_task_record(self, task_id: str, task_type: str, input_data: Dict[str, Any],
+                                  resume: bool = False):
+        """Create a new task execution record (or reopen it when resuming)."""
         try:
-            db = next(get_db())
-            task = TaskExecution(
-                task_id=task_id,
-                task_type=task_type,
-                status="in_progress",
-                input_data=input_data,
-                agents_involved=list(self.agents.keys())
-            )
-            db.add(task)
-            db.commit()
+            with tracer.span("db", "task_executions.create"):
+                async with AsyncSessionLocal() as db:
+                    if resume:
+                        reopened = await db.execute(
+                            update(TaskExecution)
+                            .where(TaskExecution.task_id == task_id)
+                            .values(status="in_progress", output_data=None, output_ref=None,
+                                    output_size=None, completed_at=None)
+                        )
+                        if reopened.rowcount:
+                            await db.commit()
+                            return
+                    task = TaskExecution(
+                        task_id=task_id,
+                        task_type=task_type,
+                        status="in_progress",
+                        input_data=input_data,
+                        agents_involved=list(self.agents.keys())
+                    )
+                    db.add(task)
+                    await db.commit()
         except Exception as e:
             logger.error(f"Failed to create task record: {e}")
-        finally:
-            db.close()
     
-    def _update_task_record(self, task_id: str, status: str, output_data: Dict[str, Any]):
+    async def _update_task_record(self, task_id: str, status: str, output_data: Dict[str, Any]):
         """Update task execution record."""
         try:
-            db = next(get_db())
-            task = db.query(TaskExecution).filter(TaskExecution.task_id == task_id).first()
-            if task:
-                task.status = status
-                task.output_data = output_data
-                task.completed_at = datetime.utcnow()
-                db.commit()
+            output = await offload_output(output_data)
+            with tracer.span("db", "task_executions.update"):
+                async with AsyncSessionLocal() as db:
+                    await db.execute(
+                        update(TaskExecution)
+                        .where(TaskExecution.task_id == task_id)
+                        .values(status=status, completed_at=datetime.utcnow(), **output)
+                    )
+                    await db.commit()
         except Exception as e:
             logger.error(f"Failed to update task record: {e}")
-        finally:
-            db.close()
+    
+    async def _load_checkpoints(self, task_id: str) -> Dict[str, Any]:
+        """Step outputs saved by earlier attempts of this task."""
+        try:
+            with tracer.span("db", "workflow_checkpoints.load"):
+                async with AsyncSessionLocal() as db:
+                    rows = await db.execute(
+                        select(WorkflowCheckpoint.step, WorkflowCheckpoint.output)
+                        .where(WorkflowCheckpoint.task_id == task_id)
+                    )
+                    return {step: output for step, output in rows}
+        except Exception as e:
+            logger.error(f"Failed to load checkpoints for {task_id}: {e}")
+            return {}
+    
+    async def _save_checkpoint(self, task_id: str, step: str, output: Dict[str, Any]):
+        """Persist one step's output."""
+        try:
+            with tracer.span("db", "workflow_checkpoints.save"):
+                async with AsyncSessionLocal() as db:
+                    db.add(WorkflowCheckpoint(task_id=task_id, step=step, output=output))
+                    await db.commit()
+        except Exception as e:
+            logger.error(f"Failed to checkpoint {step} for {task_id}: {e}")
+    
+    async def _clear_checkpoints(self, task_id: str):
+        try:
+            with tracer.span("db", "workflow_checkpoints.clear"):
+                async with AsyncSessionLocal() as db:
+                    await db.execute(delete(WorkflowCheckpoint).where(WorkflowCheckpoint.task_id == task_id))
+                    await db.commit()
+        except Exception as e:
+            logger.error(f"Failed to clear checkpoints for {task_id}: {e}")
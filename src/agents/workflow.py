@@ -0,0 +1,211 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+# Builds a node's agent input from the task input and upstream node results
+InputBuilder = Callable[[Dict[str, Any], Dict[str, Any]], Dict[str, Any]]
+
+# Runs one node: (node, node_input) -> agent result
+NodeRunner = Callable[["WorkflowNode", Dict[str, Any]], Awaitable[Dict[str, Any]]]
+
+# Called with each node that succeeded and its result, e.g. to checkpoint it
+NodeCallback = Callable[["WorkflowNode", Dict[str, Any]], Awaitable[None]]
+
+
+class WorkflowError(Exception):
+    """Raised when a workflow graph is invalid or a required step fails."""
+    pass
+
+
+class WorkflowNode:
+    """A single agent invocation in a workflow graph."""
+
+    def __init__(self, name: str, agent: str, build_input: Optional[InputBuilder] = None,
+                 depends_on: Sequence[str] = (), required: bool = True):
+        self.name = name
+        self.agent = agent
+        self.build_input = build_input or (lambda input_data, results: input_data)
+        self.depends_on = list(depends_on)
+        self.required = required
+
+
+class WorkflowGraph:
+    """Declarative DAG of agent invocations; edges are data dependencies."""
+
+    def __init__(self, name: str, nodes: List[WorkflowNode],
+                 finalize: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None):
+        self.name = name
+        self.nodes = {node.name: node for node in nodes}
+        self.finalize = finalize
+        self.order = self._topological_order()
+
+    def _topological_order(self) -> List[str]:
+        """Validate dependencies and return node names in a runnable order."""
+        for node in self.nodes.values():
+            for dependency in node.depends_on:
+                if dependency not in self.nodes:
+                    raise WorkflowError(f"Node '{node.name}' depends on unknown node '{dependency}'")
+
+        order: List[str] = []
+        visiting, visited = set(), set()
+
+        def visit(name: str):
+            if name in visited:
+                return
+            if name in visiting:
+                raise WorkflowError(f"Workflow '{self.name}' has a cycle at '{name}'")
+            visiting.add(name)
+            for dependency in self.nodes[name].depends_on:
+                visit(dependency)
+            visiting.discard(name)
+            visited.add(name)
+            order.append(name)
+
+        for name in self.nodes:
+            visit(name)
+        return order
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+
+class WorkflowExecutor:
+    """Runs every node as soon as its dependencies finish, up to a concurrency limit."""
+
+    def __init__(self, max_concurrency: int = 4):
+        self.max_concurrency = max_concurrency
+
+    async def run(self, graph: WorkflowGraph, input_data: Dict[str, Any], run_node: NodeRunner,
+                  completed: Optional[Dict[str, Any]] = None,
+                  on_success: Optional[NodeCallback] = None) -> Dict[str, Any]:
+        """Execute the graph and return results keyed by node name.
+        
+        Nodes already in ``completed`` (e.g. restored from checkpoints) are
+        not run again; their stored results feed downstream nodes.
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        results: Dict[str, Any] = {
+            name: result for name, result in (completed or {}).items() if name in graph.nodes
+        }
+        running: Dict[asyncio.Task, WorkflowNode] = {}
+        pending = [name for name in graph.order if name not in results]
+
+        async def run_one(node: WorkflowNode) -> Dict[str, Any]:
+            async with semaphore:
+                return await run_node(node, node.build_input(input_data, results))
+
+        try:
+            while pending or running:
+                # Launch everything whose dependencies have completed
+                for name in list(pending):
+                    node = graph.nodes[name]
+                    if all(dependency in results for dependency in node.depends_on):
+                        pending.remove(name)
+                        running[asyncio.ensure_future(run_one(node))] = node
+
+                if not running:
+                    raise WorkflowError(f"Workflow '{graph.name}' cannot make progress")
+
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    node = running.pop(task)
+                    result = task.result()
+                    results[node.name] = result
+                    if result.get("status") == "success":
+                        if on_success:
+                            await on_success(node, result)
+                    elif node.required:
+                        raise WorkflowError(f"{node.name.title()} phase failed")
+        finally:
+            for task in running:
+                task.cancel()
+
+        if graph.finalize:
+            results = graph.finalize(results)
+        return results
+
+
+def _full_analysis_summary(results: Dict[str, Any]) -> Dict[str, Any]:
+    results["summary"] = {
+        "total_agents_used": 3,
+        "workflow_complete": True,
+        "final_output": results["report"].get("executive_summary", "")
+    }
+    return results
+
+
+def full_analysis_workflow(input_data: Dict[str, Any]) -> WorkflowGraph:
+    """Research -> analysis -> report."""
+    return WorkflowGraph("full_analysis", [
+        WorkflowNode(
+            "research", "research",
+            lambda data, results: {
+                "topic": data.get("topic"),
+                "questions": data.get("questions", []),
+                "fan_out": data.get("fan_out", True),
+                "summarize": data.get("summarize", False),
+                "use_cache": data.get("use_cache", True)
+            }
+        ),
+        WorkflowNode(
+            "analysis", "analysis",
+            lambda data, results: {
+                "research_findings": results["research"].get("research_findings"),
+                "analysis_type": data.get("analysis_type", "comprehensive"),
+                "use_cache": data.get("use_cache", True)
+            },
+            depends_on=["research"]
+        ),
+        WorkflowNode(
+            "report", "report",
+            lambda data, results: {
+                "research_findings": results["research"].get("research_findings"),
+                "analysis_results": results["analysis"].get("analysis_results"),
+                "report_type": data.get("report_type", "comprehensive"),
+                "target_audience": data.get("target_audience", "executive"),
+                "use_cache": data.get("use_cache", True)
+            },
+            depends_on=["research", "analysis"],
+            required=False
+        )
+    ], finalize=_full_analysis_summary)
+
+
+def quick_research_workflow(input_data: Dict[str, Any]) -> WorkflowGraph:
+    """Research only."""
+    return WorkflowGraph("quick_research", [
+        WorkflowNode("research", "research", required=False)
+    ])
+
+
+def report_only_workflow(input_data: Dict[str, Any]) -> WorkflowGraph:
+    """Report generation from data supplied with the task."""
+    return WorkflowGraph("report_only", [
+        WorkflowNode("report", "report", required=False)
+    ])
+
+
+def custom_workflow(input_data: Dict[str, Any],
+                    available: Optional[Sequence[str]] = None) -> WorkflowGraph:
+    """The requested agents, run independently of each other."""
+    agents = input_data.get("agents", ["research"])
+    return WorkflowGraph("custom", [
+        WorkflowNode(name, name, required=False)
+        for name in dict.fromkeys(agents)
+        if available is None or name in available
+    ])
+
+
+PREDEFINED_WORKFLOWS: Dict[str, Callable[[Dict[str, Any]], WorkflowGraph]] = {
+    "full_analysis": full_analysis_workflow,
+    "quick_research": quick_research_workflow,
+    "report_only": report_only_workflow
+}
+
+
+def build_workflow(task_type: str, input_data: Dict[str, Any],
+                   available: Optional[Sequence[str]] = None) -> WorkflowGraph:
+    """Get the workflow graph for a task type; unknown types run a custom graph."""
+    builder = PREDEFINED_WORKFLOWS.get(task_type)
+    if builder is None:
+        return custom_workflow(input_data, available)
+    return builder(input_data)
@@ -1,25 +1,48 @@
-from fastapi import FastAPI, HTTPException, BackgroundTasks, Depends
+from fastapi import FastAPI, HTTPException, Depends, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, insert, update, bindparam, and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
 import asyncio
-from typing import List, Dict, Any
+from typing import List, Dict, Any, AsyncIterator, Optional, Tuple, Type
 from datetime import datetime
+import base64
+import json
+import math
+import uuid
+from pydantic import BaseModel, ValidationError
 
 from src.api.models import (
     TaskRequest, TaskResponse, AgentInfo, 
     TaskStatus, HealthCheck, IntegrationRequest, 
-    IntegrationResponse
+    IntegrationResponse, StreamSession, TaskSubmission
 )
 from src.agents.agent_factory import AgentFactory
-from src.core.database import get_db, TaskExecution
+from src.agents.base_agent import AgentContext
+from src.agents.task_coordinator import task_flight
+from src.core.database import get_async_db, AsyncSessionLocal, TaskExecution, init_db, dispose_engines
 from src.core.logger import logger
 from src.core.config import settings
+from src.core.ollama_client import close_http_client, llm_flight
+from src.core.llm_cache import get_llm_cache
+from src.core.task_queue import TaskQueue, TaskJob, QueueFullError
+from src.core.task_registry import TaskRegistry
+from src.core.llm_scheduler import llm_scheduler, AdmissionRejected
+from src.core.log_sink import log_sink
+from src.core.health import readiness_probe
+from src.core.metrics import metrics
+from src.core.tracing import tracer
+from src.core.serialization import FastJSONResponse, dumps_async, json_response
+from src.core.loop_monitor import loop_monitor
+from src.core.blob_store import get_blob_store, load_output, offload_output
+from src.core.retention import retention_job
 
 # Create FastAPI app
 app = FastAPI(
     title="Multi-Agent AI System",
     description="Production-ready multi-agent system for automated task execution",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=FastJSONResponse
 )
 
 # Add CORS middleware
@@ -29,18 +52,130 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
-# Store running tasks
-running_tasks: Dict[str, Any] = {}
+# Running tasks' contexts plus a bounded cache of recent results
+task_registry = TaskRegistry(
+    max_results=settings.task_registry_max_results,
+    max_bytes=settings.task_registry_max_bytes,
+    ttl=settings.task_registry_ttl,
+    max_pending=settings.stream_pending_max,
+    pending_ttl=settings.stream_pending_ttl
+)
+
+def _finished_task(task_id: str, input_data: Dict[str, Any], created_at: datetime,
+                   result: Dict[str, Any]) -> Dict[str, Any]:
+    """Registry entry mirroring the task's database row."""
+    succeeded = result.get("status") == "success"
+    return {
+        "task_id": task_id,
+        "status": "completed" if succeeded else "failed",
+        "created_at": created_at,
+        "completed_at": datetime.utcnow(),
+        "input_data": input_data,
+        "output_data": result.get("results") if succeeded else {"error": result.get("error")}
+    }
+
+async def _run_queued_task(task_id: str, input_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Execute a queued task on a worker."""
+    job = task_queue.get(task_id)
+    context = AgentContext(task_id, deadline=job.deadline if job else None)
+    task_registry.add_live(task_id, context)
+    try:
+        async with AgentFactory.lease("coordinator") as coordinator:
+            result = await coordinator.execute(
+                input_data, context,
+                resume=job.resume if job else False,
+                persist=job.persist if job else True
+            )
+    except BaseException:
+        task_registry.discard(task_id)
+        raise
+    created_at = job.created_at if job else datetime.utcnow()
+    task_registry.complete(task_id, _finished_task(task_id, input_data, created_at, result))
+    logger.info(f"Task {task_id} finished with status {result.get('status')}")
+    return result
+
+# Bounded worker pool shared by every task submission
+task_queue = TaskQueue(
+    runner=_run_queued_task,
+    workers=settings.task_workers,
+    max_size=settings.task_queue_max_size
+)
 
 @app.on_event("startup")
 async def startup_event():
     """Initialize services on startup."""
     logger.info("Multi-Agent AI System starting up...")
     logger.info(f"Environment: {settings.app_env}")
+    await asyncio.to_thread(init_db)
+    tracer.start_export(settings.trace_export_file)
+    await loop_monitor.start()
+    await log_sink.start()
+    await task_queue.start()
+    await _recover_interrupted_tasks()
+    await retention_job.start()
     logger.info("All systems initialized successfully!")
 
+async def _recover_interrupted_tasks():
+    """Deal with tasks a previous process left in_progress when it died.
+    
+    With ``RECOVER_INTERRUPTED_TASKS=requeue`` they are resumed from their
+    checkpoints; with ``fail`` they are marked failed. Use ``off`` when
+    several replicas share one database.
+    """
+    mode = settings.recover_interrupted_tasks
+    if mode == "off":
+        return
+    
+    async with AsyncSessionLocal() as db:
+        rows = (await db.execute(
+            select(TaskExecution.task_id, TaskExecution.input_data)
+            .where(TaskExecution.status == "in_progress")
+        )).all()
+        
+        failed = []
+        for task_id, input_data in rows:
+            if mode == "requeue":
+                try:
+                    await task_queue.submit(
+                        task_id, input_data or {}, deadline_ms=(input_data or {}).get("deadline_ms"), resume=True
+                    )
+                    continue
+                except QueueFullError:
+                    pass
+            failed.append(task_id)
+        
+        if failed:
+            with tracer.span("db", "task_executions.fail_interrupted", rows=len(failed)):
+                await db.execute(
+                    update(TaskExecution)
+                    .where(TaskExecution.task_id.in_(failed))
+                    .values(
+                        status="failed",
+                        output_data={"error": "Interrupted by a restart"},
+                        completed_at=datetime.utcnow()
+                    )
+                )
+                await db.commit()
+    
+    if rows:
+        logger.info(f"Recovered {len(rows)} interrupted tasks: "
+                    f"{len(rows) - len(failed)} requeued, {len(failed)} failed")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release shared resources on shutdown."""
+    await retention_job.stop()
+    await task_queue.stop()
+    await log_sink.stop()
+    await close_http_client()
+    await dispose_engines()
+    await loop_monitor.stop()
+    tracer.shutdown()
+    logger.info("Multi-Agent AI System shut down.")
+
 @app.get("/", response_model=HealthCheck)
 async def root():
     """Root endpoint with health check."""
@@ -58,24 +193,12 @@ async def root():
 @app.get("/health", response_model=HealthCheck)
 async def health_check():
     """Detailed health check endpoint."""
-    services_status = {}
-    
-    # Check database
-    try:
-        db = next(get_db())
-        from sqlalchemy import text
-        db.execute(text("SELECT 1"))
-        services_status["database"] = "healthy"
-    except Exception as e:
-        services_status["database"] = f"unhealthy: {str(e)}"
-    finally:
-        if 'db' in locals():
-            db.close()
-
+    readiness = await readiness_probe.check()
+    services_status = dict(readiness["services"])
     
     # Check agents
     try:
-        AgentFactory.get_available_agents()
+        AgentFactory.get_agent_metadata()
         services_status["agents"] = "healthy"
     except Exception as e:
         services_status["agents"] = f"unhealthy: {str(e)}"
@@ -90,82 +213,520 @@ async def health_check():
         services=services_status
     )
 
+@app.get("/health/live")
+async def liveness():
+    """Liveness probe: the process is up and serving requests."""
+    return {"status": "alive"}
+
+@app.get("/health/ready", response_model=HealthCheck)
+async def readiness(response: Response):
+    """Readiness probe: database and Ollama reachable (cached for a short TTL)."""
+    result = await readiness_probe.check()
+    if not result["ready"]:
+        response.status_code = 503
+    return HealthCheck(
+        status="ready" if result["ready"] else "not_ready",
+        timestamp=datetime.utcnow().isoformat(),
+        version="1.0.0",
+        services=result["services"]
+    )
+
 @app.get("/agents", response_model=List[AgentInfo])
 async def list_agents():
     """List all available agents."""
-    agents = AgentFactory.get_available_agents()
     return [
-        AgentInfo(name=name, description=desc) 
-        for name, desc in agents.items()
+        AgentInfo(**{**meta, "name": name})
+        for name, meta in AgentFactory.get_agent_metadata().items()
     ]
 
+def _shape(model: Type[BaseModel], data: Dict[str, Any]) -> Dict[str, Any]:
+    """The fields of ``model`` taken from ``data``, without validating or copying values.
+    
+    Large results are returned through :func:`json_response` in this shape
+    instead of being rebuilt and re-encoded by Pydantic on the event loop.
+    """
+    return {
+        name: data.get(name, None if field.is_required() else field.default)
+        for name, field in model.model_fields.items()
+    }
+
+def _admit(task_request: TaskRequest):
+    """Fail fast with 429 when the LLM backlog would blow the task's wait deadline."""
+    try:
+        llm_scheduler.admit(task_request.priority)
+    except AdmissionRejected as e:
+        logger.warning(f"Rejected {task_request.priority} task for tenant {task_request.tenant}: {e}")
+        raise HTTPException(
+            status_code=429,
+            detail=str(e),
+            headers={"Retry-After": str(math.ceil(e.retry_after))}
+        )
+
 @app.post("/tasks/execute", response_model=TaskResponse)
-async def execute_task(
-    task_request: TaskRequest,
-    background_tasks: BackgroundTasks
-):
-    """Execute a task using the multi-agent system."""
+async def execute_task(task_request: TaskRequest):
+    """Execute a task using the multi-agent system and wait for the result."""
     logger.info(f"Received task request: {task_request.task_type}")
+    _admit(task_request)
     
     try:
-        # Create coordinator
-        coordinator = AgentFactory.create_coordinator()
-        
-        # Prepare input data
-        input_data = task_request.model_dump()
-        
-        # Execute task
-        result = await coordinator.execute(input_data)
-        
-        # Store task info
-        task_id = result.get("task_id")
-        running_tasks[task_id] = result
-        
-        logger.info(f"Task {task_id} completed successfully")
+        # Run through the worker pool so inline requests share its limit
+        job = await task_queue.submit(
+            str(uuid.uuid4()), task_request.model_dump(), deadline_ms=task_request.deadline_ms
+        )
+        try:
+            result = await asyncio.shield(job.future)
+        except asyncio.CancelledError:
+            if not job.future.cancelled():
+                # The caller went away; stop the work it was waiting for
+                task_queue.cancel(job.task_id)
+                raise
+            result = {"status": "cancelled", "task_id": job.task_id, "error": "Task was cancelled"}
         
-        return TaskResponse(**result)
+        return await json_response(_shape(TaskResponse, result))
         
+    except QueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         logger.error(f"Task execution failed: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/tasks/{task_id}", response_model=TaskStatus)
-async def get_task_status(task_id: str, db: Session = Depends(get_db)):
-    """Get status of a specific task."""
-    task = db.query(TaskExecution).filter(TaskExecution.task_id == task_id).first()
+@app.post("/tasks", response_model=TaskSubmission, status_code=202)
+async def submit_task(task_request: TaskRequest):
+    """Queue a task for background execution and return its ID immediately."""
+    _admit(task_request)
+    task_id = str(uuid.uuid4())
     
-    if not task:
+    try:
+        await task_queue.submit(task_id, task_request.model_dump(), deadline_ms=task_request.deadline_ms)
+    except QueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    
+    logger.info(f"Queued task {task_id}: {task_request.task_type}")
+    return TaskSubmission(
+        task_id=task_id,
+        status="queued",
+        queue_position=task_queue.position(task_id),
+        status_url=f"/tasks/{task_id}"
+    )
+
+def _parse_batch(body: bytes, content_type: str) -> List[TaskRequest]:
+    """Parse a JSON array (or ``{"tasks": [...]}``) or NDJSON body into task requests."""
+    try:
+        if "ndjson" in content_type or "jsonl" in content_type:
+            items = [json.loads(line) for line in body.decode("utf-8").splitlines() if line.strip()]
+        else:
+            items = json.loads(body)
+            if isinstance(items, dict):
+                items = items.get("tasks")
+    except (ValueError, UnicodeDecodeError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid batch body: {e}")
+    
+    if not isinstance(items, list) or not items:
+        raise HTTPException(status_code=400, detail="Batch must contain at least one task")
+    if len(items) > settings.batch_max_tasks:
+        raise HTTPException(status_code=413, detail=f"Batch exceeds {settings.batch_max_tasks} tasks")
+    
+    task_requests, errors = [], []
+    for index, item in enumerate(items):
+        try:
+            task_requests.append(TaskRequest.model_validate(item))
+        except ValidationError as e:
+            errors.append({"index": index, "errors": json.loads(e.json(include_url=False))})
+    if errors:
+        raise HTTPException(status_code=422, detail=errors)
+    return task_requests
+
+def _batch_row(task_id: str, result: Dict[str, Any]) -> Dict[str, Any]:
+    """Final column values for one batch task, as the coordinator would write them."""
+    status = {"success": "completed", "cancelled": "cancelled"}.get(result.get("status"), "failed")
+    return {
+        "b_task_id": task_id,
+        "b_status": status,
+        "b_output_data": result.get("results") if status == "completed" else {"error": result.get("error")},
+        "b_completed_at": datetime.utcnow()
+    }
+
+async def _insert_batch_rows(task_ids: List[str], task_requests: List[TaskRequest]):
+    """Create every task row of a batch in one INSERT."""
+    now = datetime.utcnow()
+    with tracer.span("db", "task_executions.batch_insert", rows=len(task_ids)):
+        async with AsyncSessionLocal() as db:
+            await db.execute(insert(TaskExecution), [
+                {
+                    "task_id": task_id,
+                    "task_type": task_request.task_type,
+                    "status": "in_progress",
+                    "input_data": task_request.model_dump(),
+                    "created_at": now
+                }
+                for task_id, task_request in zip(task_ids, task_requests)
+            ])
+            await db.commit()
+
+async def _finish_batch_rows(rows: List[Dict[str, Any]]):
+    """Write the outcome of many batch tasks with a single executemany UPDATE."""
+    if not rows:
+        return
+    table = TaskExecution.__table__
+    statement = (
+        table.update()
+        .where(table.c.task_id == bindparam("b_task_id"))
+        .values(
+            status=bindparam("b_status"),
+            output_data=bindparam("b_output_data"),
+            output_ref=bindparam("b_output_ref"),
+            output_size=bindparam("b_output_size"),
+            completed_at=bindparam("b_completed_at")
+        )
+    )
+    outputs = await asyncio.gather(*(offload_output(row["b_output_data"]) for row in rows))
+    for row, output in zip(rows, outputs):
+        row["b_output_data"] = output["output_data"]
+        row["b_output_ref"] = output["output_ref"]
+        row["b_output_size"] = output["output_size"]
+    try:
+        with tracer.span("db", "task_executions.batch_update", rows=len(rows)):
+            async with AsyncSessionLocal() as db:
+                await db.execute(statement, rows)
+                await db.commit()
+    except Exception as e:
+        logger.error(f"Failed to record {len(rows)} batch results: {e}")
+
+def _job_outcome(job: TaskJob) -> Dict[str, Any]:
+    if job.future.cancelled():
+        return {"status": "cancelled", "task_id": job.task_id, "error": "Task was cancelled"}
+    if job.future.exception() is not None:
+        return {"status": "error", "task_id": job.task_id, "error": str(job.future.exception())}
+    return job.future.result()
+
+async def _run_batch(task_ids: List[str], task_requests: List[TaskRequest],
+                     concurrency: int) -> AsyncIterator[str]:
+    """Feed a batch through the worker pool, yielding NDJSON results as they finish."""
+    running: Dict[asyncio.Future, Tuple[int, TaskJob]] = {}
+    unfinished = set(range(len(task_requests)))
+    next_index = 0
+    rows: List[Dict[str, Any]] = []
+    
+    try:
+        while unfinished:
+            # At most `concurrency` of this batch's tasks hold worker-pool slots
+            while next_index < len(task_requests) and len(running) < concurrency:
+                task_request = task_requests[next_index]
+                try:
+                    job = await task_queue.submit(
+                        task_ids[next_index], task_request.model_dump(),
+                        deadline_ms=task_request.deadline_ms, persist=False
+                    )
+                except QueueFullError as e:
+                    if running:
+                        break  # retry once one of ours finishes
+                    # Nothing of ours will free a slot; the response has started, so
+                    # report the tasks that could not be scheduled line by line
+                    for index in range(next_index, len(task_requests)):
+                        outcome = {"status": "error", "task_id": task_ids[index], "error": str(e)}
+                        unfinished.discard(index)
+                        rows.append(_batch_row(task_ids[index], outcome))
+                        yield await dumps_async({"index": index, **outcome}) + b"\n"
+                    next_index = len(task_requests)
+                    break
+                running[job.future] = (next_index, job)
+                next_index += 1
+            if not running:
+                break
+            
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                index, job = running.pop(future)
+                unfinished.discard(index)
+                outcome = _job_outcome(job)
+                rows.append(_batch_row(job.task_id, outcome))
+                yield await dumps_async({"index": index, **outcome}) + b"\n"
+            
+            if len(rows) >= settings.batch_write_size:
+                await _finish_batch_rows(rows)
+                rows = []
+    finally:
+        # Client went away or the pool rejected us: stop whatever is left
+        for _, job in running.values():
+            task_queue.cancel(job.task_id)
+        for index in unfinished:
+            rows.append(_batch_row(task_ids[index], {"status": "cancelled"}))
+        await _finish_batch_rows(rows)
+
+@app.post("/tasks/batch")
+async def execute_batch(request: Request, concurrency: Optional[int] = Query(None, ge=1)):
+    """Run many tasks in one request, streaming results as NDJSON as each finishes.
+    
+    The body is a JSON array of task requests or NDJSON (one request per
+    line). Rows for the whole batch are inserted up front and results are
+    written back in bulk. Each result line carries the task's ``index``
+    in the batch.
+    """
+    task_requests = _parse_batch(await request.body(), request.headers.get("content-type", ""))
+    # One admission check per priority class is enough to shed an overloaded batch
+    for task_request in {r.priority: r for r in task_requests}.values():
+        _admit(task_request)
+    # Fail fast, before the 200 goes out, when the pool cannot take even the first task
+    if task_queue.free_slots() < 1:
+        raise HTTPException(status_code=503, detail=f"Task queue is full ({task_queue.max_size} jobs)")
+    
+    task_ids = [str(uuid.uuid4()) for _ in task_requests]
+    await _insert_batch_rows(task_ids, task_requests)
+    limit = min(concurrency or settings.batch_max_concurrency, settings.batch_max_concurrency)
+    logger.info(f"Running batch of {len(task_requests)} tasks with concurrency {limit}")
+    
+    return StreamingResponse(
+        _run_batch(task_ids, task_requests, limit),
+        media_type="application/x-ndjson",
+        headers={"X-Batch-Size": str(len(task_requests))}
+    )
+
+@app.post("/tasks/{task_id}/resume", response_model=TaskSubmission, status_code=202)
+async def resume_task(task_id: str, db: AsyncSession = Depends(get_async_db)):
+    """Re-run a failed, cancelled or interrupted task, skipping checkpointed steps."""
+    task = (await db.execute(
+        select(TaskExecution.status, TaskExecution.input_data).where(TaskExecution.task_id == task_id)
+    )).first()
+    if task is None:
         raise HTTPException(status_code=404, detail="Task not found")
+    if task.status == "completed":
+        raise HTTPException(status_code=409, detail="Task already completed")
+    if task_queue.get(task_id) is not None or task_registry.get_live(task_id) is not None:
+        raise HTTPException(status_code=409, detail="Task is already queued or running")
+    
+    input_data = task.input_data or {}
+    try:
+        await task_queue.submit(task_id, input_data, deadline_ms=input_data.get("deadline_ms"), resume=True)
+    except QueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     
-    return TaskStatus(
-        task_id=task.task_id,
-        status=task.status,
-        created_at=task.created_at,
-        completed_at=task.completed_at,
-        input_data=task.input_data,
-        output_data=task.output_data
+    task_registry.discard(task_id)
+    logger.info(f"Resuming task {task_id}")
+    return TaskSubmission(
+        task_id=task_id,
+        status="queued",
+        queue_position=task_queue.position(task_id),
+        status_url=f"/tasks/{task_id}"
     )
 
-@app.get("/tasks", response_model=List[TaskStatus])
-async def list_tasks(
-    skip: int = 0,
-    limit: int = 10,
-    db: Session = Depends(get_db)
+@app.post("/tasks/stream", response_model=StreamSession)
+async def create_stream_task(task_request: TaskRequest):
+    """Register a task whose progress is consumed from the SSE stream endpoint."""
+    _admit(task_request)
+    task_id = str(uuid.uuid4())
+    task_registry.add_pending(task_id, task_request)
+    logger.info(f"Registered streaming task {task_id}: {task_request.task_type}")
+    
+    return StreamSession(task_id=task_id, stream_url=f"/tasks/{task_id}/stream")
+
+async def _format_sse(event: Dict[str, Any]) -> str:
+    """Encode a workflow event as a Server-Sent Events message."""
+    data = (await dumps_async(event)).decode("utf-8")
+    return f"event: {event.get('event', 'message')}\ndata: {data}\n\n"
+
+@app.get("/tasks/{task_id}/stream")
+async def stream_task(task_id: str):
+    """Run a registered task, streaming agent steps and report tokens as SSE."""
+    task_request = task_registry.take_pending(task_id)
+    if task_request is None:
+        if task_registry.pending_expired(task_id):
+            raise HTTPException(status_code=410, detail="Streaming task expired before its stream was opened")
+        raise HTTPException(status_code=404, detail="Streaming task not found")
+    
+    async def event_source() -> AsyncIterator[str]:
+        context = AgentContext(task_id)
+        created_at = datetime.utcnow()
+        input_data = task_request.model_dump()
+        task_registry.add_live(task_id, context)
+        try:
+            # Hold the pooled coordinator only while the stream is being consumed
+            async with AgentFactory.lease("coordinator") as coordinator:
+                async for event in coordinator.execute_stream(input_data, context):
+                    if event.get("event") == "task_completed":
+                        task_registry.complete(
+                            task_id, _finished_task(task_id, input_data, created_at, event["data"])
+                        )
+                    yield await _format_sse(event)
+        finally:
+            if task_registry.get_live(task_id) is context:
+                task_registry.discard(task_id)
+    
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+# Extras that GET /tasks/{task_id} loads only when asked through ?include=
+TASK_INCLUDES = ("output",)
+
+@app.get("/tasks/{task_id}", response_model=TaskStatus)
+async def get_task_status(
+    task_id: str,
+    include: Optional[str] = Query(None, description="Comma-separated extras to load: output"),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """List recent tasks."""
-    tasks = db.query(TaskExecution).offset(skip).limit(limit).all()
+    """Get status of a specific task.
     
-    return [
-        TaskStatus(
-            task_id=task.task_id,
-            status=task.status,
-            created_at=task.created_at,
-            completed_at=task.completed_at,
-            input_data=task.input_data,
-            output_data=task.output_data
+    ``output_data`` is left out unless ``include=output`` is given; large
+    outputs live in the blob store and are only read for such requests.
+    """
+    includes = {i.strip() for i in include.split(",") if i.strip()} if include else set()
+    unknown = sorted(includes - set(TASK_INCLUDES))
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown includes: {', '.join(unknown)}")
+    with_output = "output" in includes
+    
+    job = task_queue.get(task_id)
+    if job is not None:
+        return TaskStatus(
+            task_id=task_id,
+            status=job.status,
+            created_at=job.created_at,
+            input_data=job.input_data,
+            queue_position=task_queue.position(task_id)
         )
-        for task in tasks
+    
+    recent = task_registry.get_result(task_id)
+    if recent is not None:
+        if not with_output:
+            recent = {**recent, "output_data": None}
+        return await json_response(_shape(TaskStatus, recent))
+    
+    columns = [
+        TaskExecution.task_id, TaskExecution.status, TaskExecution.created_at,
+        TaskExecution.completed_at, TaskExecution.input_data,
+        TaskExecution.output_ref, TaskExecution.output_size
     ]
+    if with_output:
+        columns.append(TaskExecution.output_data)
+    task = (await db.execute(
+        select(*columns).where(TaskExecution.task_id == task_id)
+    )).first()
+    
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+    
+    return await json_response(_shape(TaskStatus, {
+        "task_id": task.task_id,
+        "status": task.status,
+        "created_at": task.created_at,
+        "completed_at": task.completed_at,
+        "input_data": task.input_data,
+        "output_data": await load_output(task.output_data, task.output_ref) if with_output else None,
+        "output_size": task.output_size
+    }))
+
+# Columns selectable through ?fields= on the task listing
+TASK_LIST_FIELDS = (
+    "task_id", "task_type", "status", "created_at", "completed_at",
+    "agents_involved", "error_message", "input_data", "output_data", "output_size"
+)
+TASK_LIST_DEFAULT_FIELDS = ("task_id", "task_type", "status", "created_at", "completed_at")
+
+def _encode_cursor(created_at: datetime, row_id: int) -> str:
+    raw = json.dumps([created_at.isoformat(), row_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(created_at), int(row_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+@app.get("/tasks")
+async def list_tasks(
+    limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header"),
+    status: Optional[str] = None,
+    task_type: Optional[str] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """List tasks, newest first, using keyset pagination.
+    
+    Only summary columns are loaded unless ``fields`` asks for more. When
+    more rows exist, the cursor for the next page is returned in the
+    ``X-Next-Cursor`` header.
+    """
+    selected = [f.strip() for f in fields.split(",") if f.strip()] if fields else list(TASK_LIST_DEFAULT_FIELDS)
+    unknown = [f for f in selected if f not in TASK_LIST_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    
+    columns = [getattr(TaskExecution, f) for f in selected]
+    with_output = "output_data" in selected
+    if with_output:
+        # Offloaded outputs are NULL in output_data; the reference says where they are
+        columns.append(TaskExecution.output_ref)
+    query = select(TaskExecution.id, TaskExecution.created_at, *columns)
+    
+    if status:
+        query = query.where(TaskExecution.status == status)
+    if task_type:
+        query = query.where(TaskExecution.task_type == task_type)
+    if created_after:
+        query = query.where(TaskExecution.created_at >= created_after)
+    if created_before:
+        query = query.where(TaskExecution.created_at < created_before)
+    if cursor:
+        cursor_created_at, cursor_id = _decode_cursor(cursor)
+        query = query.where(or_(
+            TaskExecution.created_at < cursor_created_at,
+            and_(TaskExecution.created_at == cursor_created_at, TaskExecution.id < cursor_id)
+        ))
+    
+    # Fetch one extra row to know whether another page exists
+    query = query.order_by(TaskExecution.created_at.desc(), TaskExecution.id.desc()).limit(limit + 1)
+    rows = (await db.execute(query)).all()
+    
+    headers = {}
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        headers["X-Next-Cursor"] = _encode_cursor(last[1], last[0])
+        rows = rows[:limit]
+    
+    items = [{field: row[index + 2] for index, field in enumerate(selected)} for row in rows]
+    if with_output:
+        outputs = await asyncio.gather(*(load_output(item["output_data"], row[-1])
+                                         for item, row in zip(items, rows)))
+        for item, output in zip(items, outputs):
+            item["output_data"] = output
+    
+    # output_data can be large when requested, so encode off the loop if needed
+    return await json_response(items, headers=headers)
+
+@app.get("/stats")
+async def get_stats():
+    """Runtime counters for internal components."""
+    cache = get_llm_cache()
+    blob_store = get_blob_store()
+    return {
+        "llm_cache": cache.stats() if cache else {"enabled": False},
+        "task_queue": task_queue.stats(),
+        "task_registry": task_registry.stats(),
+        "agent_log_sink": log_sink.stats(),
+        "agent_pool": AgentFactory.pool_stats(),
+        "llm_scheduler": llm_scheduler.stats(),
+        "tracing": tracer.stats(),
+        "event_loop": loop_monitor.stats(),
+        "blob_store": blob_store.stats() if blob_store else {"enabled": False},
+        "retention": retention_job.stats(),
+        "single_flight": {
+            "tasks": task_flight.stats(),
+            "llm": llm_flight.stats()
+        }
+    }
+
+@app.get("/metrics")
+async def get_metrics():
+    """Prometheus text exposition of span latencies, in-flight counts, errors and tokens."""
+    # Expire aged cache and pending entries so the registry gauges are current
+    task_registry.stats()
+    return Response(content=metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
 
 @app.post("/integrations/execute", response_model=IntegrationResponse)
 async def execute_integration(integration_request: IntegrationRequest):
@@ -182,12 +743,40 @@ async def execute_integration(integration_request: IntegrationRequest):
 
 @app.delete("/tasks/{task_id}")
 async def cancel_task(task_id: str):
-    """Cancel a running task."""
-    if task_id in running_tasks:
-        del running_tasks[task_id]
-        return {"message": f"Task {task_id} cancelled"}
-    else:
-        raise HTTPException(status_code=404, detail="Task not found")
+    """Cancel a queued or running task, aborting its in-flight LLM calls."""
+    job = task_queue.get(task_id)
+    cancelled_from = task_queue.cancel(task_id)
+    if cancelled_from == "queued":
+        # Never started, so nothing has recorded it yet (batch rows are written by the batch)
+        if job.persist:
+            await _record_cancelled_task(task_id, job.input_data)
+    elif cancelled_from is None:
+        context = task_registry.get_live(task_id)
+        if context is not None and context.cancel():
+            cancelled_from = "in_progress"
+        elif task_registry.take_pending(task_id) is not None:
+            cancelled_from = "queued"
+        else:
+            raise HTTPException(status_code=404, detail="Task not found or already finished")
+    
+    task_registry.discard(task_id)
+    logger.info(f"Cancelled task {task_id} ({cancelled_from})")
+    return {"message": f"Task {task_id} cancelled", "previous_status": cancelled_from}
+
+async def _record_cancelled_task(task_id: str, input_data: Dict[str, Any]):
+    try:
+        with tracer.span("db", "task_executions.create", task_id=task_id):
+            async with AsyncSessionLocal() as db:
+                db.add(TaskExecution(
+                    task_id=task_id,
+                    task_type=input_data.get("task_type"),
+                    status="cancelled",
+                    input_data=input_data,
+                    completed_at=datetime.utcnow()
+                ))
+                await db.commit()
+    except Exception as e:
+        logger.error(f"Failed to record cancelled task {task_id}: {e}")
 
 # Error handlers
 @app.exception_handler(Exception)
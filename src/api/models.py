@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Literal
 from datetime import datetime
 
 class TaskRequest(BaseModel):
@@ -11,6 +11,12 @@ class TaskRequest(BaseModel):
     report_type: str = Field(default="executive_summary", description="Type of report to generate")
     target_audience: str = Field(default="general", description="Target audience for the report")
     agents: List[str] = Field(default=[], description="Specific agents to use (for custom workflow)")
+    use_cache: bool = Field(default=True, description="Serve identical LLM prompts from the response cache")
+    fan_out: bool = Field(default=True, description="Research each question with its own concurrent LLM call")
+    summarize: bool = Field(default=False, description="Summarise per-question answers with a final LLM call")
+    priority: Literal["interactive", "batch"] = Field(default="interactive", description="LLM scheduling class")
+    tenant: str = Field(default="default", description="Tenant for fair sharing of LLM capacity")
+    deadline_ms: Optional[int] = Field(default=None, ge=1, description="Give up on the task after this many milliseconds")
     
     class Config:
         json_schema_extra = {
@@ -36,10 +42,24 @@ class TaskResponse(BaseModel):
     error: Optional[str] = None
     execution_time: Optional[str] = None
 
+class TaskSubmission(BaseModel):
+    """Acknowledgement for a task accepted onto the queue."""
+    task_id: str
+    status: str
+    queue_position: Optional[int] = None
+    status_url: str
+
+class StreamSession(BaseModel):
+    """A registered streaming task, ready to be consumed over SSE."""
+    task_id: str
+    stream_url: str
+
 class AgentInfo(BaseModel):
     """Information about an available agent."""
     name: str
     description: str
+    capabilities: List[str] = []
+    input_schema: Dict[str, Any] = {}
 
 class TaskStatus(BaseModel):
     """Task execution status."""
@@ -49,6 +69,8 @@ class TaskStatus(BaseModel):
     completed_at: Optional[datetime] = None
     input_data: Dict[str, Any]
     output_data: Optional[Dict[str, Any]] = None
+    output_size: Optional[int] = None
+    queue_position: Optional[int] = None
 
 class HealthCheck(BaseModel):
     """Health check response."""
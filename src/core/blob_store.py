@@ -0,0 +1,264 @@
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional
+from src.core.config import settings
+from src.core.logger import logger
+from src.core.serialization import dumps_async
+
+try:
+    import zstandard
+except ImportError:  # zstd is optional; gzip is always available
+    zstandard = None
+
+_GZIP_MAGIC = b"\x1f\x8b"
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+def compress(data: bytes, codec: str = "auto") -> bytes:
+    """Compress with zstd when available (or asked for), gzip otherwise."""
+    if codec in ("auto", "zstd") and zstandard is not None:
+        return zstandard.ZstdCompressor(level=3).compress(data)
+    if codec == "zstd":
+        logger.warning("zstandard is not installed; compressing blobs with gzip")
+    return gzip.compress(data, compresslevel=6)
+
+
+def decompress(data: bytes) -> bytes:
+    """Inverse of :func:`compress`; the codec is recognised from the magic bytes."""
+    if data.startswith(_ZSTD_MAGIC):
+        if zstandard is None:
+            raise RuntimeError("Blob is zstd-compressed but zstandard is not installed")
+        return zstandard.ZstdDecompressor().decompressobj().decompress(data)
+    if data.startswith(_GZIP_MAGIC):
+        return gzip.decompress(data)
+    return data
+
+
+class BlobStore(ABC):
+    """Content-addressed store for large payloads, compressed and deduplicated.
+
+    A blob's reference is ``sha256:<hex>`` of its uncompressed bytes, so
+    storing the same output twice keeps one copy.
+    """
+
+    name = "blob"
+
+    def __init__(self, codec: str = "auto"):
+        self.codec = codec
+        self.puts = 0
+        self.dedup_hits = 0
+        self.gets = 0
+        self.bytes_in = 0
+        self.bytes_stored = 0
+
+    @abstractmethod
+    def _exists(self, digest: str) -> bool:
+        pass
+
+    @abstractmethod
+    def _write(self, digest: str, data: bytes):
+        pass
+
+    @abstractmethod
+    def _read(self, digest: str) -> Optional[bytes]:
+        pass
+
+    @abstractmethod
+    def _remove(self, digest: str):
+        pass
+
+    def put_sync(self, data: bytes) -> str:
+        digest = hashlib.sha256(data).hexdigest()
+        self.puts += 1
+        self.bytes_in += len(data)
+        if self._exists(digest):
+            self.dedup_hits += 1
+        else:
+            stored = compress(data, self.codec)
+            self._write(digest, stored)
+            self.bytes_stored += len(stored)
+        return f"sha256:{digest}"
+
+    def get_sync(self, ref: str) -> Optional[bytes]:
+        self.gets += 1
+        stored = self._read(_digest(ref))
+        return decompress(stored) if stored is not None else None
+
+    async def put(self, data: bytes) -> str:
+        """Store ``data`` and return its reference (hashing and compression run off the loop)."""
+        return await asyncio.to_thread(self.put_sync, data)
+
+    async def get(self, ref: str) -> Optional[bytes]:
+        return await asyncio.to_thread(self.get_sync, ref)
+
+    async def delete(self, ref: str):
+        await asyncio.to_thread(self._remove, _digest(ref))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.name,
+            "puts": self.puts,
+            "dedup_hits": self.dedup_hits,
+            "gets": self.gets,
+            "bytes_in": self.bytes_in,
+            "bytes_stored": self.bytes_stored
+        }
+
+
+def _digest(ref: str) -> str:
+    algorithm, _, digest = ref.partition(":")
+    if algorithm != "sha256" or len(digest) != 64:
+        raise ValueError(f"Invalid blob reference: {ref}")
+    return digest
+
+
+class FileBlobStore(BlobStore):
+    """Blobs as files under ``root/<first two hex chars>/<rest>``."""
+
+    name = "fs"
+
+    def __init__(self, root: str, codec: str = "auto"):
+        super().__init__(codec)
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.root, digest[:2], digest[2:])
+
+    def _exists(self, digest: str) -> bool:
+        return os.path.exists(self._path(digest))
+
+    def _write(self, digest: str, data: bytes):
+        path = self._path(digest)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write then rename, so readers never see a partial blob
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def _read(self, digest: str) -> Optional[bytes]:
+        try:
+            with open(self._path(digest), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def _remove(self, digest: str):
+        try:
+            os.remove(self._path(digest))
+        except FileNotFoundError:
+            pass
+
+
+class SQLiteBlobStore(BlobStore):
+    """Blobs in a BLOB column of a separate SQLite file."""
+
+    name = "sqlite"
+
+    def __init__(self, path: str, codec: str = "auto"):
+        super().__init__(codec)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS blobs ("
+            "digest TEXT PRIMARY KEY, data BLOB NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def _exists(self, digest: str) -> bool:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT 1 FROM blobs WHERE digest = ?", (digest,)
+            ).fetchone() is not None
+
+    def _write(self, digest: str, data: bytes):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO blobs (digest, data, created_at) VALUES (?, ?, ?)",
+                (digest, data, time.time())
+            )
+            self._conn.commit()
+
+    def _read(self, digest: str) -> Optional[bytes]:
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM blobs WHERE digest = ?", (digest,)).fetchone()
+            return row[0] if row else None
+
+    def _remove(self, digest: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM blobs WHERE digest = ?", (digest,))
+            self._conn.commit()
+
+
+_blob_store: Optional[BlobStore] = None
+
+
+def get_blob_store() -> Optional[BlobStore]:
+    """Get the process-wide blob store, or None when outputs are kept inline."""
+    global _blob_store
+    backend = settings.blob_store.lower()
+    if backend == "off":
+        return None
+    if _blob_store is None:
+        try:
+            if backend == "sqlite":
+                _blob_store = SQLiteBlobStore(settings.blob_store_path, settings.blob_compression)
+            else:
+                _blob_store = FileBlobStore(settings.blob_store_path, settings.blob_compression)
+        except Exception as e:
+            logger.error(f"Failed to initialise {backend} blob store: {e}")
+            return None
+    return _blob_store
+
+
+async def offload_output(output: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Column values for a task output: inline when small, a blob reference when large."""
+    if output is None:
+        return {"output_data": None, "output_ref": None, "output_size": None}
+    data = await dumps_async(output)
+    store = get_blob_store()
+    if store is None or len(data) < settings.blob_threshold_bytes:
+        return {"output_data": output, "output_ref": None, "output_size": len(data)}
+    try:
+        ref = await store.put(data)
+    except Exception as e:
+        logger.error(f"Failed to store task output blob, keeping it inline: {e}")
+        return {"output_data": output, "output_ref": None, "output_size": len(data)}
+    return {"output_data": None, "output_ref": ref, "output_size": len(data)}
+
+
+async def load_output(output_data: Optional[Dict[str, Any]],
+                      output_ref: Optional[str]) -> Optional[Dict[str, Any]]:
+    """A task's output, reading it from the blob store when it was offloaded."""
+    if output_data is not None or not output_ref:
+        return output_data
+    store = get_blob_store()
+    if store is None:
+        logger.error(f"Task output {output_ref} is in the blob store, but the blob store is off")
+        return None
+
+    def read() -> Optional[Dict[str, Any]]:
+        data = store.get_sync(output_ref)
+        return json.loads(data) if data is not None else None
+
+    # Decompressing and parsing a large output stays off the event loop
+    output = await asyncio.to_thread(read)
+    if output is None:
+        logger.error(f"Task output blob {output_ref} is missing")
+    return output
+
@@ -11,6 +11,110 @@ class Settings:
         
         # Database
         self.database_url = os.getenv("DATABASE_URL", "sqlite:///./test.db")
+        self.db_pool_size = int(os.getenv("DB_POOL_SIZE", "10"))
+        self.db_max_overflow = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+        self.db_pool_timeout = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+        self.db_pool_recycle = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+        self.db_busy_timeout_ms = int(os.getenv("DB_BUSY_TIMEOUT_MS", "5000"))
+        self.sqlite_synchronous = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+        self.sqlite_cache_size_kb = int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536"))
+        self.sqlite_mmap_size = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+        
+        # Ollama
+        self.ollama_base_url = os.getenv("OLLAMA_BASE_URL", "http://ollama:11434")
+        self.ollama_pool_size = int(os.getenv("OLLAMA_POOL_SIZE", "10"))
+        self.ollama_keepalive_expiry = float(os.getenv("OLLAMA_KEEPALIVE_EXPIRY", "30"))
+        self.ollama_connect_timeout = float(os.getenv("OLLAMA_CONNECT_TIMEOUT", "5"))
+        self.ollama_timeout = float(os.getenv("OLLAMA_TIMEOUT", "60"))
+        
+        # LLM response cache
+        self.llm_cache_enabled = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+        self.llm_cache_ttl = float(os.getenv("LLM_CACHE_TTL", "3600"))
+        self.llm_cache_max_entries = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1024"))
+        self.llm_cache_max_bytes = int(os.getenv("LLM_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+        self.llm_cache_backend = os.getenv("LLM_CACHE_BACKEND", "memory")  # memory, sqlite, redis
+        self.llm_cache_path = os.getenv("LLM_CACHE_PATH", "./llm_cache.db")
+        
+        # LLM scheduler: per-model concurrency and admission deadlines (seconds)
+        self.llm_max_in_flight = int(os.getenv("LLM_MAX_IN_FLIGHT", "4"))
+        self.llm_max_in_flight_per_model = os.getenv("LLM_MAX_IN_FLIGHT_PER_MODEL", "")  # e.g. "phi:latest=2,llama3=1"
+        self.llm_max_queue_wait_interactive = float(os.getenv("LLM_MAX_QUEUE_WAIT_INTERACTIVE", "30"))
+        self.llm_max_queue_wait_batch = float(os.getenv("LLM_MAX_QUEUE_WAIT_BATCH", "600"))
+        
+        # Coalesce identical concurrent LLM calls and task executions
+        self.llm_single_flight = os.getenv("LLM_SINGLE_FLIGHT", "true").lower() == "true"
+        self.task_single_flight = os.getenv("TASK_SINGLE_FLIGHT", "true").lower() == "true"
+        
+        # Task queue
+        self.task_workers = int(os.getenv("TASK_WORKERS", "4"))
+        self.task_queue_max_size = int(os.getenv("TASK_QUEUE_MAX_SIZE", "1000"))
+        
+        # Readiness probe (/health/ready): checks are cached for this long
+        self.readiness_cache_ttl = float(os.getenv("READINESS_CACHE_TTL", "2"))
+        self.readiness_check_timeout = float(os.getenv("READINESS_CHECK_TIMEOUT", "1"))
+        
+        # In-memory task registry: recent results kept before falling back to the DB
+        self.task_registry_max_results = int(os.getenv("TASK_REGISTRY_MAX_RESULTS", "1000"))
+        self.task_registry_max_bytes = int(os.getenv("TASK_REGISTRY_MAX_BYTES", str(64 * 1024 * 1024)))
+        self.task_registry_ttl = float(os.getenv("TASK_REGISTRY_TTL", "300"))
+        # Streaming tasks whose SSE stream is never opened are dropped after this
+        self.stream_pending_max = int(os.getenv("STREAM_PENDING_MAX", "1000"))
+        self.stream_pending_ttl = float(os.getenv("STREAM_PENDING_TTL", "300"))
+        
+        # Tasks left in_progress by a crashed process: requeue (resume), fail or off
+        self.recover_interrupted_tasks = os.getenv("RECOVER_INTERRUPTED_TASKS", "requeue").lower()
+        
+        # POST /tasks/batch
+        self.batch_max_tasks = int(os.getenv("BATCH_MAX_TASKS", "1000"))
+        self.batch_max_concurrency = int(os.getenv("BATCH_MAX_CONCURRENCY", "8"))
+        self.batch_write_size = int(os.getenv("BATCH_WRITE_SIZE", "50"))
+        
+        # Agent instance pool (per agent type)
+        self.agent_pool_size = int(os.getenv("AGENT_POOL_SIZE", "8"))
+        
+        # Tracing spans and /metrics; TRACE_EXPORT_FILE appends spans as OTLP/JSON lines
+        self.tracing_enabled = os.getenv("TRACING_ENABLED", "true").lower() == "true"
+        self.trace_export_file = os.getenv("TRACE_EXPORT_FILE", "")
+        
+        # Responses larger than this are JSON-encoded on a worker thread
+        self.json_offload_threshold_bytes = int(os.getenv("JSON_OFFLOAD_THRESHOLD_BYTES", "262144"))
+        # Event-loop lag probe (0 disables) and the lag that gets logged as a warning
+        self.loop_lag_interval_ms = int(os.getenv("LOOP_LAG_INTERVAL_MS", "100"))
+        self.loop_lag_warn_ms = int(os.getenv("LOOP_LAG_WARN_MS", "500"))
+        
+        # Task outputs above the threshold go to a content-addressed blob store: fs, sqlite or off
+        self.blob_store = os.getenv("BLOB_STORE", "fs").lower()
+        self.blob_store_path = os.getenv("BLOB_STORE_PATH", "./blobs")
+        self.blob_threshold_bytes = int(os.getenv("BLOB_THRESHOLD_BYTES", "16384"))
+        # auto uses zstd when the zstandard package is installed, gzip otherwise
+        self.blob_compression = os.getenv("BLOB_COMPRESSION", "auto").lower()
+        
+        # Retention: TTL in days per task status (unlisted statuses are kept), agent log TTL,
+        # archive directory for JSONL.gz partitions ("" deletes without archiving)
+        self.retention_ttl_days = os.getenv("RETENTION_TTL_DAYS", "completed=30,failed=90,cancelled=30")
+        self.retention_agent_log_days = float(os.getenv("RETENTION_AGENT_LOG_DAYS", "30"))
+        self.retention_archive_dir = os.getenv("RETENTION_ARCHIVE_DIR", "./archive")
+        self.retention_batch_size = int(os.getenv("RETENTION_BATCH_SIZE", "500"))
+        self.retention_batch_pause_ms = int(os.getenv("RETENTION_BATCH_PAUSE_MS", "50"))
+        self.retention_vacuum_pages = int(os.getenv("RETENTION_VACUUM_PAGES", "2000"))
+        # Background retention pass every N hours (0 disables; run python -m src.core.retention instead)
+        self.retention_interval_hours = float(os.getenv("RETENTION_INTERVAL_HOURS", "0"))
+        
+        # Per-task agent memory: ring buffer bounds and rolling LLM summary of evicted entries
+        self.agent_memory_entries = int(os.getenv("AGENT_MEMORY_ENTRIES", "10"))
+        self.agent_memory_max_bytes = int(os.getenv("AGENT_MEMORY_MAX_BYTES", "65536"))
+        self.agent_memory_summary = os.getenv("AGENT_MEMORY_SUMMARY", "false").lower() == "true"
+        
+        # Workflow engine
+        self.workflow_max_concurrency = int(os.getenv("WORKFLOW_MAX_CONCURRENCY", "4"))
+        
+        # Research question fan-out
+        self.research_fanout_concurrency = int(os.getenv("RESEARCH_FANOUT_CONCURRENCY", "4"))
+        
+        # Agent log sink
+        self.log_sink_batch_size = int(os.getenv("LOG_SINK_BATCH_SIZE", "100"))
+        self.log_sink_flush_interval_ms = int(os.getenv("LOG_SINK_FLUSH_INTERVAL_MS", "200"))
+        self.log_sink_max_queue = int(os.getenv("LOG_SINK_MAX_QUEUE", "10000"))
         
         # Redis
         self.redis_url = os.getenv("REDIS_URL", "redis://localhost:6379")
@@ -26,5 +130,17 @@ class Settings:
         # App Settings
         self.app_env = os.getenv("APP_ENV", "development")
         self.log_level = os.getenv("LOG_LEVEL", "INFO")
+        
+        # Logging pipeline: background writer, JSON lines, rotation by size or age, gzip of rotated files
+        self.log_dir = os.getenv("LOG_DIR", "logs")
+        self.log_file = os.getenv("LOG_FILE", "multiagent.log")
+        self.log_format = os.getenv("LOG_FORMAT", "json")  # json | text (file)
+        self.log_console_format = os.getenv("LOG_CONSOLE_FORMAT", "text")  # json | text
+        self.log_max_bytes = int(os.getenv("LOG_MAX_BYTES", str(50 * 1024 * 1024)))
+        self.log_rotate_interval_hours = float(os.getenv("LOG_ROTATE_INTERVAL_HOURS", "24"))
+        self.log_backup_count = int(os.getenv("LOG_BACKUP_COUNT", "14"))
+        self.log_compress = os.getenv("LOG_COMPRESS", "true").lower() == "true"
+        # Per-module sampling of sub-WARNING records, e.g. "ollama_client=0.1,llm_cache=0.01"
+        self.log_sampling = os.getenv("LOG_SAMPLING", "")
 
 settings = Settings()
@@ -1,33 +1,86 @@
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, Text, JSON
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine, event, inspect, text, Column, Integer, String, DateTime, Text, JSON, Index, UniqueConstraint
+from sqlalchemy.orm import sessionmaker, declarative_base
 from datetime import datetime
+from typing import Any, AsyncIterator, Dict
+import asyncio
 import os
+from src.core.config import settings
 
 SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./multiagent.db")
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+
+def _is_sqlite(url: str) -> bool:
+    return url.startswith("sqlite")
+
+
+def _engine_options(url: str) -> Dict[str, Any]:
+    """Connection and pool options for the configured backend."""
+    if _is_sqlite(url):
+        # Sessions are handed between the event loop and worker threads
+        return {
+            "connect_args": {
+                "check_same_thread": False,
+                "timeout": settings.db_busy_timeout_ms / 1000
+            }
+        }
+    return {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": True
+    }
+
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    """Tune every new SQLite connection for concurrent readers and writers."""
+    cursor = dbapi_connection.cursor()
+    # Only takes effect on a new, empty database; see `python -m src.core.retention`
+    cursor.execute("PRAGMA auto_vacuum=INCREMENTAL")
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute(f"PRAGMA synchronous={settings.sqlite_synchronous}")
+    cursor.execute(f"PRAGMA cache_size=-{settings.sqlite_cache_size_kb}")
+    cursor.execute(f"PRAGMA mmap_size={settings.sqlite_mmap_size}")
+    cursor.execute(f"PRAGMA busy_timeout={settings.db_busy_timeout_ms}")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **_engine_options(SQLALCHEMY_DATABASE_URL))
+if _is_sqlite(SQLALCHEMY_DATABASE_URL):
+    event.listen(engine, "connect", _apply_sqlite_pragmas)
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
 class TaskExecution(Base):
     __tablename__ = "task_executions"
-    
+
     id = Column(Integer, primary_key=True, index=True)
     task_id = Column(String, unique=True, index=True)
     task_type = Column(String)
     status = Column(String)
     input_data = Column(JSON)
     output_data = Column(JSON)
+    # Large outputs live in the blob store; output_data is then NULL
+    output_ref = Column(String, nullable=True)
+    output_size = Column(Integer, nullable=True)
     agents_involved = Column(JSON)
     created_at = Column(DateTime, default=datetime.utcnow)
     completed_at = Column(DateTime, nullable=True)
     error_message = Column(Text, nullable=True)
 
+    # Keyset pagination and filtered listings walk (created_at, id)
+    __table_args__ = (
+        Index("ix_task_executions_created_id", "created_at", "id"),
+        Index("ix_task_executions_status_created_id", "status", "created_at", "id"),
+        Index("ix_task_executions_type_created_id", "task_type", "created_at", "id"),
+    )
+
 class AgentLog(Base):
     __tablename__ = "agent_logs"
-    
+
     id = Column(Integer, primary_key=True, index=True)
     task_id = Column(String, index=True)
     agent_name = Column(String)
@@ -36,8 +89,42 @@ class AgentLog(Base):
     timestamp = Column(DateTime, default=datetime.utcnow)
     meta_data = Column(JSON)  # Changed from 'metadata' to 'meta_data'
 
-# Create tables
-Base.metadata.create_all(bind=engine)
+class WorkflowCheckpoint(Base):
+    """Output of one completed workflow step, so a resumed task can skip it."""
+    __tablename__ = "workflow_checkpoints"
+
+    id = Column(Integer, primary_key=True)
+    task_id = Column(String, nullable=False)
+    step = Column(String, nullable=False)
+    output = Column(JSON)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        UniqueConstraint("task_id", "step", name="uq_workflow_checkpoints_task_step"),
+    )
+
+def init_db():
+    """Create database tables. Run once at startup or via ``python -m src.core.database``."""
+    Base.metadata.create_all(bind=engine)
+    _apply_migrations()
+
+def _apply_migrations():
+    """Bring tables created by older versions up to date (idempotent)."""
+    # create_all does not add columns to existing tables either
+    existing = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not existing.has_table(table.name):
+                continue
+            present = {c["name"] for c in existing.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in present and column.nullable:
+                    column_type = column.type.compile(dialect=engine.dialect)
+                    conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+    # create_all skips indexes on tables that already exist
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
 
 def get_db():
     db = SessionLocal()
@@ -45,3 +132,69 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def _async_url(url: str) -> str:
+    """Map a sync database URL onto its async driver."""
+    scheme, _, rest = url.partition("://")
+    base = scheme.split("+")[0]
+    if base == "sqlite":
+        return f"sqlite+aiosqlite://{rest}"
+    if base in ("postgresql", "postgres"):
+        return f"postgresql+asyncpg://{rest}"
+    return url
+
+
+_async_engine = None
+_async_engine_loop = None
+_async_session_factory = None
+
+
+def get_async_engine():
+    """Get the async engine, creating it on first use (requires aiosqlite/asyncpg)."""
+    global _async_engine, _async_engine_loop, _async_session_factory
+    loop = asyncio.get_running_loop()
+    # Pooled async connections belong to the loop that opened them
+    if _async_engine is None or _async_engine_loop is not loop:
+        from sqlalchemy.ext.asyncio import create_async_engine
+        url = _async_url(SQLALCHEMY_DATABASE_URL)
+        options = _engine_options(SQLALCHEMY_DATABASE_URL)
+        if _is_sqlite(url):
+            options["connect_args"].pop("check_same_thread")
+        _async_engine = create_async_engine(url, **options)
+        if _is_sqlite(url):
+            event.listen(_async_engine.sync_engine, "connect", _apply_sqlite_pragmas)
+        _async_engine_loop = loop
+        _async_session_factory = None
+    return _async_engine
+
+
+def AsyncSessionLocal():
+    """Create a new AsyncSession bound to the async engine."""
+    global _async_session_factory
+    async_engine = get_async_engine()
+    if _async_session_factory is None:
+        from sqlalchemy.ext.asyncio import async_sessionmaker
+        _async_session_factory = async_sessionmaker(async_engine, expire_on_commit=False)
+    return _async_session_factory()
+
+
+async def get_async_db() -> AsyncIterator[Any]:
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def dispose_engines():
+    """Close pooled connections on shutdown."""
+    global _async_engine, _async_engine_loop, _async_session_factory
+    if _async_engine is not None:
+        await _async_engine.dispose()
+    _async_engine = None
+    _async_engine_loop = None
+    _async_session_factory = None
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    init_db()
+    print(f"Database initialised: {engine.url.render_as_string(hide_password=True)}")
@@ -0,0 +1,82 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+from src.core.config import settings
+from src.core.logger import logger
+
+# A dependency check: returns normally when healthy, raises otherwise
+HealthCheckFn = Callable[[], Awaitable[Any]]
+
+
+class ReadinessProbe:
+    """Runs dependency checks and caches the verdict for a short TTL.
+
+    Load balancers probe every replica every second; the cache keeps that
+    to at most one round of checks per ``ttl`` seconds, and concurrent
+    probes during a refresh share the same in-flight check.
+    """
+
+    def __init__(self, checks: Dict[str, HealthCheckFn], ttl: float = 2.0, timeout: float = 1.0):
+        self.checks = checks
+        self.ttl = ttl
+        self.timeout = timeout
+        self._result: Optional[Dict[str, Any]] = None
+        self._checked_at = 0.0
+        self._refresh: Optional[asyncio.Future] = None
+        self.refreshes = 0
+
+    async def check(self) -> Dict[str, Any]:
+        """Get the cached readiness result, refreshing it once it is stale."""
+        if self._result is not None and time.monotonic() - self._checked_at < self.ttl:
+            return self._result
+
+        refresh = self._refresh
+        if refresh is None or refresh.done() or refresh.get_loop() is not asyncio.get_running_loop():
+            refresh = self._refresh = asyncio.ensure_future(self._run_checks())
+        return await asyncio.shield(refresh)
+
+    def invalidate(self):
+        self._result = None
+
+    async def _run_checks(self) -> Dict[str, Any]:
+        names = list(self.checks)
+        outcomes = await asyncio.gather(
+            *(asyncio.wait_for(self.checks[name](), timeout=self.timeout) for name in names),
+            return_exceptions=True
+        )
+
+        services = {}
+        for name, outcome in zip(names, outcomes):
+            if isinstance(outcome, BaseException):
+                reason = str(outcome) or type(outcome).__name__
+                services[name] = f"unhealthy: {reason}"
+                logger.warning(f"Readiness check '{name}' failed: {reason}")
+            else:
+                services[name] = "healthy"
+
+        self.refreshes += 1
+        self._result = {
+            "ready": all(status == "healthy" for status in services.values()),
+            "services": services
+        }
+        self._checked_at = time.monotonic()
+        return self._result
+
+
+async def check_database():
+    from sqlalchemy import text
+    from src.core.database import AsyncSessionLocal
+    async with AsyncSessionLocal() as db:
+        await db.execute(text("SELECT 1"))
+
+
+async def check_ollama():
+    from src.core.ollama_client import ping
+    await ping(timeout=settings.readiness_check_timeout)
+
+
+readiness_probe = ReadinessProbe(
+    {"database": check_database, "ollama": check_ollama},
+    ttl=settings.readiness_cache_ttl,
+    timeout=settings.readiness_check_timeout
+)
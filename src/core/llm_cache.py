@@ -0,0 +1,258 @@
+import asyncio
+import hashlib
+import json
+import sqlite3
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+from src.core.config import settings
+from src.core.logger import logger
+
+
+def make_cache_key(model: str, prompt: str, system_prompt: Optional[str] = None,
+                   options: Optional[Dict[str, Any]] = None) -> str:
+    """Build a content-addressed key for an LLM request."""
+    material = json.dumps(
+        [model, prompt, system_prompt or "", options or {}],
+        sort_keys=True,
+        separators=(",", ":")
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class CacheBackend(ABC):
+    """Storage tier for cached LLM responses."""
+
+    name = "backend"
+
+    def __init__(self):
+        self.evictions = 0
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[str]:
+        """Return the cached value, or None when missing or expired."""
+        pass
+
+    @abstractmethod
+    async def set(self, key: str, value: str, ttl: float):
+        """Store a value for ``ttl`` seconds."""
+        pass
+
+    @abstractmethod
+    async def clear(self):
+        """Remove every entry."""
+        pass
+
+    def stats(self) -> Dict[str, Any]:
+        """Backend-specific counters."""
+        return {"evictions": self.evictions}
+
+
+class MemoryCacheBackend(CacheBackend):
+    """In-process LRU bounded by entry count and approximate memory use."""
+
+    name = "memory"
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 64 * 1024 * 1024):
+        super().__init__()
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[float, str, int]]" = OrderedDict()
+        self._bytes = 0
+
+    async def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value, _ = entry
+        if expires_at < time.time():
+            self._remove(key)
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: str, ttl: float):
+        size = len(key) + sys.getsizeof(value)
+        if size > self.max_bytes:
+            return
+
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (time.time() + ttl, value, size)
+        self._bytes += size
+
+        # Evict least recently used entries until both bounds hold
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    async def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+
+    def _remove(self, key: str):
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "bytes": self._bytes
+        }
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """On-disk tier so cached responses survive restarts."""
+
+    name = "sqlite"
+
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def _get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] < time.time():
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                self.evictions += 1
+                return None
+            return row[0]
+
+    def _set(self, key: str, value: str, ttl: float):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, time.time() + ttl)
+            )
+            self._conn.commit()
+
+    def _clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+
+    async def get(self, key: str) -> Optional[str]:
+        return await asyncio.to_thread(self._get, key)
+
+    async def set(self, key: str, value: str, ttl: float):
+        await asyncio.to_thread(self._set, key, value, ttl)
+
+    async def clear(self):
+        await asyncio.to_thread(self._clear)
+
+
+class RedisCacheBackend(CacheBackend):
+    """Shared tier for caching across replicas (requires the redis package)."""
+
+    name = "redis"
+
+    def __init__(self, url: str, prefix: str = "llm_cache:"):
+        super().__init__()
+        import redis.asyncio as redis_asyncio
+        self.prefix = prefix
+        self._client = redis_asyncio.from_url(url, decode_responses=True)
+
+    async def get(self, key: str) -> Optional[str]:
+        return await self._client.get(self.prefix + key)
+
+    async def set(self, key: str, value: str, ttl: float):
+        await self._client.set(self.prefix + key, value, ex=max(1, int(ttl)))
+
+    async def clear(self):
+        async for key in self._client.scan_iter(match=self.prefix + "*"):
+            await self._client.delete(key)
+
+
+class LLMCache:
+    """Response cache that checks each tier in order, promoting hits upwards."""
+
+    def __init__(self, tiers: List[CacheBackend], ttl: float = 3600):
+        self.tiers = tiers
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, key: str) -> Optional[str]:
+        for index, tier in enumerate(self.tiers):
+            try:
+                value = await tier.get(key)
+            except Exception as e:
+                logger.error(f"LLM cache {tier.name} read failed: {e}")
+                continue
+
+            if value is not None:
+                self.hits += 1
+                for upper in self.tiers[:index]:
+                    await upper.set(key, value, self.ttl)
+                return value
+
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, value: str):
+        for tier in self.tiers:
+            try:
+                await tier.set(key, value, self.ttl)
+            except Exception as e:
+                logger.error(f"LLM cache {tier.name} write failed: {e}")
+
+    async def clear(self):
+        for tier in self.tiers:
+            await tier.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit, miss and eviction counters across all tiers."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": sum(tier.evictions for tier in self.tiers),
+            "tiers": {tier.name: tier.stats() for tier in self.tiers}
+        }
+
+
+_llm_cache: Optional[LLMCache] = None
+
+
+def get_llm_cache() -> Optional[LLMCache]:
+    """Get the process-wide LLM cache, or None when caching is disabled."""
+    global _llm_cache
+    if not settings.llm_cache_enabled:
+        return None
+
+    if _llm_cache is None:
+        tiers: List[CacheBackend] = [
+            MemoryCacheBackend(settings.llm_cache_max_entries, settings.llm_cache_max_bytes)
+        ]
+        backend = settings.llm_cache_backend.lower()
+        try:
+            if backend == "sqlite":
+                tiers.append(SQLiteCacheBackend(settings.llm_cache_path))
+            elif backend == "redis":
+                tiers.append(RedisCacheBackend(settings.redis_url))
+        except Exception as e:
+            logger.error(f"Failed to initialise {backend} LLM cache tier: {e}")
+        _llm_cache = LLMCache(tiers, ttl=settings.llm_cache_ttl)
+    return _llm_cache
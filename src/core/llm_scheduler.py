@@ -0,0 +1,250 @@
+import asyncio
+import math
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from contextvars import ContextVar, Token
+from typing import Any, AsyncIterator, Deque, Dict, Optional, Tuple
+from src.core.config import settings
+from src.core.metrics import metrics
+
+queue_wait_seconds = metrics.histogram(
+    "llm_queue_wait_seconds", "Time LLM calls waited for a model slot", ["model", "priority"]
+)
+
+# Lower value is served first
+PRIORITIES = {"interactive": 0, "batch": 1}
+
+# (priority, tenant) of the task issuing LLM calls in the current context
+_request_class: ContextVar[Tuple[str, str]] = ContextVar(
+    "llm_request_class", default=("interactive", "default")
+)
+
+
+def set_request_class(priority: str, tenant: str) -> Token:
+    """Tag LLM calls made from this context (and tasks it spawns)."""
+    return _request_class.set((priority if priority in PRIORITIES else "interactive", tenant or "default"))
+
+
+def reset_request_class(token: Token):
+    _request_class.reset(token)
+
+
+class AdmissionRejected(Exception):
+    """Raised when the predicted LLM queue wait exceeds the allowed deadline."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class _Waiter:
+    def __init__(self, tenant: str):
+        self.tenant = tenant
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+
+
+class _WaitStats:
+    """Queue-wait samples for one model and priority class."""
+
+    def __init__(self, window: int = 1000):
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.recent: Deque[float] = deque(maxlen=window)
+
+    def observe(self, wait_ms: float):
+        self.count += 1
+        self.total_ms += wait_ms
+        self.max_ms = max(self.max_ms, wait_ms)
+        self.recent.append(wait_ms)
+
+    def as_dict(self) -> Dict[str, Any]:
+        ordered = sorted(self.recent)
+
+        def pct(p: float) -> float:
+            if not ordered:
+                return 0.0
+            return ordered[min(len(ordered) - 1, int(math.ceil(p / 100 * len(ordered))) - 1)]
+
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "p50_ms": round(pct(50), 3),
+            "p95_ms": round(pct(95), 3),
+            "max_ms": round(self.max_ms, 3)
+        }
+
+
+class _ModelLane:
+    """In-flight slots and per-priority, per-tenant wait queues for one model."""
+
+    def __init__(self, limit: int):
+        self.limit = max(1, limit)
+        self.in_flight = 0
+        # priority -> tenant -> waiters; tenants are served round-robin
+        self.queues: Dict[int, "OrderedDict[str, Deque[_Waiter]]"] = {
+            rank: OrderedDict() for rank in sorted(PRIORITIES.values())
+        }
+        self.service_s = 0.0  # moving average of slot hold time
+        self.completed = 0
+
+    def enqueue(self, rank: int, waiter: _Waiter):
+        self.queues[rank].setdefault(waiter.tenant, deque()).append(waiter)
+
+    def discard(self, rank: int, waiter: _Waiter):
+        waiters = self.queues[rank].get(waiter.tenant)
+        if waiters is not None and waiter in waiters:
+            waiters.remove(waiter)
+            if not waiters:
+                del self.queues[rank][waiter.tenant]
+
+    def queued_ahead(self, rank: int) -> int:
+        return sum(
+            len(waiters)
+            for queue_rank, tenants in self.queues.items() if queue_rank <= rank
+            for waiters in tenants.values()
+        )
+
+    def pop_next(self) -> Optional[_Waiter]:
+        for tenants in self.queues.values():
+            while tenants:
+                tenant, waiters = next(iter(tenants.items()))
+                waiter = waiters.popleft()
+                if waiters:
+                    tenants.move_to_end(tenant)
+                else:
+                    del tenants[tenant]
+                if not waiter.future.done():
+                    return waiter
+        return None
+
+    def record_service(self, seconds: float):
+        self.completed += 1
+        self.service_s = seconds if self.completed == 1 else 0.8 * self.service_s + 0.2 * seconds
+
+
+class LLMScheduler:
+    """Process-wide governor for LLM calls.
+
+    Each model gets at most ``max_in_flight`` concurrent calls (overridable
+    per model). Callers beyond that queue by priority class, and within a
+    class tenants take turns so one tenant's burst cannot starve another.
+    ``admit`` predicts the queue wait for new work and rejects it up front
+    when that exceeds the class deadline.
+    """
+
+    def __init__(self, max_in_flight: int = 4, per_model: Optional[Dict[str, int]] = None,
+                 max_wait_s: Optional[Dict[str, float]] = None):
+        self.max_in_flight = max_in_flight
+        self.per_model = per_model or {}
+        self.max_wait_s = max_wait_s or {}
+        self._lanes: Dict[str, _ModelLane] = {}
+        self._waits: Dict[Tuple[str, str], _WaitStats] = {}
+        self.rejected = 0
+
+    def _lane(self, model: str) -> _ModelLane:
+        lane = self._lanes.get(model)
+        if lane is None:
+            lane = self._lanes[model] = _ModelLane(self.per_model.get(model, self.max_in_flight))
+        return lane
+
+    def predicted_wait(self, model: str, priority: str = "interactive") -> float:
+        """Seconds a new call of this class would likely wait for a slot."""
+        lane = self._lanes.get(model)
+        if lane is None or lane.in_flight < lane.limit:
+            return 0.0
+        ahead = lane.queued_ahead(PRIORITIES.get(priority, 0))
+        return (ahead // lane.limit + 1) * lane.service_s
+
+    def admit(self, priority: str = "interactive"):
+        """Reject new work whose predicted wait on any model exceeds its deadline."""
+        deadline = self.max_wait_s.get(priority)
+        if not deadline:
+            return
+        worst = max((self.predicted_wait(model, priority) for model in self._lanes), default=0.0)
+        if worst > deadline:
+            self.rejected += 1
+            raise AdmissionRejected(
+                f"LLM backlog too deep: predicted wait {worst:.1f}s exceeds {deadline:.0f}s for {priority} work",
+                retry_after=max(1.0, worst - deadline)
+            )
+
+    @asynccontextmanager
+    async def slot(self, model: str) -> AsyncIterator[None]:
+        """Hold one in-flight slot for ``model`` around an LLM call."""
+        priority, tenant = _request_class.get()
+        lane = self._lane(model)
+        queued_at = time.perf_counter()
+
+        if lane.in_flight < lane.limit and not lane.queued_ahead(PRIORITIES[priority]):
+            lane.in_flight += 1
+        else:
+            waiter = _Waiter(tenant)
+            lane.enqueue(PRIORITIES[priority], waiter)
+            try:
+                # The releasing call hands its slot straight to us
+                await waiter.future
+            except asyncio.CancelledError:
+                if waiter.future.done() and not waiter.future.cancelled():
+                    self._release(lane)
+                else:
+                    lane.discard(PRIORITIES[priority], waiter)
+                raise
+
+        started = time.perf_counter()
+        wait = started - queued_at
+        self._wait_stats(model, priority).observe(wait * 1000)
+        queue_wait_seconds.observe(wait, model=model, priority=priority)
+        try:
+            yield
+        finally:
+            lane.record_service(time.perf_counter() - started)
+            self._release(lane)
+
+    def _release(self, lane: _ModelLane):
+        waiter = lane.pop_next()
+        if waiter is None:
+            lane.in_flight -= 1
+        else:
+            waiter.future.set_result(None)
+
+    def _wait_stats(self, model: str, priority: str) -> _WaitStats:
+        stats = self._waits.get((model, priority))
+        if stats is None:
+            stats = self._waits[(model, priority)] = _WaitStats()
+        return stats
+
+    def stats(self) -> Dict[str, Any]:
+        models: Dict[str, Any] = {}
+        for model, lane in self._lanes.items():
+            models[model] = {
+                "limit": lane.limit,
+                "in_flight": lane.in_flight,
+                "queued": lane.queued_ahead(max(PRIORITIES.values())),
+                "avg_service_ms": round(lane.service_s * 1000, 3),
+                "queue_wait": {
+                    priority: self._waits[(model, priority)].as_dict()
+                    for priority in PRIORITIES if (model, priority) in self._waits
+                }
+            }
+        return {"models": models, "rejected": self.rejected}
+
+
+def _parse_model_limits(raw: str) -> Dict[str, int]:
+    """Parse ``"phi:latest=2,llama3=1"`` into per-model limits."""
+    limits = {}
+    for item in filter(None, (part.strip() for part in raw.split(","))):
+        model, _, limit = item.rpartition("=")
+        limits[model] = int(limit)
+    return limits
+
+
+llm_scheduler = LLMScheduler(
+    max_in_flight=settings.llm_max_in_flight,
+    per_model=_parse_model_limits(settings.llm_max_in_flight_per_model),
+    max_wait_s={
+        "interactive": settings.llm_max_queue_wait_interactive,
+        "batch": settings.llm_max_queue_wait_batch
+    }
+)
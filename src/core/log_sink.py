@@ -0,0 +1,167 @@
+import asyncio
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional
+from sqlalchemy import insert
+from src.core.config import settings
+from src.core.database import AgentLog, SessionLocal
+from src.core.logger import logger
+from src.core.metrics import metrics
+from src.core.tracing import tracer
+
+dropped_records = metrics.counter(
+    "agent_log_records_dropped_total", "Agent log records dropped because the write buffer was full"
+)
+queue_depth = metrics.gauge("agent_log_queue_depth", "Agent log records buffered and not yet written")
+flush_seconds = metrics.histogram(
+    "agent_log_flush_seconds", "Time to bulk insert one batch of agent log records",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+)
+
+
+class AgentLogSink:
+    """Buffers agent log records and writes them to the database in batches.
+
+    Records are flushed every ``batch_size`` records or ``flush_interval_ms``
+    milliseconds, whichever comes first. When the buffer reaches
+    ``max_queue`` (the database cannot keep up) new records are dropped and
+    counted: producers run on the event loop and must never wait on the
+    database. Records submitted while no flusher is running are held until
+    ``start()`` or ``stop()``.
+    """
+
+    def __init__(self, batch_size: int = 100, flush_interval_ms: int = 200, max_queue: int = 10000):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_queue = max_queue
+        self._buffer: Deque[Dict[str, Any]] = deque()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._flusher: Optional[asyncio.Task] = None
+
+        # Metrics
+        self.records_written = 0
+        self.flushes = 0
+        self.flush_errors = 0
+        self.dropped = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self._total_flush_ms = 0.0
+
+    @property
+    def running(self) -> bool:
+        if self._flusher is None or self._flusher.done():
+            return False
+        try:
+            return asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            return False
+
+    async def start(self):
+        """Start the background flusher on the current event loop."""
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._flusher = asyncio.create_task(self._run())
+        if self._buffer:
+            # Flush what was submitted before the flusher existed
+            self._wakeup.set()
+        logger.info("Agent log sink started")
+
+    async def stop(self):
+        """Stop the flusher and write everything still buffered."""
+        if self._flusher is not None:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+        while self._buffer:
+            await asyncio.to_thread(self._write, self._drain(self.batch_size))
+
+    def submit(self, record: Dict[str, Any]):
+        """Queue a log record; it is written by the flusher, never on the caller's stack."""
+        record.setdefault("timestamp", datetime.utcnow())
+        running = self.running
+
+        if len(self._buffer) >= self.max_queue:
+            if not self.dropped:
+                logger.warning(f"Agent log buffer full ({self.max_queue} records); dropping new records")
+            self.dropped += 1
+            dropped_records.inc()
+            if running:
+                self._loop.call_soon_threadsafe(self._wakeup.set)
+            return
+
+        self._buffer.append(record)
+        queue_depth.set(len(self._buffer))
+        if running and len(self._buffer) >= self.batch_size:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queue_depth": len(self._buffer),
+            "records_written": self.records_written,
+            "flushes": self.flushes,
+            "flush_errors": self.flush_errors,
+            "dropped": self.dropped,
+            "last_flush_ms": round(self.last_flush_ms, 3),
+            "avg_flush_ms": round(self._total_flush_ms / self.flushes, 3) if self.flushes else 0.0,
+            "max_flush_ms": round(self.max_flush_ms, 3)
+        }
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+            while self._buffer:
+                await asyncio.to_thread(self._write, self._drain(self.batch_size))
+
+    def _drain(self, count: int) -> List[Dict[str, Any]]:
+        batch = []
+        while self._buffer and len(batch) < count:
+            batch.append(self._buffer.popleft())
+        queue_depth.set(len(self._buffer))
+        return batch
+
+    def _write(self, records: List[Dict[str, Any]]):
+        """Bulk insert a batch of records in one transaction."""
+        if not records:
+            return
+
+        start = time.perf_counter()
+        db = SessionLocal()
+        try:
+            with tracer.span("db", "agent_logs.insert", rows=len(records)):
+                db.execute(insert(AgentLog), records)
+                db.commit()
+            self.records_written += len(records)
+        except Exception as e:
+            db.rollback()
+            self.flush_errors += 1
+            logger.error(f"Failed to write {len(records)} agent log records: {e}")
+        finally:
+            db.close()
+
+        elapsed = time.perf_counter() - start
+        flush_seconds.observe(elapsed)
+        elapsed_ms = elapsed * 1000
+        self.flushes += 1
+        self.last_flush_ms = elapsed_ms
+        self.max_flush_ms = max(self.max_flush_ms, elapsed_ms)
+        self._total_flush_ms += elapsed_ms
+
+
+# Process-wide sink used by BaseAgent.log_action
+log_sink = AgentLogSink(
+    batch_size=settings.log_sink_batch_size,
+    flush_interval_ms=settings.log_sink_flush_interval_ms,
+    max_queue=settings.log_sink_max_queue
+)
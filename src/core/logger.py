@@ -1,33 +1,232 @@
+import atexit
+import gzip
+import json
 import logging
+import logging.handlers
+import os
+import queue
+import shutil
 import sys
+import threading
+import time
 from pathlib import Path
 from datetime import datetime
+from typing import Dict, Optional
+from src.core.config import settings
 
 # Create logs directory if it doesn't exist
-Path("logs").mkdir(exist_ok=True)
+Path(settings.log_dir).mkdir(parents=True, exist_ok=True)
+
+# Standard LogRecord attributes; anything else on a record came from `extra=`
+_RECORD_FIELDS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """One JSON object per line, with task_id/agent and any `extra=` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.utcfromtimestamp(record.created).isoformat(timespec="milliseconds") + "Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "module": record.module,
+            "message": record.getMessage()
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_FIELDS and value is not None:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class RotatingLogFileHandler(logging.handlers.BaseRotatingHandler):
+    """Rotates when the file reaches ``max_bytes`` or ``interval`` seconds pass.
+
+    Rotated files get a timestamp suffix and are gzipped; only the newest
+    ``backup_count`` are kept. It runs on the listener thread, so neither
+    rotation nor compression blocks callers.
+    """
+
+    def __init__(self, filename: str, max_bytes: int = 0, interval: float = 0,
+                 backup_count: int = 7, compress: bool = True):
+        super().__init__(filename, "a", encoding="utf-8", delay=False)
+        self.max_bytes = max_bytes
+        self.interval = interval
+        self.backup_count = backup_count
+        self.compress = compress
+        self.rollover_at = time.time() + interval if interval else None
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        if self.rollover_at is not None and time.time() >= self.rollover_at:
+            return True
+        # Checked before the write, so a file may overshoot by one record
+        return bool(self.max_bytes and self.stream is not None and self.stream.tell() >= self.max_bytes)
+
+    def doRollover(self):
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+        if os.path.exists(self.baseFilename) and os.path.getsize(self.baseFilename) > 0:
+            rotated = self._rotated_name()
+            os.replace(self.baseFilename, rotated)
+            if self.compress:
+                with open(rotated, "rb") as src, gzip.open(rotated + ".gz", "wb") as dst:
+                    shutil.copyfileobj(src, dst)
+                os.remove(rotated)
+            self._prune()
+        self.stream = self._open()
+        if self.interval:
+            self.rollover_at = time.time() + self.interval
+
+    def _rotated_name(self) -> str:
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        name, n = f"{self.baseFilename}.{stamp}", 1
+        while os.path.exists(name) or os.path.exists(name + ".gz"):
+            name, n = f"{self.baseFilename}.{stamp}.{n}", n + 1
+        return name
+
+    def _prune(self):
+        directory, base = os.path.split(self.baseFilename)
+        backups = sorted(
+            (os.path.join(directory, f) for f in os.listdir(directory) if f.startswith(base + ".")),
+            key=os.path.getmtime
+        )
+        for old in backups[:max(len(backups) - self.backup_count, 0)]:
+            os.remove(old)
+
+
+class ContextFilter(logging.Filter):
+    """Tags records with the task and agent of the active tracing span."""
+
+    _current_span = None
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if ContextFilter._current_span is None:
+            # Imported lazily: tracing itself logs through this module
+            from src.core.tracing import tracer
+            ContextFilter._current_span = tracer.current
+        span = ContextFilter._current_span()
+        if span is not None:
+            if getattr(record, "task_id", None) is None:
+                record.task_id = span.attributes.get("task_id")
+            if getattr(record, "agent", None) is None:
+                record.agent = span.attributes.get("agent")
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps a fixed fraction of sub-WARNING records per module.
+
+    Rates come from ``LOG_SAMPLING`` ("ollama_client=0.1,llm_cache=0.01");
+    sampling is deterministic (every 1/rate-th record), and warnings and
+    errors always pass.
+    """
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = rates
+        self._seen: Dict[str, int] = {}
+        self.dropped = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        rate = self.rates.get(record.module)
+        if rate is None or rate >= 1 or record.levelno >= logging.WARNING:
+            return True
+        seen = self._seen.get(record.module, 0) + 1
+        self._seen[record.module] = seen
+        if int(seen * rate) != int((seen - 1) * rate):
+            return True
+        self.dropped += 1
+        return False
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """Enqueues records without formatting them on the calling thread."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Only resolve %-args; formatting and tracebacks render on the listener thread
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+
+def parse_sampling(spec: str) -> Dict[str, float]:
+    rates = {}
+    for item in spec.split(","):
+        if "=" in item:
+            module, rate = item.split("=", 1)
+            rates[module.strip()] = float(rate)
+    return rates
+
+
+def _build_handlers() -> list:
+    text = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 
-def setup_logger(name: str) -> logging.Logger:
-    """Create a logger with both file and console handlers."""
-    logger = logging.getLogger(name)
-    logger.setLevel(logging.INFO)
-    
-    # Create formatters
-    formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
-    
     # Console handler
     console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
-    
+    console_handler.setFormatter(JsonLinesFormatter() if settings.log_console_format == "json" else text)
+
     # File handler
-    file_handler = logging.FileHandler(
-        f'logs/{datetime.now().strftime("%Y%m%d")}_multiagent.log'
+    file_handler = RotatingLogFileHandler(
+        os.path.join(settings.log_dir, settings.log_file),
+        max_bytes=settings.log_max_bytes,
+        interval=settings.log_rotate_interval_hours * 3600,
+        backup_count=settings.log_backup_count,
+        compress=settings.log_compress
     )
-    file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
-    
+    file_handler.setFormatter(JsonLinesFormatter() if settings.log_format == "json" else text)
+    return [console_handler, file_handler]
+
+
+_log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+_listener: Optional[logging.handlers.QueueListener] = None
+_listener_lock = threading.Lock()
+sampling_filter = SamplingFilter(parse_sampling(settings.log_sampling))
+
+
+def _start_listener():
+    """Start the single background writer thread shared by every logger."""
+    global _listener
+    with _listener_lock:
+        if _listener is None:
+            _listener = logging.handlers.QueueListener(
+                _log_queue, *_build_handlers(), respect_handler_level=True
+            )
+            _listener.start()
+            atexit.register(stop_logging)
+
+
+def stop_logging():
+    """Flush queued records and stop the writer thread."""
+    global _listener
+    with _listener_lock:
+        if _listener is not None:
+            _listener.stop()
+            for handler in _listener.handlers:
+                handler.close()
+            _listener = None
+
+
+def setup_logger(name: str) -> logging.Logger:
+    """Create a logger that hands records to the background writer thread.
+
+    Safe to call more than once: a logger that is already set up is
+    returned unchanged rather than getting duplicate handlers.
+    """
+    logger = logging.getLogger(name)
+    if any(isinstance(h, _QueueHandler) for h in logger.handlers):
+        return logger
+    logger.setLevel(settings.log_level.upper())
+    logger.propagate = False
+
+    _start_listener()
+    handler = _QueueHandler(_log_queue)
+    handler.addFilter(sampling_filter)
+    handler.addFilter(ContextFilter())
+    logger.addHandler(handler)
+
     return logger
 
 # Create main logger
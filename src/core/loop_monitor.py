@@ -0,0 +1,66 @@
+import asyncio
+import time
+from typing import Any, Dict, Optional
+from src.core.config import settings
+from src.core.logger import logger
+from src.core.metrics import metrics
+
+lag_seconds = metrics.histogram(
+    "event_loop_lag_seconds", "How late the event loop ran a timer scheduled for now",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+)
+
+
+class EventLoopLagMonitor:
+    """Measures event-loop lag by timing a short sleep against its schedule.
+
+    Anything that blocks the loop (CPU-heavy serialisation, sync I/O)
+    delays the wake-up; the delay is exported as a histogram on /metrics.
+    """
+
+    def __init__(self, interval: float = 0.1, warn_threshold: float = 0.5):
+        self.interval = interval
+        self.warn_threshold = warn_threshold
+        self.samples = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        if self.interval > 0 and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag = max(time.perf_counter() - start - self.interval, 0.0)
+            self.samples += 1
+            self.last_lag = lag
+            self.max_lag = max(self.max_lag, lag)
+            lag_seconds.observe(lag)
+            if lag >= self.warn_threshold:
+                logger.warning(f"Event loop blocked for {lag * 1000:.0f}ms")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "samples": self.samples,
+            "last_lag_ms": round(self.last_lag * 1000, 3),
+            "max_lag_ms": round(self.max_lag * 1000, 3)
+        }
+
+
+loop_monitor = EventLoopLagMonitor(
+    interval=settings.loop_lag_interval_ms / 1000,
+    warn_threshold=settings.loop_lag_warn_ms / 1000
+)
@@ -1,29 +1,240 @@
+import asyncio
 import requests
+import httpx
 import json
+from typing import Any, AsyncIterator, Dict, Optional, Set
+from src.core.config import settings
+from src.core.llm_cache import get_llm_cache, make_cache_key
+from src.core.single_flight import SingleFlight
+from src.core.llm_scheduler import llm_scheduler
+from src.core.metrics import llm_tokens
+from src.core.token_budget import estimate_tokens
+from src.core.tracing import tracer
+
+# Process-wide connection pools shared by every OllamaClient instance
+_async_client: Optional[httpx.AsyncClient] = None
+_async_client_loop: Optional[asyncio.AbstractEventLoop] = None
+_async_transport: Optional[httpx.AsyncBaseTransport] = None
+_sync_session: Optional[requests.Session] = None
+# Replaced clients still being closed in the background
+_closing: Set[asyncio.Task] = set()
+
+# Identical concurrent generate calls share one request to the model
+llm_flight = SingleFlight("llm")
+
+
+def _build_timeout(timeout: Optional[float] = None) -> httpx.Timeout:
+    """Build an httpx timeout, using the configured defaults when not given."""
+    return httpx.Timeout(
+        timeout if timeout is not None else settings.ollama_timeout,
+        connect=settings.ollama_connect_timeout
+    )
+
+
+def _count_tokens(span, model: str, body: Dict[str, Any], prompt: str, completion: str):
+    """Record token usage, preferring Ollama's own counts over local estimates."""
+    if not tracer.enabled:
+        return
+    prompt_tokens = body.get("prompt_eval_count") or estimate_tokens(prompt)
+    completion_tokens = body.get("eval_count") or estimate_tokens(completion)
+    llm_tokens.inc(prompt_tokens, model=model, direction="prompt")
+    llm_tokens.inc(completion_tokens, model=model, direction="completion")
+    span.set("prompt_tokens", prompt_tokens)
+    span.set("completion_tokens", completion_tokens)
+
+
+def _retire_client(client: Optional[httpx.AsyncClient], loop: Optional[asyncio.AbstractEventLoop]):
+    """Close a replaced shared client on the loop that owns its connections."""
+    if client is None or client.is_closed or loop is None or loop.is_closed():
+        # A closed loop's connections cannot be closed through it; they go with the loop
+        return
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if loop is running:
+        task = loop.create_task(client.aclose())
+        _closing.add(task)
+        task.add_done_callback(_closing.discard)
+    elif loop.is_running():
+        asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+    elif running is None:
+        loop.run_until_complete(client.aclose())
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get the shared keep-alive HTTP client, creating it on first use."""
+    global _async_client, _async_client_loop
+    loop = asyncio.get_running_loop()
+
+    # A client is bound to the loop it was first used on
+    if _async_client is None or _async_client.is_closed or _async_client_loop is not loop:
+        _retire_client(_async_client, _async_client_loop)
+        _async_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.ollama_pool_size,
+                max_keepalive_connections=settings.ollama_pool_size,
+                keepalive_expiry=settings.ollama_keepalive_expiry
+            ),
+            timeout=_build_timeout(),
+            transport=_async_transport
+        )
+        _async_client_loop = loop
+    return _async_client
+
+
+def set_http_transport(transport: Optional[httpx.AsyncBaseTransport]):
+    """Route the shared client through a custom transport (tests, benchmarks)."""
+    global _async_transport, _async_client, _async_client_loop
+    _async_transport = transport
+    # Force the next call to build a client on the new transport
+    _retire_client(_async_client, _async_client_loop)
+    _async_client = None
+    _async_client_loop = None
+
+
+async def close_http_client():
+    """Close the shared HTTP client and release pooled connections."""
+    global _async_client, _async_client_loop
+    if _async_client is not None and not _async_client.is_closed:
+        await _async_client.aclose()
+    _async_client = None
+    _async_client_loop = None
+
+
+async def ping(base_url: Optional[str] = None, timeout: float = 1.0) -> bool:
+    """Check that the Ollama server answers, using the shared client."""
+    response = await get_http_client().get(
+        f"{base_url or settings.ollama_base_url}/api/tags", timeout=timeout
+    )
+    response.raise_for_status()
+    return True
+
+
+def _get_sync_session() -> requests.Session:
+    """Get the shared keep-alive session used by the blocking client."""
+    global _sync_session
+    if _sync_session is None:
+        _sync_session = requests.Session()
+    return _sync_session
+
 
 class OllamaClient:
-    def __init__(self, model="phi:latest"):
-        self.base_url = "http://ollama:11434"
-        # self.base_url = "http://localhost:11434"  # When local
+    def __init__(self, model="phi:latest", base_url: Optional[str] = None):
+        self.base_url = base_url or settings.ollama_base_url
         self.model = model
-    
-    def chat(self, prompt: str, system_prompt: str = None) -> str:
-        """Send request to Ollama using generate endpoint"""
+
+    def _build_payload(self, prompt: str, system_prompt: str = None, stream: bool = False,
+                       options: Optional[Dict[str, Any]] = None) -> dict:
+        """Build the request body for the generate endpoint."""
         full_prompt = prompt
         if system_prompt:
             full_prompt = f"{system_prompt}\n\n{prompt}"
-        
-        response = requests.post(
+
+        payload = {
+            "model": self.model,
+            "prompt": full_prompt,
+            "stream": stream
+        }
+        if options:
+            payload["options"] = options
+        return payload
+
+    def chat(self, prompt: str, system_prompt: str = None, timeout: Optional[float] = None) -> str:
+        """Send request to Ollama using generate endpoint (blocking)."""
+        response = _get_sync_session().post(
             f"{self.base_url}/api/generate",
-            json={
-                "model": self.model,
-                "prompt": full_prompt,
-                "stream": False
-            },
-            timeout=60
+            json=self._build_payload(prompt, system_prompt),
+            timeout=timeout if timeout is not None else settings.ollama_timeout
         )
-        
+
         if response.status_code == 200:
             return response.json()['response']
         else:
             raise Exception(f"Ollama error: {response.text}")
+
+    async def achat(self, prompt: str, system_prompt: str = None, timeout: Optional[float] = None,
+                    options: Optional[Dict[str, Any]] = None, use_cache: bool = True) -> str:
+        """Send request to Ollama without blocking the event loop.
+        
+        Responses are served from the LLM cache when an identical request
+        was answered recently; pass ``use_cache=False`` to bypass it.
+        Identical requests already in flight are joined rather than resent.
+        """
+        cache = get_llm_cache() if use_cache else None
+        key = make_cache_key(self.model, prompt, system_prompt, options)
+        if cache:
+            cached = await cache.get(key)
+            if cached is not None:
+                return cached
+
+        async def generate() -> str:
+            client = get_http_client()
+            async with llm_scheduler.slot(self.model):
+                with tracer.span("llm", self.model, operation="generate") as span:
+                    response = await client.post(
+                        f"{self.base_url}/api/generate",
+                        json=self._build_payload(prompt, system_prompt, options=options),
+                        timeout=_build_timeout(timeout)
+                    )
+                    if response.status_code != 200:
+                        raise Exception(f"Ollama error: {response.text}")
+                    body = response.json()
+                    _count_tokens(span, self.model, body, prompt, body['response'])
+            return body['response']
+
+        if settings.llm_single_flight:
+            text, shared = await llm_flight.do(f"{self.base_url}:{key}", generate)
+        else:
+            text, shared = await generate(), False
+
+        if cache and not shared:
+            await cache.set(key, text)
+        return text
+
+    async def astream(self, prompt: str, system_prompt: str = None, timeout: Optional[float] = None,
+                      options: Optional[Dict[str, Any]] = None,
+                      use_cache: bool = True) -> AsyncIterator[str]:
+        """Stream response tokens from Ollama as they are generated.
+        
+        A cached response is replayed as a single chunk; a completed
+        stream is written back to the cache.
+        """
+        cache = get_llm_cache() if use_cache else None
+        key = make_cache_key(self.model, prompt, system_prompt, options)
+        if cache:
+            cached = await cache.get(key)
+            if cached is not None:
+                yield cached
+                return
+
+        chunks = []
+        client = get_http_client()
+        # Not activated: this span stays open across yields to the caller
+        async with llm_scheduler.slot(self.model):
+            with tracer.span("llm", self.model, activate=False, operation="stream") as span:
+                async with client.stream(
+                    "POST",
+                    f"{self.base_url}/api/generate",
+                    json=self._build_payload(prompt, system_prompt, stream=True, options=options),
+                    timeout=_build_timeout(timeout)
+                ) as response:
+                    if response.status_code != 200:
+                        body = await response.aread()
+                        raise Exception(f"Ollama error: {body.decode(errors='replace')}")
+
+                    # Ollama streams one JSON object per line
+                    async for line in response.aiter_lines():
+                        if not line.strip():
+                            continue
+                        chunk = json.loads(line)
+                        if chunk.get("error"):
+                            raise Exception(f"Ollama error: {chunk['error']}")
+                        if chunk.get("response"):
+                            chunks.append(chunk["response"])
+                            yield chunk["response"]
+                        if chunk.get("done"):
+                            _count_tokens(span, self.model, chunk, prompt, "".join(chunks))
+                            if cache:
+                                await cache.set(key, "".join(chunks))
+                            break
@@ -0,0 +1,326 @@
+import argparse
+import asyncio
+import gzip
+import os
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from sqlalchemy import delete, func, select
+from src.core.blob_store import get_blob_store, load_output
+from src.core.config import settings
+from src.core.database import AgentLog, AsyncSessionLocal, TaskExecution, WorkflowCheckpoint, engine
+from src.core.logger import logger
+from src.core.metrics import metrics
+from src.core.serialization import dumps
+from src.core.tracing import tracer
+
+retention_rows = metrics.counter(
+    "retention_rows_total", "Rows removed by the retention job", labels=("table", "action")
+)
+
+# Pages freed per incremental_vacuum statement, so the write lock is released between chunks
+_VACUUM_CHUNK_PAGES = 256
+
+
+def parse_ttl(spec: str) -> Dict[str, float]:
+    """``"completed=30,failed=90"`` -> ``{"completed": 30.0, "failed": 90.0}`` (days)."""
+    ttl = {}
+    for item in spec.split(","):
+        if "=" in item:
+            status, days = item.split("=", 1)
+            ttl[status.strip()] = float(days)
+    return ttl
+
+
+def _row_dict(row: Any, table) -> Dict[str, Any]:
+    return {column.name: getattr(row, column.name) for column in table.columns}
+
+
+def _write_partitions(archive_dir: str, table: str, rows: List[Dict[str, Any]], time_column: str):
+    """Append rows to ``<archive_dir>/<table>/<YYYY-MM-DD>.jsonl.gz``, one file per day.
+
+    Each call appends a new gzip member, which gzip readers concatenate
+    transparently.
+    """
+    partitions: Dict[str, List[bytes]] = defaultdict(list)
+    for row in rows:
+        stamp = row.get(time_column)
+        day = stamp.strftime("%Y-%m-%d") if stamp else "undated"
+        partitions[day].append(dumps(row))
+    directory = os.path.join(archive_dir, table)
+    os.makedirs(directory, exist_ok=True)
+    for day, lines in partitions.items():
+        with gzip.open(os.path.join(directory, f"{day}.jsonl.gz"), "ab") as f:
+            f.write(b"\n".join(lines) + b"\n")
+            f.flush()
+            # On disk before the rows are deleted
+            os.fsync(f.fileobj.fileno())
+
+
+def _incremental_vacuum(max_pages: int, pause: float) -> Optional[int]:
+    """Return up to ``max_pages`` free pages to the OS; None if the database is not set up for it."""
+    raw = engine.raw_connection()
+    try:
+        connection = raw.driver_connection
+        if connection.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:  # INCREMENTAL
+            return None
+        freed = 0
+        while freed < max_pages:
+            free = connection.execute("PRAGMA freelist_count").fetchone()[0]
+            if free == 0:
+                break
+            chunk = min(free, _VACUUM_CHUNK_PAGES, max_pages - freed)
+            # executescript steps the pragma to completion; execute() would free a single page
+            connection.executescript(f"PRAGMA incremental_vacuum({chunk});")
+            freed += chunk
+            time.sleep(pause)
+        connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return freed
+    finally:
+        raw.close()
+
+
+def enable_incremental_vacuum():
+    """One-off full VACUUM switching an existing SQLite file to incremental auto-vacuum.
+
+    New databases are created that way already; older ones need this once.
+    It rewrites the whole file, so run it during a quiet period.
+    """
+    raw = engine.raw_connection()
+    try:
+        connection = raw.driver_connection
+        connection.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        connection.execute("VACUUM")
+    finally:
+        raw.close()
+
+
+class RetentionJob:
+    """Archives and deletes expired task rows and agent logs, then compacts the database.
+
+    Expired rows are appended to day-partitioned JSONL.gz files (offloaded
+    outputs are inlined from the blob store) before they are deleted.
+    Deletes run in batches of ``batch_size`` rows, each its own short
+    transaction followed by a pause, so API writers are never locked out
+    for long. A task's agent logs and checkpoints go with it, and blobs no
+    longer referenced by any row are removed.
+    """
+
+    def __init__(self, ttl_days: Dict[str, float], agent_log_days: float = 30,
+                 archive_dir: str = "", batch_size: int = 500, batch_pause: float = 0.05,
+                 vacuum_pages: int = 2000, interval: float = 0):
+        self.ttl_days = ttl_days
+        self.agent_log_days = agent_log_days
+        self.archive_dir = archive_dir
+        self.batch_size = batch_size
+        self.batch_pause = batch_pause
+        self.vacuum_pages = vacuum_pages
+        self.interval = interval
+        self.runs = 0
+        self.last_run: Optional[datetime] = None
+        self.last_result: Dict[str, int] = {}
+        self._lock: Optional[asyncio.Lock] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_settings(cls) -> "RetentionJob":
+        return cls(
+            ttl_days=parse_ttl(settings.retention_ttl_days),
+            agent_log_days=settings.retention_agent_log_days,
+            archive_dir=settings.retention_archive_dir,
+            batch_size=settings.retention_batch_size,
+            batch_pause=settings.retention_batch_pause_ms / 1000,
+            vacuum_pages=settings.retention_vacuum_pages,
+            interval=settings.retention_interval_hours * 3600
+        )
+
+    async def run_once(self, dry_run: bool = False, vacuum: bool = True) -> Dict[str, int]:
+        """One retention pass; with ``dry_run`` only count what would be removed."""
+        if self._lock is None:
+            self._lock = asyncio.Lock()  # created on the loop that uses it
+        async with self._lock:
+            now = datetime.utcnow()
+            result = {"task_executions": 0, "agent_logs": 0, "blobs": 0, "vacuumed_pages": 0}
+            with tracer.span("retention", "run", dry_run=dry_run):
+                for status, days in self.ttl_days.items():
+                    cutoff = now - timedelta(days=days)
+                    if dry_run:
+                        result["task_executions"] += await self._count(
+                            TaskExecution, TaskExecution.status == status, TaskExecution.created_at < cutoff
+                        )
+                        continue
+                    tasks, logs, blobs = await self._purge_tasks(status, cutoff)
+                    result["task_executions"] += tasks
+                    result["agent_logs"] += logs
+                    result["blobs"] += blobs
+                if self.agent_log_days > 0:
+                    cutoff = now - timedelta(days=self.agent_log_days)
+                    if dry_run:
+                        result["agent_logs"] += await self._count(AgentLog, AgentLog.timestamp < cutoff)
+                    else:
+                        result["agent_logs"] += await self._purge_logs(cutoff)
+                if vacuum and not dry_run and engine.dialect.name == "sqlite":
+                    freed = await asyncio.to_thread(
+                        _incremental_vacuum, self.vacuum_pages, self.batch_pause
+                    )
+                    if freed is None:
+                        logger.info("Database is not in incremental auto-vacuum mode; run "
+                                    "`python -m src.core.retention --enable-incremental-vacuum` once")
+                    result["vacuumed_pages"] = freed or 0
+            if not dry_run:
+                self.runs += 1
+                self.last_run = now
+                self.last_result = result
+            logger.info(f"Retention {'dry run' if dry_run else 'pass'}: {result}")
+            return result
+
+    async def _count(self, model, *conditions) -> int:
+        async with AsyncSessionLocal() as db:
+            return (await db.execute(select(func.count()).select_from(model).where(*conditions))).scalar()
+
+    async def _archive(self, table: str, rows: List[Dict[str, Any]], time_column: str):
+        if self.archive_dir and rows:
+            await asyncio.to_thread(_write_partitions, self.archive_dir, table, rows, time_column)
+            retention_rows.inc(len(rows), table=table, action="archived")
+
+    async def _purge_tasks(self, status: str, cutoff: datetime):
+        """Archive and delete expired tasks with one status, a batch at a time."""
+        tasks_deleted = logs_deleted = blobs_deleted = 0
+        while True:
+            async with AsyncSessionLocal() as db:
+                # Served by the (status, created_at, id) index
+                tasks = (await db.execute(
+                    select(TaskExecution)
+                    .where(TaskExecution.status == status, TaskExecution.created_at < cutoff)
+                    .order_by(TaskExecution.created_at, TaskExecution.id)
+                    .limit(self.batch_size)
+                )).scalars().all()
+                if not tasks:
+                    break
+                task_ids = [task.task_id for task in tasks]
+                logs = (await db.execute(
+                    select(AgentLog).where(AgentLog.task_id.in_(task_ids))
+                )).scalars().all()
+
+                task_rows = [_row_dict(task, TaskExecution.__table__) for task in tasks]
+                if self.archive_dir:
+                    # Archives are self-contained: offloaded outputs are written inline
+                    for row in task_rows:
+                        if row["output_ref"]:
+                            row["output_data"] = await load_output(None, row["output_ref"])
+                await self._archive("task_executions", task_rows, "created_at")
+                await self._archive("agent_logs", [_row_dict(log, AgentLog.__table__) for log in logs], "timestamp")
+
+                with tracer.span("db", "retention.delete_tasks", rows=len(tasks)):
+                    await db.execute(delete(AgentLog).where(AgentLog.task_id.in_(task_ids)))
+                    await db.execute(delete(WorkflowCheckpoint).where(WorkflowCheckpoint.task_id.in_(task_ids)))
+                    # Re-checked so a task resumed since it was read is left alone
+                    deleted = await db.execute(
+                        delete(TaskExecution)
+                        .where(TaskExecution.id.in_([task.id for task in tasks]),
+                               TaskExecution.status == status)
+                    )
+                    await db.commit()
+                tasks_deleted += deleted.rowcount
+                logs_deleted += len(logs)
+                retention_rows.inc(deleted.rowcount, table="task_executions", action="deleted")
+                retention_rows.inc(len(logs), table="agent_logs", action="deleted")
+
+                refs = {task.output_ref for task in tasks if task.output_ref}
+                blobs_deleted += await self._collect_blobs(db, refs)
+            await asyncio.sleep(self.batch_pause)
+        return tasks_deleted, logs_deleted, blobs_deleted
+
+    async def _collect_blobs(self, db, refs: set) -> int:
+        """Delete blobs that no remaining row references (blobs are shared between identical outputs)."""
+        store = get_blob_store()
+        if not refs or store is None:
+            return 0
+        still_used = set((await db.execute(
+            select(TaskExecution.output_ref).where(TaskExecution.output_ref.in_(refs))
+        )).scalars().all())
+        orphaned = refs - still_used
+        for ref in orphaned:
+            await store.delete(ref)
+        retention_rows.inc(len(orphaned), table="blobs", action="deleted")
+        return len(orphaned)
+
+    async def _purge_logs(self, cutoff: datetime) -> int:
+        """Archive and delete agent logs older than ``cutoff`` whatever their task's state."""
+        deleted = 0
+        while True:
+            async with AsyncSessionLocal() as db:
+                # Ids grow with time, so the oldest logs are found at the start of the primary key
+                logs = (await db.execute(
+                    select(AgentLog).where(AgentLog.timestamp < cutoff)
+                    .order_by(AgentLog.id).limit(self.batch_size)
+                )).scalars().all()
+                if not logs:
+                    break
+                await self._archive("agent_logs", [_row_dict(log, AgentLog.__table__) for log in logs], "timestamp")
+                with tracer.span("db", "retention.delete_agent_logs", rows=len(logs)):
+                    await db.execute(delete(AgentLog).where(AgentLog.id.in_([log.id for log in logs])))
+                    await db.commit()
+                deleted += len(logs)
+                retention_rows.inc(len(logs), table="agent_logs", action="deleted")
+            await asyncio.sleep(self.batch_pause)
+        return deleted
+
+    async def start(self):
+        if self.interval > 0 and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            # Sleep first so a pass never competes with startup recovery
+            await asyncio.sleep(self.interval)
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"Retention pass failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "scheduled": self._task is not None and not self._task.done(),
+            "interval_hours": self.interval / 3600,
+            "ttl_days": self.ttl_days,
+            "runs": self.runs,
+            "last_run": self.last_run.isoformat() if self.last_run else None,
+            "last_result": self.last_result
+        }
+
+
+retention_job = RetentionJob.from_settings()
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        prog="python -m src.core.retention",
+        description="Archive and delete expired task executions and agent logs, then compact the database."
+    )
+    parser.add_argument("--dry-run", action="store_true", help="only count the rows that would be removed")
+    parser.add_argument("--no-vacuum", action="store_true", help="skip the incremental vacuum")
+    parser.add_argument("--enable-incremental-vacuum", action="store_true",
+                        help="switch an existing SQLite database to incremental auto-vacuum (full VACUUM)")
+    args = parser.parse_args(argv)
+
+    if args.enable_incremental_vacuum:
+        enable_incremental_vacuum()
+        print("Incremental auto-vacuum enabled")
+        return
+    result = asyncio.run(retention_job.run_once(dry_run=args.dry_run, vacuum=not args.no_vacuum))
+    print(dumps(result).decode())
+
+
+if __name__ == "__main__":
+    main()
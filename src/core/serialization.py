@@ -0,0 +1,100 @@
+import asyncio
+import json
+from datetime import date, datetime
+from typing import Any, Dict, Iterator, Optional
+from fastapi.responses import JSONResponse, Response
+from src.core.config import settings
+from src.core.metrics import metrics
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional; stdlib json is the fallback
+    orjson = None
+
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS if orjson else 0
+
+offloads = metrics.counter(
+    "json_offloads_total", "Payloads serialised on a worker thread instead of the event loop"
+)
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+def dumps(obj: Any) -> bytes:
+    """Compact JSON bytes, via orjson when it is installed."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS)
+        except (TypeError, orjson.JSONEncodeError):
+            pass  # e.g. integers beyond 64 bits; the stdlib copes
+    return json.dumps(obj, default=_default, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+_END = object()
+
+
+def _dict_items(d: Dict[Any, Any]) -> Iterator[Any]:
+    for key, value in d.items():
+        yield str(key)
+        yield value
+
+
+def estimate_size(obj: Any, limit: int) -> int:
+    """Rough encoded size of ``obj``, giving up as soon as it passes ``limit``.
+
+    Costs at most about ``limit`` bytes' worth of walking, so deciding
+    whether to offload a payload stays cheap even for huge ones.
+    """
+    size = 0
+    # Iterators rather than expanded lists, so wide containers are not walked past the limit
+    stack = [iter((obj,))]
+    while stack and size <= limit:
+        item = next(stack[-1], _END)
+        if item is _END:
+            stack.pop()
+        elif isinstance(item, str):
+            size += len(item) + 3  # quotes and separator
+        elif isinstance(item, dict):
+            size += 2
+            stack.append(_dict_items(item))
+        elif isinstance(item, (list, tuple)):
+            size += 2
+            stack.append(iter(item))
+        else:
+            size += 8
+    return size
+
+
+async def dumps_async(obj: Any, threshold: Optional[int] = None) -> bytes:
+    """Serialise ``obj``, moving large payloads off the event loop."""
+    threshold = settings.json_offload_threshold_bytes if threshold is None else threshold
+    if estimate_size(obj, threshold) < threshold:
+        return dumps(obj)
+    offloads.inc()
+    return await asyncio.to_thread(dumps, obj)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with :func:`dumps` (orjson, compact)."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+async def json_response(content: Any, status_code: int = 200,
+                        headers: Optional[Dict[str, str]] = None) -> Response:
+    """A JSON response whose body is serialised off the loop when it is large.
+
+    Returning a ``Response`` also skips FastAPI's own re-validation and
+    encoding of the payload through the endpoint's ``response_model``.
+    """
+    return Response(
+        content=await dumps_async(content),
+        status_code=status_code,
+        headers=headers,
+        media_type="application/json"
+    )
@@ -0,0 +1,65 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+
+class _Flight:
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Coalesces concurrent calls that share a key into one execution.
+
+    The first caller for a key starts the work; callers arriving while it
+    is still running wait on the same task and get the same result (or
+    exception). The work is only cancelled once every waiter has gone.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._flights: Dict[str, _Flight] = {}
+        self.calls = 0
+        self.executions = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """Run ``fn`` once per in-flight key; returns (result, shared)."""
+        self.calls += 1
+        loop = asyncio.get_running_loop()
+        flight = self._flights.get(key)
+        shared = self.in_flight(key)
+        if not shared:
+            self.executions += 1
+            flight = _Flight(loop.create_task(fn()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _, f=flight: self._forget(key, f))
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task), shared
+        except asyncio.CancelledError:
+            if not flight.task.done() and flight.waiters == 1:
+                flight.task.cancel()
+            raise
+        finally:
+            flight.waiters -= 1
+
+    def in_flight(self, key: str) -> bool:
+        """Whether a call for ``key`` now would join an existing execution."""
+        flight = self._flights.get(key)
+        return flight is not None and flight.task.get_loop() is asyncio.get_running_loop()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "executions": self.executions,
+            "coalesced": self.calls - self.executions,
+            "in_flight": len(self._flights)
+        }
+
+    def _forget(self, key: str, flight: _Flight):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        if not flight.task.cancelled():
+            # Retrieve the exception so an unawaited failure is not reported
+            flight.task.exception()
@@ -0,0 +1,205 @@
+import asyncio
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from src.core.logger import logger
+
+# Coroutine that executes a task: (task_id, input_data) -> result
+TaskRunner = Callable[[str, Dict[str, Any]], Awaitable[Dict[str, Any]]]
+
+
+class QueueFullError(Exception):
+    """Raised when the task queue cannot accept more jobs."""
+    pass
+
+
+class TaskJob:
+    """A submitted task and its progress through the queue."""
+
+    def __init__(self, task_id: str, input_data: Dict[str, Any], deadline_ms: Optional[int] = None,
+                 resume: bool = False, persist: bool = True):
+        self.task_id = task_id
+        self.input_data = input_data
+        # Re-run of an interrupted task that should pick up from its checkpoints
+        self.resume = resume
+        # False when the submitter writes the task's database row itself
+        self.persist = persist
+        self.status = "queued"
+        self.created_at = datetime.utcnow()
+        self.started_at: Optional[datetime] = None
+        self.completed_at: Optional[datetime] = None
+        # Deadlines run from submission, so time spent queued counts against them
+        self.deadline: Optional[float] = time.monotonic() + deadline_ms / 1000 if deadline_ms else None
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.task: Optional[asyncio.Task] = None
+
+
+class TaskQueue:
+    """In-process job queue drained by a fixed number of worker coroutines."""
+
+    def __init__(self, runner: TaskRunner, workers: int = 4, max_size: int = 1000):
+        self.runner = runner
+        self.worker_count = workers
+        self.max_size = max_size
+        self._queue: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._workers: List[asyncio.Task] = []
+        self._jobs: Dict[str, TaskJob] = {}
+        # Queued task IDs in submission order, for queue positions
+        self._pending: "OrderedDict[str, None]" = OrderedDict()
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+
+    @property
+    def running(self) -> bool:
+        # Workers belong to the loop that started them
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        return bool(self._workers) and self._loop is loop
+
+    async def start(self):
+        """Start the worker coroutines."""
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=self.max_size)
+        self._jobs.clear()
+        self._pending.clear()
+        self._workers = [
+            asyncio.create_task(self._worker(i)) for i in range(self.worker_count)
+        ]
+        logger.info(f"Task queue started with {self.worker_count} workers")
+
+    async def stop(self):
+        """Cancel the workers; queued jobs that have not started are dropped."""
+        for worker in self._workers:
+            worker.cancel()
+        if self.running:
+            await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+        for task_id in list(self._pending):
+            job = self._jobs.pop(task_id)
+            if not job.future.done():
+                job.future.cancel()
+        self._pending.clear()
+        logger.info("Task queue stopped")
+
+    async def submit(self, task_id: str, input_data: Dict[str, Any],
+                     deadline_ms: Optional[int] = None, resume: bool = False,
+                     persist: bool = True) -> TaskJob:
+        """Enqueue a task and return its job handle without waiting for it."""
+        if not self.running:
+            await self.start()
+        if task_id in self._jobs:
+            raise ValueError(f"Task {task_id} is already queued or running")
+
+        job = TaskJob(task_id, input_data, deadline_ms, resume, persist)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise QueueFullError(f"Task queue is full ({self.max_size} jobs)")
+
+        self._jobs[task_id] = job
+        self._pending[task_id] = None
+        return job
+
+    def free_slots(self) -> int:
+        """How many more jobs can be queued right now."""
+        if self._queue is None or not self.running:
+            return self.max_size
+        return self.max_size - self._queue.qsize()
+
+    def get(self, task_id: str) -> Optional[TaskJob]:
+        """Get a job that is still queued or running."""
+        return self._jobs.get(task_id)
+
+    def cancel(self, task_id: str) -> Optional[str]:
+        """Cancel a queued or running job; returns the state it was cancelled in."""
+        job = self._jobs.get(task_id)
+        if job is None or job.status not in ("queued", "in_progress"):
+            return None
+
+        previous = job.status
+        if previous == "queued":
+            # The worker skips it when it reaches the front of the queue
+            job.status = "cancelled"
+            self._pending.pop(task_id, None)
+            self._jobs.pop(task_id, None)
+            self.cancelled += 1
+            job.future.cancel()
+        elif job.task is not None:
+            job.task.cancel()
+        return previous
+
+    def position(self, task_id: str) -> Optional[int]:
+        """1-based position of a queued job, or None once it has started."""
+        for index, pending_id in enumerate(self._pending, 1):
+            if pending_id == task_id:
+                return index
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": len(self._workers),
+            "queued": len(self._pending),
+            "in_progress": len(self._jobs) - len(self._pending),
+            "completed": self.completed,
+            "failed": self.failed,
+            "cancelled": self.cancelled,
+            "max_size": self.max_size
+        }
+
+    async def _worker(self, index: int):
+        while True:
+            job: TaskJob = await self._queue.get()
+            if job.status == "cancelled":
+                self._queue.task_done()
+                continue
+
+            self._pending.pop(job.task_id, None)
+            job.status = "in_progress"
+            job.started_at = datetime.utcnow()
+
+            # Run the job in its own task so it can be cancelled without the worker
+            job.task = asyncio.ensure_future(self.runner(job.task_id, job.input_data))
+            try:
+                await asyncio.wait({job.task})
+                if job.task.cancelled():
+                    job.status = "cancelled"
+                    job.future.cancel()
+                elif job.task.exception() is not None:
+                    error = job.task.exception()
+                    logger.error(f"Worker {index} failed task {job.task_id}: {error}")
+                    job.status = "failed"
+                    if not job.future.done():
+                        job.future.set_exception(error)
+                        # Fire-and-forget submitters never await the future
+                        job.future.exception()
+                else:
+                    result = job.task.result()
+                    job.status = "completed" if result.get("status") == "success" else "failed"
+                    if not job.future.done():
+                        job.future.set_result(result)
+            except asyncio.CancelledError:
+                # The worker itself is stopping
+                job.task.cancel()
+                job.status = "cancelled"
+                if not job.future.done():
+                    job.future.cancel()
+                raise
+            finally:
+                job.completed_at = datetime.utcnow()
+                if job.status == "completed":
+                    self.completed += 1
+                elif job.status == "cancelled":
+                    self.cancelled += 1
+                else:
+                    self.failed += 1
+                # Finished jobs are served from the database from now on
+                self._jobs.pop(job.task_id, None)
+                self._queue.task_done()
@@ -0,0 +1,153 @@
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from src.core.metrics import metrics
+from src.core.serialization import estimate_size
+
+result_entries = metrics.gauge("task_registry_results", "Finished results held in the in-memory cache")
+result_bytes = metrics.gauge("task_registry_result_bytes", "Estimated bytes of cached results")
+live_handles = metrics.gauge("task_registry_live", "Handles of running tasks")
+pending_streams = metrics.gauge("task_registry_pending", "Streaming tasks whose stream has not been opened")
+
+
+class TaskRegistry:
+    """In-memory view of tasks: live handles plus a bounded cache of recent results.
+
+    Live handles (whatever is needed to control a running task) are kept
+    until the task finishes. Finished results go into an LRU bounded by
+    entry count, estimated bytes and age; anything evicted is served from
+    the database instead. Pending entries (registered streaming tasks whose
+    stream has not been opened) are bounded by count and age too.
+    """
+
+    def __init__(self, max_results: int = 1000, max_bytes: int = 64 * 1024 * 1024, ttl: float = 300,
+                 max_pending: int = 1000, pending_ttl: float = 300):
+        self.max_results = max_results
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.max_pending = max_pending
+        self.pending_ttl = pending_ttl
+        self._live: Dict[str, Any] = {}
+        # task_id -> (registered_at, request), oldest first
+        self._pending: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        # Recently expired pending ids, so callers can tell "expired" from "unknown"
+        self._expired_pending: "OrderedDict[str, None]" = OrderedDict()
+        self.pending_expirations = 0
+        # task_id -> (stored_at, size, result), oldest first
+        self._results: "OrderedDict[str, Tuple[float, int, Dict[str, Any]]]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def add_live(self, task_id: str, handle: Any):
+        self._live[task_id] = handle
+        self._publish()
+
+    def get_live(self, task_id: str) -> Optional[Any]:
+        return self._live.get(task_id)
+
+    def add_pending(self, task_id: str, request: Any):
+        """Hold a task until its stream is opened; the oldest are dropped past max_pending."""
+        self._expire_pending()
+        self._pending[task_id] = (time.monotonic(), request)
+        while len(self._pending) > self.max_pending:
+            self._forget_pending(next(iter(self._pending)))
+        self._publish()
+
+    def take_pending(self, task_id: str) -> Optional[Any]:
+        """Remove and return a pending task, or None if it is unknown or expired."""
+        self._expire_pending()
+        entry = self._pending.pop(task_id, None)
+        self._publish()
+        return entry[1] if entry is not None else None
+
+    def pending_expired(self, task_id: str) -> bool:
+        return task_id in self._expired_pending
+
+    def complete(self, task_id: str, result: Dict[str, Any]):
+        """Drop the live handle and remember the task's final result."""
+        self._live.pop(task_id, None)
+        self._drop(task_id)
+        # Walks the result only up to max_bytes, so a huge report never stalls the loop
+        size = estimate_size(result, self.max_bytes)
+        if size <= self.max_bytes:
+            self._results[task_id] = (time.monotonic(), size, result)
+            self._bytes += size
+            self._evict()
+        self._publish()
+
+    def get_result(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """A recent result, or None when it must be read from the database."""
+        entry = self._results.get(task_id)
+        if entry is None or time.monotonic() - entry[0] > self.ttl:
+            if entry is not None:
+                self._drop(task_id)
+                self.evictions += 1
+                self._publish()
+            self.misses += 1
+            return None
+        self._results.move_to_end(task_id)
+        self.hits += 1
+        return entry[2]
+
+    def discard(self, task_id: str):
+        """Forget a task entirely (live handle and cached result)."""
+        self._live.pop(task_id, None)
+        self._drop(task_id)
+        self._publish()
+
+    def stats(self) -> Dict[str, Any]:
+        self._evict()
+        self._expire_pending()
+        self._publish()
+        return {
+            "live": len(self._live),
+            "pending": len(self._pending),
+            "pending_expirations": self.pending_expirations,
+            "results": len(self._results),
+            "bytes": self._bytes,
+            "max_results": self.max_results,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions
+        }
+
+    def _publish(self):
+        result_entries.set(len(self._results))
+        result_bytes.set(self._bytes)
+        live_handles.set(len(self._live))
+        pending_streams.set(len(self._pending))
+
+    def _drop(self, task_id: str):
+        entry = self._results.pop(task_id, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+
+    def _evict(self):
+        now = time.monotonic()
+        while self._results:
+            task_id, (stored_at, _, _) = next(iter(self._results.items()))
+            # LRU order is also roughly age order, so expired entries sit at the front
+            if (len(self._results) > self.max_results or self._bytes > self.max_bytes
+                    or now - stored_at > self.ttl):
+                self._drop(task_id)
+                self.evictions += 1
+            else:
+                break
+
+    def _forget_pending(self, task_id: str):
+        self._pending.pop(task_id, None)
+        self._expired_pending[task_id] = None
+        while len(self._expired_pending) > self.max_pending:
+            self._expired_pending.popitem(last=False)
+        self.pending_expirations += 1
+
+    def _expire_pending(self):
+        now = time.monotonic()
+        while self._pending:
+            task_id, (registered_at, _) = next(iter(self._pending.items()))
+            if now - registered_at <= self.pending_ttl:
+                break
+            self._forget_pending(task_id)
@@ -0,0 +1,124 @@
+import json
+import re
+from typing import Any, List, Optional, Union
+
+# Roughly how BPE vocabularies split text: short word pieces and single
+# punctuation marks. Counting these is within ~10-15% of real tokenizers
+# for English prose and JSON, and needs no model files.
+_PIECE = re.compile(r"\w{1,4}|[^\w\s]")
+
+# Context windows (tokens) of the models we run through Ollama, by base name
+CONTEXT_WINDOWS = {
+    "phi": 2048,
+    "phi3": 4096,
+    "llama2": 4096,
+    "llama3": 8192,
+    "mistral": 8192,
+    "gemma": 8192,
+}
+DEFAULT_CONTEXT_WINDOW = 2048
+TRUNCATION_MARK = " …[truncated]"
+
+
+def estimate_tokens(text: str) -> int:
+    """Fast local estimate of how many tokens ``text`` will use."""
+    return sum(1 for _ in _PIECE.finditer(text))
+
+
+def truncate_to_tokens(text: str, max_tokens: int, mark: str = TRUNCATION_MARK) -> str:
+    """Cut ``text`` to at most ``max_tokens`` estimated tokens, scanning only what is kept."""
+    if max_tokens <= 0:
+        return ""
+    keep = max(max_tokens - estimate_tokens(mark), 0)
+    cut = 0
+    for count, match in enumerate(_PIECE.finditer(text), 1):
+        if count == keep + 1:
+            cut = match.start()  # where the kept text ends if a mark is needed
+        if count > max_tokens:
+            return text[:cut].rstrip() + mark
+    return text
+
+
+def context_budget(model: str, reserve_for_output: int = 512) -> int:
+    """Prompt tokens available for ``model`` after leaving room for the reply."""
+    window = CONTEXT_WINDOWS.get(model.split(":")[0], DEFAULT_CONTEXT_WINDOW)
+    return max(window - reserve_for_output, 0)
+
+
+def render_json(data: Any, max_tokens: int) -> str:
+    """Compact JSON for ``data``, serialising only as much as fits in ``max_tokens``.
+
+    Encoding is incremental, so a huge upstream result costs roughly the
+    budget to render rather than its full size.
+    """
+    if max_tokens <= 0:
+        return ""
+    encoder = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False, default=str)
+    parts: List[str] = []
+    used = 0
+    for chunk in encoder.iterencode(data):
+        tokens = estimate_tokens(chunk)
+        if used + tokens > max_tokens:
+            room = max_tokens - used - estimate_tokens(TRUNCATION_MARK)
+            parts.append(truncate_to_tokens(chunk, room, mark=""))
+            return "".join(parts).rstrip() + TRUNCATION_MARK
+        parts.append(chunk)
+        used += tokens
+    return "".join(parts)
+
+
+class PromptSection:
+    """One named piece of a prompt with its priority and optional token cap."""
+
+    def __init__(self, content: Union[str, Any], priority: int = 1, max_tokens: Optional[int] = None,
+                 label: str = ""):
+        self.content = content
+        # Lower numbers are kept first when the budget runs short
+        self.priority = priority
+        self.max_tokens = max_tokens
+        self.label = label
+
+    def render(self, budget: int) -> str:
+        if self.max_tokens is not None:
+            budget = min(budget, self.max_tokens)
+        label = f"{self.label}\n" if self.label else ""
+        budget -= estimate_tokens(label)
+        if budget <= 0:
+            return ""
+        if isinstance(self.content, str):
+            body = truncate_to_tokens(self.content, budget)
+        else:
+            body = render_json(self.content, budget)
+        return label + body if body else ""
+
+
+class PromptBuilder:
+    """Assemble a prompt section by section within a token budget.
+
+    Budget is handed out in priority order, so instructions and the topic
+    survive intact while bulky upstream data is trimmed; sections are
+    emitted in the order they were added.
+    """
+
+    def __init__(self, budget: int):
+        self.budget = budget
+        self._sections: List[PromptSection] = []
+
+    def add(self, content: Union[str, Any], priority: int = 1, max_tokens: Optional[int] = None,
+            label: str = "") -> "PromptBuilder":
+        self._sections.append(PromptSection(content, priority, max_tokens, label))
+        return self
+
+    def build(self, separator: str = "\n\n") -> str:
+        rendered = [""] * len(self._sections)
+        remaining = self.budget
+        separator_tokens = estimate_tokens(separator)
+        by_priority = sorted(range(len(self._sections)), key=lambda i: self._sections[i].priority)
+        for index in by_priority:
+            if remaining <= 0:
+                break
+            text = self._sections[index].render(remaining)
+            if text:
+                rendered[index] = text
+                remaining -= estimate_tokens(text) + separator_tokens
+        return separator.join(text for text in rendered if text)
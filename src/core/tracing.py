@@ -0,0 +1,228 @@
+import asyncio
+import json
+import os
+import queue
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Union
+from src.core.config import settings
+from src.core.logger import logger
+from src.core.metrics import span_errors, span_seconds, spans_in_flight
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+
+class Span:
+    """A timed operation; feeds the span metrics and, if configured, the trace file."""
+
+    __slots__ = ("tracer", "kind", "name", "attributes", "trace_id", "span_id", "parent_id",
+                 "start_ns", "end_ns", "_start", "error", "activate", "_token")
+
+    def __init__(self, tracer: "Tracer", kind: str, name: str, attributes: Dict[str, Any],
+                 parent: Optional["Span"], activate: bool):
+        self.tracer = tracer
+        self.kind = kind
+        self.name = name
+        self.attributes = attributes
+        if parent is not None:
+            self.trace_id = parent.trace_id
+            self.parent_id = parent.span_id
+            # Child spans are tagged with their task and agent without every call site passing them
+            for key in ("task_id", "agent"):
+                if key not in attributes and key in parent.attributes:
+                    attributes[key] = parent.attributes[key]
+        else:
+            self.trace_id = os.urandom(16).hex()
+            self.parent_id = ""
+        self.span_id = os.urandom(8).hex()
+        self.start_ns = self.end_ns = 0
+        self._start = 0.0
+        self.error: Optional[str] = None
+        self.activate = activate
+        self._token = None
+
+    def set(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def fail(self, error: Any):
+        """Mark the operation failed without an exception (e.g. an error result)."""
+        self.error = str(error)
+
+    def __enter__(self) -> "Span":
+        self.start_ns = time.time_ns()
+        self._start = time.perf_counter()
+        spans_in_flight.inc(kind=self.kind, name=self.name)
+        if self.activate:
+            self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        duration = time.perf_counter() - self._start
+        self.end_ns = time.time_ns()
+        if self._token is not None:
+            _current_span.reset(self._token)
+        spans_in_flight.dec(kind=self.kind, name=self.name)
+        span_seconds.observe(duration, kind=self.kind, name=self.name)
+        # Cancellation and abandoned streams are not failures of the operation
+        abandoned = exc_type is asyncio.CancelledError or exc_type is GeneratorExit
+        if abandoned:
+            self.error = "cancelled"
+        elif exc_type is not None:
+            self.error = f"{exc_type.__name__}: {exc}"
+        if self.error and not abandoned:
+            span_errors.inc(kind=self.kind, name=self.name)
+        if self.tracer.exporter is not None:
+            self.tracer.exporter.export(self)
+        return False
+
+
+class _NoopSpan:
+    """Stand-in returned when tracing is off: no clocks, no metrics, no allocation."""
+
+    __slots__ = ()
+
+    def set(self, key: str, value: Any):
+        pass
+
+    def fail(self, error: Any):
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+class OTLPFileExporter:
+    """Writes finished spans as OTLP/JSON lines from a background thread.
+
+    Each line is an ``ExportTraceServiceRequest`` in the OTLP JSON
+    encoding, so the file can be replayed into any OTLP collector.
+    """
+
+    def __init__(self, path: str, service_name: str = "multiagent", batch_size: int = 128,
+                 flush_interval: float = 1.0):
+        self.path = path
+        self.service_name = service_name
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.exported = 0
+        self.dropped = 0
+        self._queue: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue(maxsize=10000)
+        self._thread = threading.Thread(target=self._run, name="otlp-file-exporter", daemon=True)
+        self._thread.start()
+
+    def export(self, span: Span):
+        try:
+            self._queue.put_nowait(self._encode(span))
+        except queue.Full:
+            self.dropped += 1
+
+    def shutdown(self, timeout: float = 5.0):
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    def _encode(self, span: Span) -> Dict[str, Any]:
+        encoded = {
+            "traceId": span.trace_id,
+            "spanId": span.span_id,
+            "name": f"{span.kind} {span.name}",
+            "kind": 1,  # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(span.start_ns),
+            "endTimeUnixNano": str(span.end_ns),
+            "attributes": [_attribute("span.kind", span.kind)] + [
+                _attribute(key, value) for key, value in span.attributes.items() if value is not None
+            ],
+            "status": {"code": 2, "message": span.error} if span.error else {"code": 1}
+        }
+        if span.parent_id:
+            encoded["parentSpanId"] = span.parent_id
+        return encoded
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            batch: List[Dict[str, Any]] = []
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get(timeout=max(deadline - time.monotonic(), 0.001))
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            if batch:
+                self._write(batch)
+
+    def _write(self, batch: List[Dict[str, Any]]):
+        request = {"resourceSpans": [{
+            "resource": {"attributes": [_attribute("service.name", self.service_name)]},
+            "scopeSpans": [{"scope": {"name": "src.core.tracing"}, "spans": batch}]
+        }]}
+        try:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(request, separators=(",", ":")) + "\n")
+            self.exported += len(batch)
+        except OSError as e:
+            self.dropped += len(batch)
+            logger.error(f"Failed to write {len(batch)} spans to {self.path}: {e}")
+
+
+def _attribute(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+class Tracer:
+    """Creates spans around task steps, agents, LLM calls and database writes."""
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.exporter: Optional[OTLPFileExporter] = None
+
+    def span(self, kind: str, name: str, activate: bool = True,
+             **attributes: Any) -> Union[Span, _NoopSpan]:
+        """Context manager timing one operation.
+
+        Pass ``activate=False`` for spans held open across ``yield`` in an
+        async generator, where the context cannot be restored on exit.
+        """
+        if not self.enabled:
+            return _NOOP
+        return Span(self, kind, name, attributes, _current_span.get(), activate)
+
+    def current(self) -> Optional[Span]:
+        return _current_span.get()
+
+    def start_export(self, path: str):
+        if self.enabled and path and self.exporter is None:
+            self.exporter = OTLPFileExporter(path)
+            logger.info(f"Exporting trace spans to {path}")
+
+    def shutdown(self):
+        if self.exporter is not None:
+            self.exporter.shutdown()
+            self.exporter = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "export_path": self.exporter.path if self.exporter else None,
+            "exported": self.exporter.exported if self.exporter else 0,
+            "dropped": self.exporter.dropped if self.exporter else 0
+        }
+
+
+tracer = Tracer(enabled=settings.tracing_enabled)
@@ -89,7 +89,7 @@ def test_get_task_status(task_id):
         return
         
     print(f"📋 Testing Get Task Status for ID: {task_id}...")
-    response = requests.get(f"{BASE_URL}/tasks/{task_id}")
+    response = requests.get(f"{BASE_URL}/tasks/{task_id}", params={"include": "output"})
     print(f"Status Code: {response.status_code}")
     if response.status_code == 200:
         print(f"Task Details: {json.dumps(response.json(), indent=2)}")
@@ -2,7 +2,10 @@ import requests
 import json
 
 # Get recent tasks
-response = requests.get("http://localhost:8000/tasks?limit=10")
+response = requests.get(
+    "http://localhost:8000/tasks",
+    params={"limit": 10, "status": "completed", "fields": "task_id,status,input_data,output_data"}
+)
 if response.status_code == 200:
     tasks = response.json()
     
@@ -0,0 +1,15 @@
+# tests/conftest.py
+import os
+import tempfile
+
+# Point the app at a throwaway database, blob store, LLM cache and log directory
+# before src.core is imported, so test runs leave nothing behind in the repo
+_tmp = tempfile.mkdtemp(prefix='multiagent-tests-')
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_tmp, 'test.db')}")
+os.environ.setdefault("BLOB_STORE_PATH", os.path.join(_tmp, "blobs"))
+os.environ.setdefault("LLM_CACHE_PATH", os.path.join(_tmp, "llm_cache.db"))
+os.environ.setdefault("LOG_DIR", os.path.join(_tmp, "logs"))
+
+from src.core.database import init_db  # noqa: E402
+
+init_db()
@@ -0,0 +1,41 @@
+# tests/test_agent_pool.py
+import asyncio
+from src.agents.agent_factory import AgentPool
+from src.agents.base_agent import AgentContext, BaseAgent
+
+
+class EchoAgent(BaseAgent):
+    def __init__(self):
+        super().__init__(name="Echo", description="Remembers its inputs")
+
+    async def execute(self, input_data, context=None):
+        context = context or AgentContext()
+        self.add_to_memory(input_data, context)
+        await asyncio.sleep(0.01)
+        return {"status": "success", "task_id": context.task_id,
+                "memory": [m.content for m in context.memory_for(self.name)]}
+
+
+def test_pool_reuses_instances_up_to_its_size():
+    pool = AgentPool(EchoAgent, max_size=2)
+
+    async def run(i):
+        async with pool.lease() as agent:
+            return id(agent), await agent.execute({"i": i}, AgentContext(f"task-{i}"))
+
+    async def main():
+        return await asyncio.gather(*(run(i) for i in range(6)))
+
+    results = asyncio.run(main())
+
+    assert len({agent_id for agent_id, _ in results}) == 2
+    for i, (_, result) in enumerate(results):
+        # Shared instances never leak task IDs or memory between tasks
+        assert result["task_id"] == f"task-{i}"
+        assert result["memory"] == [{"i": i}]
+
+    stats = pool.stats()
+    assert stats["created"] == 2
+    assert stats["acquired"] == 6
+    assert stats["waits"] == 4
+    assert stats["in_use"] == 0 and stats["idle"] == 2
@@ -1,8 +1,33 @@
 # tests/test_agents.py
+import asyncio
+import json
+import time
+import httpx
 import pytest
 from src.agents.agent_factory import AgentFactory
+from src.core import ollama_client
 
 def test_agent_creation():
     agent = AgentFactory.create_agent("research")
     assert agent is not None
     assert agent.name == "ResearchAgent"
+
+def test_research_fans_out_one_call_per_question():
+    async def handler(request):
+        await asyncio.sleep(0.1)
+        return httpx.Response(200, json={"response": json.loads(request.content)["prompt"][-12:]})
+
+    ollama_client.set_http_transport(httpx.MockTransport(handler))
+    questions = [f"Question number {i}?" for i in range(4)]
+    agent = AgentFactory.create_agent("research")
+    try:
+        start = time.perf_counter()
+        result = asyncio.run(agent.execute({"topic": "AI", "questions": questions, "use_cache": False}))
+        elapsed = time.perf_counter() - start
+    finally:
+        ollama_client.set_http_transport(None)
+
+    answers = result["research_findings"]["questions"]
+    assert list(answers) == questions
+    assert all(answers[q]["answer"] == q[-12:] for q in questions)
+    assert elapsed < 0.35  # 5 calls sequentially would take 0.5s
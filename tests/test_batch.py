@@ -0,0 +1,91 @@
+# tests/test_batch.py
+import asyncio
+import json
+import httpx
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+from src.api import main
+from src.core import ollama_client
+from src.core.database import SessionLocal, TaskExecution
+
+
+def _statuses(task_ids):
+    db = SessionLocal()
+    try:
+        rows = db.execute(select(TaskExecution.task_id, TaskExecution.status)
+                          .where(TaskExecution.task_id.in_(task_ids)))
+        return dict(rows.all())
+    finally:
+        db.close()
+
+
+def test_batch_streams_ndjson_results_and_caps_concurrency():
+    active = {}
+    peak = 0
+
+    async def fake_ollama(request: httpx.Request) -> httpx.Response:
+        nonlocal peak
+        topic = next(t for t in (f"batch {i}" for i in range(5)) if t in json.loads(request.content)["prompt"])
+        active[topic] = active.get(topic, 0) + 1
+        peak = max(peak, len(active))
+        await asyncio.sleep(0.02)
+        active[topic] -= 1
+        if not active[topic]:
+            del active[topic]
+        return httpx.Response(200, json={"response": "ok"})
+
+    body = "\n".join(
+        json.dumps({"task_type": "quick_research", "topic": f"batch {i}", "use_cache": False})
+        for i in range(5)
+    )
+    ollama_client.set_http_transport(httpx.MockTransport(fake_ollama))
+    try:
+        with TestClient(main.app) as client:
+            response = client.post("/tasks/batch?concurrency=2", content=body,
+                                   headers={"Content-Type": "application/x-ndjson"})
+    finally:
+        ollama_client.set_http_transport(None)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(line["index"] for line in lines) == list(range(5))
+    assert all(line["status"] == "success" for line in lines)
+    assert peak == 2
+    assert set(_statuses([line["task_id"] for line in lines]).values()) == {"completed"}
+
+
+def test_batch_rejects_invalid_items_with_their_index():
+    with TestClient(main.app) as client:
+        response = client.post("/tasks/batch", json=[
+            {"task_type": "quick_research", "topic": "ok"},
+            {"task_type": "nonsense"}
+        ])
+        empty = client.post("/tasks/batch", json=[])
+
+    assert response.status_code == 422
+    assert [error["index"] for error in response.json()["detail"]] == [1]
+    assert empty.status_code == 400
+
+
+def test_full_queue_is_a_503_up_front_and_error_lines_mid_stream(monkeypatch):
+    body = [{"task_type": "quick_research", "topic": f"full {i}"} for i in range(3)]
+    monkeypatch.setattr(main.task_queue, "free_slots", lambda: 0)
+    with TestClient(main.app) as client:
+        response = client.post("/tasks/batch", json=body)
+    assert response.status_code == 503
+
+    async def full(*args, **kwargs):
+        raise main.QueueFullError("Task queue is full (1 jobs)")
+
+    async def run():
+        task_ids = ["full-0", "full-1", "full-2"]
+        requests = [main.TaskRequest(**item) for item in body]
+        await main._insert_batch_rows(task_ids, requests)
+        return [json.loads(line) async for line in main._run_batch(task_ids, requests, 2)]
+
+    monkeypatch.setattr(main.task_queue, "submit", full)
+    lines = asyncio.run(run())
+    assert [line["index"] for line in lines] == [0, 1, 2]
+    assert all(line["status"] == "error" and "full" in line["error"] for line in lines)
+    assert set(_statuses(["full-0", "full-1", "full-2"]).values()) == {"failed"}
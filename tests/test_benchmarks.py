@@ -0,0 +1,21 @@
+# tests/test_benchmarks.py
+import asyncio
+from benchmarks.load_test import percentile, run_benchmark
+
+
+def test_percentile_nearest_rank():
+    samples = list(range(1, 101))
+    assert percentile(samples, 50) == 50
+    assert percentile(samples, 99) == 99
+    assert percentile([], 95) == 0.0
+
+
+def test_load_test_reports_latency_and_breakdown():
+    report = asyncio.run(run_benchmark(
+        requests=4, concurrency=2, latency_ms=1, tokens_per_sec=0, response_tokens=3
+    ))
+    results = report["results"]
+    assert results["errors"] == 0
+    assert results["latency_ms"]["p50"] > 0
+    assert results["breakdown"]["llm"]["calls"] > 0
+    assert results["breakdown"]["db"]["statements"] > 0
@@ -0,0 +1,73 @@
+# tests/test_blob_store.py
+import asyncio
+import gzip
+import json
+import os
+import uuid
+from fastapi.testclient import TestClient
+from src.api.main import app
+from src.core.blob_store import FileBlobStore, SQLiteBlobStore, compress, decompress, offload_output
+from src.core.database import SessionLocal, TaskExecution
+
+
+def test_blobs_are_deduplicated_and_round_trip(tmp_path):
+    store = FileBlobStore(str(tmp_path / "blobs"), codec="gzip")
+    data = json.dumps({"report": "lorem ipsum " * 2000}).encode()
+
+    async def main():
+        first = await store.put(data)
+        second = await store.put(data)
+        return first, second, await store.get(first)
+
+    first, second, loaded = asyncio.run(main())
+    assert first == second and first.startswith("sha256:")
+    assert loaded == data
+    assert store.dedup_hits == 1
+    assert store.bytes_stored < len(data) // 10
+    assert sum(len(files) for _, _, files in os.walk(tmp_path / "blobs")) == 1
+
+
+def test_sqlite_store_and_codec_detection(tmp_path):
+    store = SQLiteBlobStore(str(tmp_path / "blobs.db"))
+    ref = store.put_sync(b"payload" * 100)
+    assert store.get_sync(ref) == b"payload" * 100
+    asyncio.run(store.delete(ref))
+    assert store.get_sync(ref) is None
+
+    assert decompress(gzip.compress(b"x")) == b"x"
+    assert decompress(compress(b"y" * 50)) == b"y" * 50
+
+
+def test_only_large_outputs_are_offloaded():
+    async def main():
+        return await offload_output({"a": 1}), await offload_output({"report": "x" * 50000})
+
+    small, large = asyncio.run(main())
+    assert small["output_data"] == {"a": 1} and small["output_ref"] is None
+    assert large["output_data"] is None and large["output_ref"].startswith("sha256:")
+    assert large["output_size"] > 50000
+
+
+def test_task_output_is_loaded_only_when_included():
+    task_id, task_type = str(uuid.uuid4()), f"blob-{uuid.uuid4()}"
+    output = {"report": "x" * 50000}
+    columns = asyncio.run(offload_output(output))
+    db = SessionLocal()
+    try:
+        db.add(TaskExecution(task_id=task_id, task_type=task_type, status="completed",
+                             input_data={"topic": "t"}, **columns))
+        db.commit()
+    finally:
+        db.close()
+    client = TestClient(app)
+
+    summary = client.get(f"/tasks/{task_id}").json()
+    assert summary["output_data"] is None
+    assert summary["output_size"] == columns["output_size"]
+
+    full = client.get(f"/tasks/{task_id}", params={"include": "output"}).json()
+    assert full["output_data"] == output
+    assert client.get(f"/tasks/{task_id}", params={"include": "bogus"}).status_code == 400
+
+    rows = client.get("/tasks", params={"task_type": task_type, "fields": "task_id,output_data"}).json()
+    assert rows == [{"task_id": task_id, "output_data": output}]
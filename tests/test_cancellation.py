@@ -0,0 +1,89 @@
+# tests/test_cancellation.py
+import asyncio
+import time
+import httpx
+from sqlalchemy import select
+from src.agents.base_agent import AgentContext
+from src.agents.task_coordinator import TaskCoordinator
+from src.core import ollama_client
+from src.core.database import SessionLocal, TaskExecution
+from src.core.task_queue import TaskQueue
+
+
+class SlowOllama:
+    """Mock transport whose generate calls hang until cancelled."""
+
+    def __init__(self, delay: float = 5.0):
+        self.delay = delay
+        self.started = 0
+        self.aborted = 0
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.started += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.aborted += 1
+            raise
+        return httpx.Response(200, json={"response": "late"})
+
+
+def _status(task_id: str) -> str:
+    db = SessionLocal()
+    try:
+        return db.execute(select(TaskExecution.status).where(TaskExecution.task_id == task_id)).scalar()
+    finally:
+        db.close()
+
+
+def test_cancel_aborts_running_job_and_keeps_worker():
+    ollama = SlowOllama()
+
+    async def runner(task_id, input_data):
+        return await TaskCoordinator().execute(input_data, AgentContext(task_id))
+
+    async def main():
+        queue = TaskQueue(runner, workers=1)
+        await queue.start()
+        running = await queue.submit("cancel-running", {"task_type": "quick_research", "topic": "slow"})
+        queued = await queue.submit("cancel-queued", {"task_type": "quick_research", "topic": "never"})
+        while ollama.started == 0:
+            await asyncio.sleep(0.01)
+
+        assert queue.cancel("cancel-queued") == "queued"
+        assert queue.cancel("cancel-running") == "in_progress"
+        await asyncio.sleep(0.05)
+        stats = queue.stats()
+        await queue.stop()
+        return running, queued, stats
+
+    ollama_client.set_http_transport(httpx.MockTransport(ollama))
+    try:
+        running, queued, stats = asyncio.run(main())
+    finally:
+        ollama_client.set_http_transport(None)
+
+    assert running.future.cancelled() and queued.future.cancelled()
+    assert ollama.aborted == 1
+    assert stats["cancelled"] == 2 and stats["workers"] == 1
+    assert _status("cancel-running") == "cancelled"
+
+
+def test_deadline_bounds_the_task_and_its_llm_calls():
+    ollama = SlowOllama()
+    ollama_client.set_http_transport(httpx.MockTransport(ollama))
+    try:
+        start = time.perf_counter()
+        result = asyncio.run(TaskCoordinator().execute(
+            {"task_type": "quick_research", "topic": "deadline", "deadline_ms": 100},
+            AgentContext("deadline-task")
+        ))
+        elapsed = time.perf_counter() - start
+    finally:
+        ollama_client.set_http_transport(None)
+
+    assert result["status"] == "error"
+    assert "deadline" in result["error"]
+    assert elapsed < 1
+    assert ollama.aborted == ollama.started == 1
+    assert _status("deadline-task") == "failed"
@@ -0,0 +1,74 @@
+# tests/test_checkpoints.py
+import asyncio
+import json
+import httpx
+from sqlalchemy import select
+from src.agents.base_agent import AgentContext
+from src.agents.task_coordinator import TaskCoordinator
+from src.api import main
+from src.core import ollama_client
+from src.core.config import settings
+from src.core.database import SessionLocal, TaskExecution, WorkflowCheckpoint
+
+
+def _rows(task_id):
+    db = SessionLocal()
+    try:
+        status = db.execute(select(TaskExecution.status).where(TaskExecution.task_id == task_id)).scalar()
+        steps = db.execute(select(WorkflowCheckpoint.step).where(WorkflowCheckpoint.task_id == task_id)).scalars()
+        return status, sorted(steps)
+    finally:
+        db.close()
+
+
+def test_resume_skips_checkpointed_steps():
+    prompts = []
+    hang_analysis = True
+
+    async def fake_ollama(request: httpx.Request) -> httpx.Response:
+        prompt = json.loads(request.content)["prompt"]
+        prompts.append(prompt)
+        if hang_analysis and prompt.startswith("Analyze"):
+            await asyncio.sleep(10)
+        return httpx.Response(200, json={"response": "ok"})
+
+    task_id = "checkpoint-resume"
+    payload = {"task_type": "full_analysis", "topic": "Checkpoints", "use_cache": False}
+
+    async def crash_during_analysis():
+        context = AgentContext(task_id)
+        run = asyncio.ensure_future(TaskCoordinator().execute(payload, context))
+        while not any(p.startswith("Analyze") for p in prompts):
+            await asyncio.sleep(0.01)
+        context.cancel()
+        await asyncio.gather(run, return_exceptions=True)
+
+    ollama_client.set_http_transport(httpx.MockTransport(fake_ollama))
+    try:
+        asyncio.run(crash_during_analysis())
+        assert _rows(task_id) == ("cancelled", ["research"])
+
+        hang_analysis = False
+        prompts.clear()
+        result = asyncio.run(TaskCoordinator().execute(payload, AgentContext(task_id), resume=True))
+    finally:
+        ollama_client.set_http_transport(None)
+
+    assert result["status"] == "success"
+    assert not any(p.startswith("Research") for p in prompts)
+    assert any(p.startswith("Analyze") for p in prompts)
+    assert result["results"]["research"]["status"] == "success"
+    assert _rows(task_id) == ("completed", [])
+
+
+def test_startup_fails_interrupted_tasks_when_not_requeuing(monkeypatch):
+    db = SessionLocal()
+    db.add(TaskExecution(task_id="interrupted", task_type="quick_research", status="in_progress",
+                         input_data={"task_type": "quick_research", "topic": "x"}))
+    db.commit()
+    db.close()
+
+    monkeypatch.setattr(settings, "recover_interrupted_tasks", "fail")
+    asyncio.run(main._recover_interrupted_tasks())
+
+    assert _rows("interrupted") == ("failed", [])
@@ -0,0 +1,54 @@
+# tests/test_health.py
+import asyncio
+import httpx
+from fastapi.testclient import TestClient
+from src.agents.agent_factory import AgentFactory
+from src.agents.research_agent import ResearchAgent
+from src.api.main import app
+from src.core import ollama_client
+from src.core.health import ReadinessProbe, readiness_probe
+
+
+def test_readiness_probe_caches_and_shares_checks():
+    calls = []
+
+    async def slow_ok():
+        calls.append("ok")
+        await asyncio.sleep(0.02)
+
+    async def broken():
+        raise ConnectionError("refused")
+
+    probe = ReadinessProbe({"db": slow_ok, "ollama": broken}, ttl=60)
+
+    async def main():
+        results = await asyncio.gather(*(probe.check() for _ in range(5)))
+        return results + [await probe.check()]
+
+    results = asyncio.run(main())
+
+    assert calls == ["ok"]
+    assert probe.refreshes == 1
+    assert results[-1]["ready"] is False
+    assert results[-1]["services"] == {"db": "healthy", "ollama": "unhealthy: refused"}
+
+
+def test_agents_endpoint_reads_class_metadata(monkeypatch):
+    def no_instances(self):
+        raise AssertionError("agents must not be instantiated for discovery")
+
+    monkeypatch.setattr(ResearchAgent, "__init__", no_instances)
+    ollama_client.set_http_transport(httpx.MockTransport(lambda request: httpx.Response(200, json={})))
+    readiness_probe.invalidate()
+    try:
+        with TestClient(app) as client:
+            agents = {agent["name"]: agent for agent in client.get("/agents").json()}
+            assert client.get("/health/live").json() == {"status": "alive"}
+            ready = client.get("/health/ready")
+    finally:
+        ollama_client.set_http_transport(None)
+
+    assert set(agents) == set(AgentFactory.get_agent_metadata())
+    assert agents["research"]["input_schema"]["required"] == ["topic"]
+    assert ready.status_code == 200
+    assert ready.json()["services"] == {"database": "healthy", "ollama": "healthy"}
@@ -0,0 +1,43 @@
+# tests/test_llm_cache.py
+import asyncio
+from src.core.llm_cache import (
+    LLMCache, MemoryCacheBackend, SQLiteCacheBackend, make_cache_key
+)
+
+
+def test_cache_key_covers_model_prompt_and_options():
+    base = make_cache_key("phi:latest", "prompt", "system", {"temperature": 0.1})
+    assert base == make_cache_key("phi:latest", "prompt", "system", {"temperature": 0.1})
+    assert base != make_cache_key("mistral:latest", "prompt", "system", {"temperature": 0.1})
+    assert base != make_cache_key("phi:latest", "prompt", "system", {"temperature": 0.2})
+
+
+def test_memory_backend_evicts_lru_and_expires():
+    async def run():
+        backend = MemoryCacheBackend(max_entries=2)
+        await backend.set("a", "1", ttl=60)
+        await backend.set("b", "2", ttl=60)
+        await backend.get("a")
+        await backend.set("c", "3", ttl=60)
+        await backend.set("d", "4", ttl=-1)
+        return [await backend.get(k) for k in "abcd"], backend.evictions
+
+    values, evictions = asyncio.run(run())
+    assert values == [None, None, "3", None]
+    assert evictions == 2
+
+
+def test_sqlite_tier_survives_restart_and_promotes(tmp_path):
+    path = str(tmp_path / "cache.db")
+
+    async def run():
+        await LLMCache([MemoryCacheBackend(), SQLiteCacheBackend(path)]).set("k", "v")
+        cache = LLMCache([MemoryCacheBackend(), SQLiteCacheBackend(path)])
+        first = await cache.get("k")
+        promoted = await cache.tiers[0].get("k")
+        missing = await cache.get("other")
+        return first, promoted, missing, cache.stats()
+
+    first, promoted, missing, stats = asyncio.run(run())
+    assert (first, promoted, missing) == ("v", "v", None)
+    assert stats["hits"] == 1 and stats["misses"] == 1
@@ -0,0 +1,65 @@
+# tests/test_llm_scheduler.py
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+from src.api import main
+from src.core.llm_scheduler import (
+    AdmissionRejected, LLMScheduler, queue_wait_seconds, reset_request_class, set_request_class
+)
+
+
+def test_slots_are_limited_and_served_by_priority_then_tenant():
+    scheduler = LLMScheduler(max_in_flight=1)
+    exported = queue_wait_seconds.count(model="phi", priority="batch")
+    order = []
+
+    async def call(name, priority, tenant, hold=0.01):
+        token = set_request_class(priority, tenant)
+        try:
+            async with scheduler.slot("phi"):
+                order.append(name)
+                await asyncio.sleep(hold)
+        finally:
+            reset_request_class(token)
+
+    async def main_():
+        first = asyncio.ensure_future(call("first", "batch", "a", hold=0.05))
+        await asyncio.sleep(0)
+        # Tenant "a" floods the batch class before "b" arrives
+        rest = [
+            call("a1", "batch", "a"), call("a2", "batch", "a"), call("b1", "batch", "b"),
+            call("live", "interactive", "c")
+        ]
+        await asyncio.gather(first, *rest)
+
+    asyncio.run(main_())
+
+    assert order == ["first", "live", "a1", "b1", "a2"]
+    waits = scheduler.stats()["models"]["phi"]["queue_wait"]
+    assert waits["batch"]["count"] == 4 and waits["interactive"]["count"] == 1
+    assert queue_wait_seconds.count(model="phi", priority="batch") == exported + 4
+    assert 'multiagent_llm_queue_wait_seconds_count{model="phi",priority="batch"}' in main.metrics.render()
+
+
+def test_admission_rejects_when_predicted_wait_exceeds_deadline():
+    scheduler = LLMScheduler(max_in_flight=1, max_wait_s={"interactive": 1, "batch": 60})
+    lane = scheduler._lane("phi")
+    lane.in_flight = 1
+    lane.service_s = 2.0
+
+    with pytest.raises(AdmissionRejected) as exc_info:
+        scheduler.admit("interactive")
+    assert exc_info.value.retry_after == 1.0
+    scheduler.admit("batch")
+
+
+def test_api_returns_429_with_retry_after(monkeypatch):
+    def reject(priority):
+        raise AdmissionRejected("busy", retry_after=4.2)
+
+    monkeypatch.setattr(main.llm_scheduler, "admit", reject)
+    with TestClient(main.app) as client:
+        response = client.post("/tasks", json={"task_type": "quick_research", "topic": "AI"})
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "5"
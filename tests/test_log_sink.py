@@ -0,0 +1,72 @@
+# tests/test_log_sink.py
+import asyncio
+import uuid
+from src.core.database import AgentLog, SessionLocal
+from src.core.log_sink import AgentLogSink, flush_seconds, queue_depth
+
+
+def _count(task_id):
+    db = SessionLocal()
+    try:
+        return db.query(AgentLog).filter(AgentLog.task_id == task_id).count()
+    finally:
+        db.close()
+
+
+def test_records_are_written_in_batches_and_flushed_on_stop():
+    task_id = f"sink-{uuid.uuid4()}"
+    sink = AgentLogSink(batch_size=50, flush_interval_ms=10000, max_queue=1000)
+
+    async def submit(count):
+        for i in range(count):
+            sink.submit({"task_id": task_id, "agent_name": "test", "action": str(i), "reasoning": ""})
+        await asyncio.sleep(0.1)
+        return sink.records_written
+
+    async def run():
+        await sink.start()
+        written = [await submit(30), await submit(30), await submit(10)]
+        await sink.stop()
+        return written
+
+    flushes = flush_seconds.count()
+    # Below the batch size records wait for the interval; stop flushes the rest
+    assert asyncio.run(run()) == [0, 60, 60]
+    assert sink.flushes == 3 and flush_seconds.count() == flushes + 3
+    assert _count(task_id) == 70
+
+
+def test_full_buffer_drops_records_instead_of_writing_inline():
+    task_id = f"sink-{uuid.uuid4()}"
+    sink = AgentLogSink(batch_size=1000, flush_interval_ms=10000, max_queue=10)
+
+    async def run():
+        await sink.start()
+        for i in range(25):
+            sink.submit({"task_id": task_id, "agent_name": "test", "action": str(i), "reasoning": ""})
+        # Nothing was written on the producer's call stack
+        written, depth = sink.records_written, sink.stats()["queue_depth"]
+        await sink.stop()
+        return written, depth
+
+    assert asyncio.run(run()) == (0, 10)
+    assert sink.dropped == 15
+    assert _count(task_id) == 10
+
+
+def test_records_submitted_before_start_are_buffered_not_written_inline():
+    task_id = f"sink-{uuid.uuid4()}"
+    sink = AgentLogSink(batch_size=50, flush_interval_ms=10000, max_queue=1000)
+    for i in range(5):
+        sink.submit({"task_id": task_id, "agent_name": "test", "action": str(i), "reasoning": ""})
+    assert sink.records_written == 0 and queue_depth.value() == 5
+
+    async def run():
+        await sink.start()
+        await asyncio.sleep(0.1)
+        written = sink.records_written
+        await sink.stop()
+        return written
+
+    assert asyncio.run(run()) == 5
+    assert queue_depth.value() == 0 and _count(task_id) == 5
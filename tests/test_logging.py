@@ -0,0 +1,68 @@
+# tests/test_logging.py
+import gzip
+import json
+import logging
+from src.core.logger import (
+    JsonLinesFormatter, RotatingLogFileHandler, SamplingFilter, setup_logger
+)
+from src.core.tracing import tracer
+
+
+def _record(message, module="ollama_client", level=logging.INFO, **extra):
+    record = logging.LogRecord("test", level, f"/src/core/{module}.py", 1, message, None, None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_setup_logger_is_idempotent():
+    first = setup_logger("IdempotentLogger")
+    second = setup_logger("IdempotentLogger")
+    assert first is second
+    assert len(second.handlers) == 1
+
+
+class Capture(logging.Filter):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def filter(self, record):
+        self.records.append(record)
+        return True
+
+
+def test_json_lines_carry_task_and_agent_from_the_active_span():
+    logger = setup_logger("ContextLogger")
+    capture = Capture()
+    logger.handlers[0].addFilter(capture)  # runs after the context filter
+
+    with tracer.span("agent", "ResearchAgent", task_id="t-1", agent="ResearchAgent"):
+        with tracer.span("llm", "phi:latest"):
+            logger.info("calling %s", "phi")
+
+    entry = json.loads(JsonLinesFormatter().format(capture.records[0]))
+    assert entry["message"] == "calling phi"
+    assert entry["task_id"] == "t-1" and entry["agent"] == "ResearchAgent"
+
+
+def test_sampling_keeps_a_fraction_of_hot_debug_records():
+    sampler = SamplingFilter({"ollama_client": 0.25})
+    kept = sum(sampler.filter(_record("hot", level=logging.DEBUG)) for _ in range(100))
+    assert kept == 25
+    assert sampler.filter(_record("boom", level=logging.ERROR))
+    assert sampler.filter(_record("other", module="task_queue"))
+
+
+def test_rotation_by_size_gzips_and_prunes_backups(tmp_path):
+    path = tmp_path / "app.log"
+    handler = RotatingLogFileHandler(str(path), max_bytes=200, backup_count=2)
+    handler.setFormatter(JsonLinesFormatter())
+    for i in range(40):
+        handler.handle(_record(f"message {i} " + "x" * 40))
+    handler.close()
+
+    backups = sorted(p.name for p in tmp_path.iterdir() if p.name != "app.log")
+    assert len(backups) == 2 and all(name.endswith(".gz") for name in backups)
+    with gzip.open(tmp_path / backups[-1], "rt") as f:
+        assert json.loads(f.readline())["message"].startswith("message")
+    assert "message 39" in path.read_text()
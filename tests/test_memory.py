@@ -0,0 +1,72 @@
+# tests/test_memory.py
+import asyncio
+from src.agents.base_agent import AgentContext
+from src.agents.memory import AgentMemory
+
+
+def test_ring_buffer_caps_entries_and_bytes_and_caches_context():
+    memory = AgentMemory(capacity=3, max_bytes=10_000)
+    for i in range(5):
+        memory.append({"step": i})
+
+    assert [record.content["step"] for record in memory] == [2, 3, 4]
+    context = memory.context()
+    assert context.index('{"step":4}') < context.index('{"step":2}')
+    assert memory.context() is context  # no re-render without a write
+
+    memory.append({"step": 5})
+    assert memory.context() is not context
+
+    small = AgentMemory(capacity=10, max_bytes=60)
+    for i in range(10):
+        small.append({"blob": "x" * 20, "i": i})
+    assert small.bytes <= 60 and len(small) < 10
+    assert list(small)[-1].content["i"] == 9
+
+
+def test_summary_mode_folds_evicted_entries_into_a_digest():
+    memory = AgentMemory(capacity=2, summarize=True)
+    calls = []
+
+    async def summarizer(summary, evicted):
+        calls.append(list(evicted))
+        return f"{summary} digest of {len(evicted)}".strip()
+
+    async def main():
+        for i in range(4):
+            memory.append({"step": i})
+            memory.schedule_summary(summarizer)
+            await asyncio.sleep(0)
+        await asyncio.sleep(0)
+
+    asyncio.run(main())
+
+    assert calls == [['{"step":0}'], ['{"step":1}']]
+    assert memory.summary == "digest of 1 digest of 1"
+    assert "Summary of earlier work" in memory.context()
+    assert memory.stats()["pending_summary"] == 0
+
+
+def test_pending_summary_is_cancelled_with_its_task():
+    context = AgentContext("t")
+    memory = AgentMemory(capacity=1, summarize=True)
+    finished = []
+
+    async def slow_summarizer(summary, evicted):
+        await asyncio.sleep(10)
+        finished.append(evicted)
+        return "digest"
+
+    async def main():
+        memory.append({"step": 0})
+        memory.append({"step": 1})
+        task = memory.schedule_summary(slow_summarizer)
+        context.track(task)
+        await asyncio.sleep(0)
+        context.cancel()  # the workflow is gone, so is its summary
+        await asyncio.sleep(0)
+        return task
+
+    task = asyncio.run(main())
+    assert task.cancelled() and not finished
+    assert not context.background
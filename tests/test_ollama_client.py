@@ -0,0 +1,50 @@
+# tests/test_ollama_client.py
+import asyncio
+import time
+import httpx
+from src.core import ollama_client
+from src.core.ollama_client import OllamaClient
+
+
+def _slow_transport(delay: float) -> httpx.MockTransport:
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(delay)
+        return httpx.Response(200, json={"response": "ok"})
+    return httpx.MockTransport(handler)
+
+
+def test_concurrent_achat_calls_overlap():
+    ollama_client.set_http_transport(_slow_transport(0.2))
+
+    async def run():
+        client = OllamaClient()
+        try:
+            start = time.perf_counter()
+            results = await asyncio.gather(*(client.achat(f"prompt {i}") for i in range(5)))
+            return results, time.perf_counter() - start
+        finally:
+            await ollama_client.close_http_client()
+
+    try:
+        results, elapsed = asyncio.run(run())
+    finally:
+        ollama_client.set_http_transport(None)
+
+    assert results == ["ok"] * 5
+    assert elapsed < 0.6
+
+
+def test_swapping_transport_closes_the_previous_client():
+    ollama_client.set_http_transport(_slow_transport(0))
+
+    async def main():
+        old = ollama_client.get_http_client()
+        ollama_client.set_http_transport(_slow_transport(0))
+        await asyncio.sleep(0)
+        return old, ollama_client.get_http_client()
+
+    try:
+        old, new = asyncio.run(main())
+        assert old.is_closed and old is not new
+    finally:
+        ollama_client.set_http_transport(None)
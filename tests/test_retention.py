@@ -0,0 +1,69 @@
+# tests/test_retention.py
+import asyncio
+import gzip
+import json
+import os
+import uuid
+from datetime import datetime, timedelta
+from src.core.blob_store import get_blob_store, offload_output
+from src.core.database import SessionLocal, AgentLog, TaskExecution, WorkflowCheckpoint
+from src.core.retention import RetentionJob, parse_ttl
+
+
+def _seed(task_type, status, age_days, output=None):
+    task_id = str(uuid.uuid4())
+    created_at = datetime.utcnow() - timedelta(days=age_days)
+    columns = asyncio.run(offload_output(output or {"report": "short"}))
+    db = SessionLocal()
+    try:
+        db.add(TaskExecution(task_id=task_id, task_type=task_type, status=status,
+                             input_data={"topic": "t"}, created_at=created_at, **columns))
+        db.add(AgentLog(task_id=task_id, agent_name="research", action="research_complete",
+                        reasoning="done", timestamp=created_at))
+        db.add(WorkflowCheckpoint(task_id=task_id, step="research", output={}))
+        db.commit()
+    finally:
+        db.close()
+    return task_id, columns["output_ref"]
+
+
+def _remaining(model, task_ids):
+    db = SessionLocal()
+    try:
+        return db.query(model).filter(model.task_id.in_(task_ids)).count()
+    finally:
+        db.close()
+
+
+def test_parse_ttl():
+    assert parse_ttl("completed=30, failed=0.5,bogus") == {"completed": 30.0, "failed": 0.5}
+
+
+def test_expired_tasks_are_archived_then_deleted_in_batches(tmp_path):
+    task_type = f"retention-{uuid.uuid4()}"
+    big = {"report": "x" * 50000, "task_type": task_type}  # unique, so no other row shares its blob
+    old = [_seed(task_type, "completed", 40) for _ in range(3)]
+    old_blob, ref = _seed(task_type, "completed", 40, output=big)
+    kept = [_seed(task_type, "completed", 1)[0], _seed(task_type, "failed", 40)[0]]
+
+    job = RetentionJob({"completed": 30, "failed": 90}, agent_log_days=0,
+                       archive_dir=str(tmp_path), batch_size=2, batch_pause=0)
+    counts = asyncio.run(job.run_once(dry_run=True))
+    assert counts["task_executions"] >= 4
+    assert _remaining(TaskExecution, [old_blob]) == 1  # a dry run changes nothing
+
+    result = asyncio.run(job.run_once())
+    expired = [task_id for task_id, _ in old] + [old_blob]
+    assert result["task_executions"] >= 4 and result["blobs"] == 1
+    assert _remaining(TaskExecution, expired) == 0
+    assert _remaining(AgentLog, expired) == 0
+    assert _remaining(WorkflowCheckpoint, expired) == 0
+    assert _remaining(TaskExecution, kept) == 2
+    assert asyncio.run(get_blob_store().get(ref)) is None
+
+    day = (datetime.utcnow() - timedelta(days=40)).strftime("%Y-%m-%d")
+    with gzip.open(os.path.join(tmp_path, "task_executions", f"{day}.jsonl.gz"), "rt") as f:
+        archived = {row["task_id"]: row for row in map(json.loads, f)}
+    assert set(expired) <= set(archived)
+    assert archived[old_blob]["output_data"] == big  # offloaded outputs are archived inline
+    assert os.path.exists(os.path.join(tmp_path, "agent_logs", f"{day}.jsonl.gz"))
@@ -0,0 +1,43 @@
+# tests/test_serialization.py
+import asyncio
+import json
+import time
+from datetime import datetime
+from src.core.loop_monitor import EventLoopLagMonitor
+from src.core.serialization import dumps, dumps_async, estimate_size, offloads
+
+
+def test_dumps_is_compact_and_handles_datetimes():
+    encoded = dumps({"a": [1, 2], "at": datetime(2024, 1, 2, 3, 4, 5)})
+    assert encoded == b'{"a":[1,2],"at":"2024-01-02T03:04:05"}'
+
+
+def test_large_payloads_are_offloaded_and_size_estimate_stops_early():
+    big = {"results": {f"q{i}": "answer " * 100 for i in range(1000)}}
+    assert estimate_size(big, 1000) < 2000  # walked only until past the limit
+
+    async def main():
+        before = offloads.value()
+        small = await dumps_async({"ok": True}, threshold=1024)
+        large = await dumps_async(big, threshold=1024)
+        return before, small, large
+
+    before, small, large = asyncio.run(main())
+    assert small == b'{"ok":true}'
+    assert json.loads(large) == big
+    assert offloads.value() == before + 1
+
+
+def test_loop_monitor_sees_a_blocked_loop():
+    monitor = EventLoopLagMonitor(interval=0.01, warn_threshold=10)
+
+    async def main():
+        await monitor.start()
+        await asyncio.sleep(0.02)
+        time.sleep(0.1)  # block the loop
+        await asyncio.sleep(0.03)
+        await monitor.stop()
+
+    asyncio.run(main())
+    assert monitor.stats()["max_lag_ms"] >= 50
+    assert not monitor.stats()["running"]
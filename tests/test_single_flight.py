@@ -0,0 +1,87 @@
+# tests/test_single_flight.py
+import asyncio
+import httpx
+from src.agents.base_agent import AgentContext
+from src.agents.task_coordinator import TaskCoordinator
+from src.core import ollama_client
+from src.core.single_flight import SingleFlight
+
+
+def test_concurrent_callers_share_one_execution():
+    flight = SingleFlight("test")
+    runs = []
+
+    async def work():
+        runs.append(1)
+        await asyncio.sleep(0.02)
+        return "done"
+
+    async def main():
+        return await asyncio.gather(*(flight.do("k", work) for _ in range(5)))
+
+    results = asyncio.run(main())
+
+    assert runs == [1]
+    assert [result for result, _ in results] == ["done"] * 5
+    assert sum(shared for _, shared in results) == 4
+    assert flight.stats()["coalesced"] == 4
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_identical_tasks_collapse_to_one_pipeline():
+    calls = []
+
+    async def fake_ollama(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        await asyncio.sleep(0.02)
+        return httpx.Response(200, json={"response": "ok"})
+
+    async def main():
+        coordinator = TaskCoordinator()
+        payload = {"task_type": "quick_research", "topic": "Trending topic", "use_cache": False}
+        return await asyncio.gather(*(
+            coordinator.execute(dict(payload, topic=" Trending  topic " if i % 2 else payload["topic"]),
+                                AgentContext(f"burst-{i}"))
+            for i in range(4)
+        ))
+
+    ollama_client.set_http_transport(httpx.MockTransport(fake_ollama))
+    try:
+        results = asyncio.run(main())
+    finally:
+        ollama_client.set_http_transport(None)
+
+    assert len(calls) == 1
+    assert [r["task_id"] for r in results] == [f"burst-{i}" for i in range(4)]
+    assert all(r["status"] == "success" for r in results)
+    assert all(r["results"] == results[0]["results"] for r in results)
+
+
+def test_shared_run_outlives_a_leader_with_a_shorter_deadline():
+    async def slow_ollama(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(0.12)
+        return httpx.Response(200, json={"response": "ok"})
+
+    async def main():
+        coordinator = TaskCoordinator()
+        payload = {"task_type": "full_analysis", "topic": "Deadline mix", "use_cache": False}
+        leader = asyncio.ensure_future(
+            coordinator.execute(dict(payload, deadline_ms=300), AgentContext("mixed-leader"), persist=False)
+        )
+        await asyncio.sleep(0.02)  # the leader's run is in flight
+        follower = await coordinator.execute(dict(payload), AgentContext("mixed-follower"), persist=False)
+        checkpoints = await coordinator._load_checkpoints("mixed-leader")
+        return await leader, follower, checkpoints
+
+    ollama_client.set_http_transport(httpx.MockTransport(slow_ollama))
+    try:
+        leader, follower, checkpoints = asyncio.run(main())
+    finally:
+        ollama_client.set_http_transport(None)
+
+    assert leader["status"] == "error" and "deadline" in leader["error"]
+    assert follower["status"] == "success"
+    report = follower["results"]["report"]
+    assert report.get("executive_summary") != "Executive summary generation failed."
+    # The run kept checkpointing for the leader after it gave up waiting
+    assert set(checkpoints) == {"research", "analysis", "report"}
@@ -0,0 +1,49 @@
+# tests/test_streaming.py
+import json
+import httpx
+from fastapi.testclient import TestClient
+from src.api.main import app
+from src.core import ollama_client
+
+
+def _fake_ollama(request: httpx.Request) -> httpx.Response:
+    payload = json.loads(request.content)
+    if payload["stream"]:
+        lines = [json.dumps({"response": tok, "done": False}) for tok in ["Hello", " world"]]
+        lines.append(json.dumps({"response": "", "done": True}))
+        return httpx.Response(200, content="\n".join(lines).encode())
+    return httpx.Response(200, json={"response": "ok"})
+
+
+def test_stream_endpoint_emits_steps_and_report_tokens():
+    ollama_client.set_http_transport(httpx.MockTransport(_fake_ollama))
+    try:
+        with TestClient(app) as client:
+            session = client.post("/tasks/stream", json={"task_type": "full_analysis", "topic": "AI"}).json()
+            with client.stream("GET", session["stream_url"]) as response:
+                assert response.headers["content-type"].startswith("text/event-stream")
+                events = [
+                    json.loads(line[len("data: "):])
+                    for line in response.iter_lines() if line.startswith("data: ")
+                ]
+    finally:
+        ollama_client.set_http_transport(None)
+
+    names = [event["event"] for event in events]
+    assert names[0] == "task_started"
+    assert names[-1] == "task_completed"
+    assert [e["step"] for e in events if e["event"] == "step"] == ["research", "analysis", "report"]
+    assert [e["data"] for e in events if e["event"] == "token"] == ["Hello", " world"]
+    assert events[-1]["data"]["task_id"] == session["task_id"]
+
+
+def test_unopened_stream_expires_with_410():
+    from src.api.main import task_registry
+    client = TestClient(app)
+    ttl, task_registry.pending_ttl = task_registry.pending_ttl, 0
+    try:
+        session = client.post("/tasks/stream", json={"task_type": "full_analysis", "topic": "AI"}).json()
+        assert client.get(session["stream_url"]).status_code == 410
+    finally:
+        task_registry.pending_ttl = ttl
+    assert client.get("/tasks/unknown/stream").status_code == 404
@@ -0,0 +1,59 @@
+# tests/test_task_listing.py
+import uuid
+from datetime import datetime, timedelta
+from fastapi.testclient import TestClient
+from src.api.main import app
+from src.core.database import SessionLocal, TaskExecution
+
+
+def _seed(task_type, count):
+    base = datetime(2024, 1, 1)
+    db = SessionLocal()
+    try:
+        for i in range(count):
+            db.add(TaskExecution(
+                task_id=str(uuid.uuid4()),
+                task_type=task_type,
+                status="completed" if i % 2 == 0 else "failed",
+                input_data={"topic": f"t{i}"},
+                output_data={"report": "x" * 1000},
+                created_at=base + timedelta(minutes=i // 2)  # pairs share a timestamp
+            ))
+        db.commit()
+    finally:
+        db.close()
+
+
+def test_keyset_pages_cover_every_row_once_without_json_columns():
+    task_type = f"listing-{uuid.uuid4()}"
+    _seed(task_type, 7)
+    client = TestClient(app)
+
+    seen, cursor = [], None
+    while True:
+        params = {"task_type": task_type, "limit": 3}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/tasks", params=params)
+        page = response.json()
+        seen.extend(page)
+        cursor = response.headers.get("x-next-cursor")
+        if not cursor:
+            break
+
+    assert len(seen) == 7 and len({row["task_id"] for row in seen}) == 7
+    assert [row["created_at"] for row in seen] == sorted((row["created_at"] for row in seen), reverse=True)
+    assert set(seen[0]) == {"task_id", "task_type", "status", "created_at", "completed_at"}
+
+
+def test_status_filter_and_field_projection():
+    task_type = f"listing-{uuid.uuid4()}"
+    _seed(task_type, 4)
+    client = TestClient(app)
+
+    rows = client.get("/tasks", params={
+        "task_type": task_type, "status": "failed", "fields": "task_id,input_data"
+    }).json()
+    assert len(rows) == 2
+    assert all(set(row) == {"task_id", "input_data"} for row in rows)
+    assert client.get("/tasks", params={"fields": "bogus"}).status_code == 400
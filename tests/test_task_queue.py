@@ -0,0 +1,46 @@
+# tests/test_task_queue.py
+import asyncio
+from src.core.task_queue import TaskQueue, QueueFullError
+
+
+def test_workers_bound_concurrency_and_report_positions():
+    async def run():
+        active = 0
+        peak = 0
+
+        async def runner(task_id, input_data):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            return {"status": "success", "task_id": task_id}
+
+        queue = TaskQueue(runner, workers=2, max_size=10)
+        jobs = [await queue.submit(f"t{i}", {}) for i in range(5)]
+        positions = [queue.position(job.task_id) for job in jobs]
+        results = await asyncio.gather(*(job.future for job in jobs))
+        await queue.stop()
+        return positions, results, peak, queue.stats()
+
+    positions, results, peak, stats = asyncio.run(run())
+    assert positions == [1, 2, 3, 4, 5]
+    assert [r["task_id"] for r in results] == ["t0", "t1", "t2", "t3", "t4"]
+    assert peak == 2
+    assert stats["completed"] == 5 and stats["queued"] == 0
+
+
+def test_submit_rejects_when_full():
+    async def run():
+        queue = TaskQueue(lambda task_id, data: asyncio.sleep(1), workers=1, max_size=1)
+        await queue.submit("a", {})
+        try:
+            await queue.submit("b", {})
+            await queue.submit("c", {})
+        except QueueFullError:
+            return True
+        finally:
+            await queue.stop()
+        return False
+
+    assert asyncio.run(run())
@@ -0,0 +1,64 @@
+# tests/test_task_registry.py
+import time
+from src.core.task_registry import TaskRegistry, live_handles, pending_streams, result_bytes, result_entries
+
+
+def test_results_are_bounded_by_count_bytes_and_age():
+    registry = TaskRegistry(max_results=2, max_bytes=200, ttl=60)
+    registry.add_live("a", object())
+    assert registry.stats()["live"] == 1
+
+    registry.complete("a", {"output": "x"})
+    registry.complete("b", {"output": "y"})
+    registry.get_result("a")  # a is now the most recently used
+    registry.complete("c", {"output": "z"})
+
+    assert registry.get_result("b") is None
+    assert registry.get_result("a") == {"output": "x"}
+    stats = registry.stats()
+    assert stats["live"] == 0 and stats["results"] == 2 and stats["evictions"] == 1
+
+    registry.complete("big", {"output": "x" * 150})
+    assert registry.stats()["bytes"] <= 200
+
+    registry.ttl = 0.01
+    time.sleep(0.02)
+    assert registry.get_result("big") is None
+    assert registry.stats()["results"] == 0 and registry.stats()["bytes"] == 0
+
+
+def test_oversized_results_are_skipped_without_encoding_them_in_full():
+    registry = TaskRegistry(max_results=10, max_bytes=1000, ttl=60)
+    registry.complete("huge", {"sections": ["x" * 100] * 100000})
+    assert registry.get_result("huge") is None
+    assert registry.stats()["bytes"] == 0
+
+
+def test_pending_streams_are_bounded_by_count_and_age():
+    registry = TaskRegistry(max_pending=2, pending_ttl=60)
+    for task_id in ("a", "b", "c"):
+        registry.add_pending(task_id, {"topic": task_id})
+
+    assert registry.take_pending("a") is None and registry.pending_expired("a")
+    assert registry.take_pending("b") == {"topic": "b"}
+    assert not registry.pending_expired("unknown")
+
+    registry.pending_ttl = 0.01
+    time.sleep(0.02)
+    assert registry.take_pending("c") is None and registry.pending_expired("c")
+    assert registry.stats()["pending"] == 0 and registry.stats()["pending_expirations"] == 2
+
+
+def test_gauges_follow_registry_contents():
+    registry = TaskRegistry(max_results=10, max_bytes=1000, ttl=60)
+    registry.add_live("a", object())
+    registry.add_pending("s", {"topic": "t"})
+    assert live_handles.value() == 1 and pending_streams.value() == 1
+
+    registry.complete("a", {"output": "x"})
+    registry.take_pending("s")
+    assert live_handles.value() == 0 and pending_streams.value() == 0
+    assert result_entries.value() == 1 and result_bytes.value() == registry.stats()["bytes"] > 0
+
+    registry.discard("a")
+    assert result_entries.value() == 0 and result_bytes.value() == 0
@@ -0,0 +1,44 @@
+# tests/test_token_budget.py
+from src.agents.analysis_agent import AnalysisAgent
+from src.agents.base_agent import AgentContext
+from src.core.token_budget import (
+    PromptBuilder, context_budget, estimate_tokens, render_json, truncate_to_tokens
+)
+
+
+def test_truncation_and_json_rendering_respect_the_budget():
+    text = "word " * 500
+    assert estimate_tokens(truncate_to_tokens(text, 50, mark="")) == 50
+    assert truncate_to_tokens("short text", 50) == "short text"
+
+    data = {"findings": ["x" * 40] * 1000}
+    rendered = render_json(data, 100)
+    assert rendered.endswith("[truncated]")
+    assert estimate_tokens(rendered) <= 100 + 5
+    assert render_json({"a": 1}, 100) == '{"a":1}'
+
+    assert context_budget("phi:latest", reserve_for_output=512) == 1536
+    assert context_budget("unknown-model") > 0
+
+
+def test_builder_keeps_high_priority_sections_and_their_order():
+    prompt = (PromptBuilder(60)
+              .add("Instructions first.", priority=0)
+              .add("filler " * 200, priority=2, label="Data:")
+              .add("Closing instruction.", priority=0)
+              .build())
+
+    assert prompt.startswith("Instructions first.")
+    assert prompt.endswith("Closing instruction.")
+    assert "Data:" in prompt and "[truncated]" in prompt
+    assert estimate_tokens(prompt) <= 60 + 5
+
+
+def test_agent_prompt_fits_its_declared_model_budget():
+    agent = AnalysisAgent()
+    huge = {"key_findings": ["finding " * 50] * 2000}
+    prompt = agent._create_analysis_prompt(huge, "comprehensive", AgentContext())
+
+    assert agent.prompt_budget() == AnalysisAgent.prompt_budgets["phi:latest"]
+    assert estimate_tokens(prompt) <= agent.prompt_budget() + 5
+    assert "Data Quality assessment".lower() in prompt.lower()
@@ -0,0 +1,67 @@
+# tests/test_tracing.py
+import asyncio
+import json
+import httpx
+from fastapi.testclient import TestClient
+from src.agents.base_agent import AgentContext
+from src.agents.task_coordinator import TaskCoordinator
+from src.api import main
+from src.core import ollama_client
+from src.core.metrics import llm_tokens, span_errors, span_seconds
+from src.core.tracing import Tracer, tracer
+
+
+def test_task_spans_feed_metrics_and_the_otlp_file(tmp_path):
+    def fake_ollama(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={"response": "ok", "prompt_eval_count": 12, "eval_count": 3})
+
+    tokens_before = llm_tokens.value(model="phi:latest", direction="prompt")
+    steps_before = span_seconds.count(kind="step", name="research")
+    export = tmp_path / "spans.jsonl"
+    tracer.start_export(str(export))
+    ollama_client.set_http_transport(httpx.MockTransport(fake_ollama))
+    try:
+        asyncio.run(TaskCoordinator().execute(
+            {"task_type": "quick_research", "topic": "Tracing", "use_cache": False},
+            AgentContext("traced-task")
+        ))
+    finally:
+        ollama_client.set_http_transport(None)
+        tracer.shutdown()
+
+    assert span_seconds.count(kind="step", name="research") == steps_before + 1
+    assert llm_tokens.value(model="phi:latest", direction="prompt") > tokens_before
+
+    spans = [
+        span
+        for line in export.read_text().splitlines()
+        for span in json.loads(line)["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    ]
+    names = {span["name"] for span in spans}
+    assert {"task quick_research", "step research", "agent ResearchAgent",
+            "llm phi:latest", "db task_executions.create"} <= names
+    task_span = next(span for span in spans if span["name"] == "task quick_research")
+    llm_span = next(span for span in spans if span["name"] == "llm phi:latest")
+    assert llm_span["traceId"] == task_span["traceId"]
+    assert {"key": "task_id", "value": {"stringValue": "traced-task"}} in llm_span["attributes"]
+
+
+def test_disabled_tracer_hands_out_a_shared_noop():
+    disabled = Tracer(enabled=False)
+    errors_before = span_errors.value(kind="db", name="noop")
+    with disabled.span("db", "noop") as first, disabled.span("db", "noop") as second:
+        first.fail("ignored")
+    assert first is second
+    assert span_errors.value(kind="db", name="noop") == errors_before
+
+
+def test_metrics_endpoint_renders_prometheus_text():
+    with tracer.span("db", "probe"):
+        pass
+    with TestClient(main.app) as client:
+        response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'multiagent_span_duration_seconds_count{kind="db",name="probe"} ' in response.text
+    assert "# TYPE multiagent_span_duration_seconds histogram" in response.text
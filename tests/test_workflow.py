@@ -0,0 +1,54 @@
+# tests/test_workflow.py
+import asyncio
+import time
+import pytest
+from src.agents.workflow import (
+    WorkflowExecutor, WorkflowGraph, WorkflowNode, WorkflowError, build_workflow
+)
+
+
+def _sleeping_runner(delays):
+    async def run_node(node, node_input):
+        await asyncio.sleep(delays[node.name])
+        return {"status": "success", "node": node.name}
+    return run_node
+
+
+def test_independent_nodes_run_on_the_critical_path():
+    graph = WorkflowGraph("diamond", [
+        WorkflowNode("a", "research"),
+        WorkflowNode("b", "analysis", depends_on=["a"]),
+        WorkflowNode("c", "report", depends_on=["a"]),
+        WorkflowNode("d", "report", depends_on=["b", "c"]),
+    ])
+    delays = {"a": 0.05, "b": 0.1, "c": 0.1, "d": 0.05}
+
+    start = time.perf_counter()
+    results = asyncio.run(WorkflowExecutor().run(graph, {}, _sleeping_runner(delays)))
+    elapsed = time.perf_counter() - start
+
+    assert set(results) == {"a", "b", "c", "d"}
+    assert elapsed < 0.3  # sequential would be 0.3s
+
+
+def test_required_failure_stops_the_workflow():
+    async def run_node(node, node_input):
+        return {"status": "error"}
+
+    graph = build_workflow("full_analysis", {"topic": "x"})
+    with pytest.raises(WorkflowError, match="Research phase failed"):
+        asyncio.run(WorkflowExecutor().run(graph, {}, run_node))
+
+
+def test_cycles_are_rejected():
+    with pytest.raises(WorkflowError):
+        WorkflowGraph("loop", [
+            WorkflowNode("a", "research", depends_on=["b"]),
+            WorkflowNode("b", "analysis", depends_on=["a"]),
+        ])
+
+
+def test_custom_workflow_skips_unknown_agents():
+    graph = build_workflow("custom", {"agents": ["research", "bogus", "analysis"]},
+                           available=["research", "analysis", "report"])
+    assert graph.order == ["research", "analysis"]